@@ -8,15 +8,12 @@ import importlib
 from pyrevit import forms
 from Autodesk.Revit.UI import IExternalEventHandler
 
-REVIT_PAD_FOLDER = r"C:\PADApps\RevitPAD"
-BRIDGE_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Bridge")
-DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
-LOG_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Logs")
+from bridge_paths import BRIDGE_FOLDER, LOG_FOLDER, RESPONSE_PATH
 
 class CommandWatcherHandler(IExternalEventHandler):
     """Revit command dispatcher that dynamically loads command modules."""
 
-    def __init__(self, watch_path):
+    def __init__(self, watch_path, capture_path=None):
         self.uiapp_cached = None 
         self.event_pending = False
         self.watch_path = watch_path
@@ -33,11 +30,24 @@ class CommandWatcherHandler(IExternalEventHandler):
 
 
         self.log_path = os.path.join(LOG_FOLDER, "revit_pad_log.txt")
+        self.trace_path = os.path.join(LOG_FOLDER, "revit_pad_trace.jsonl")
+        self.last_memory = None
+
+        # Optional capture of every incoming payload (see tools/replay_capture.py)
+        self.capture_path = capture_path
+
+        # Idempotency-key journal, loaded on the first keyed command
+        self.journal = None
 
         # Ensure commands directory is in import path
         if self.commands_dir not in sys.path:
             sys.path.append(self.commands_dir)
 
+        # Shared helpers (memory_stats, ...) importable from commands/requests
+        helper_dir = os.path.dirname(os.path.abspath(__file__))
+        if helper_dir not in sys.path:
+            sys.path.append(helper_dir)
+
     def log(self, msg):
         try:
             ts = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -46,6 +56,33 @@ class CommandWatcherHandler(IExternalEventHandler):
         except Exception:
             pass
 
+    def trace(self, record):
+        """Append one JSON line per dispatched command to the trace file."""
+        try:
+            with open(self.trace_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception:
+            pass
+
+    def capture(self, record):
+        """Append one event to the capture file when capture is enabled."""
+        if not self.capture_path:
+            return
+        try:
+            with open(self.capture_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception:
+            pass
+
+    def clear_command_file(self, cmd):
+        try:
+            with open(self.watch_path, "w") as f:
+                f.write("{}")
+            self.log("{0} cleared from JSON file.".format(cmd))
+        except:
+            self.log("Failed to clear {0} from JSON file.".format(cmd))
+        self.last_command = None
+
     def Execute(self, uiapp):
 
         try:
@@ -59,6 +96,13 @@ class CommandWatcherHandler(IExternalEventHandler):
                 self.uiapp_cached = uiapp
                 self.log("Cached UIApplication")
 
+                # Document change state for version tags / caches
+                try:
+                    import change_tracker
+                    change_tracker.install(uiapp, self.log)
+                except Exception as e:
+                    self.log("Change tracker unavailable: {0}".format(e))
+
             mod_time = os.path.getmtime(self.watch_path)
             if mod_time == self.last_mod_time:
                 return
@@ -76,6 +120,16 @@ class CommandWatcherHandler(IExternalEventHandler):
                 data = json.load(f)
 
             cmd = (data.get("command") or data.get("request") or "").strip()
+
+            if cmd and self.capture_path:
+                self.capture({
+                    "event": "arrived",
+                    "timestamp": time.time(),
+                    "mtime": mod_time,
+                    "skipped": cmd == self.last_command,
+                    "payload": data,
+                })
+
             if not cmd or cmd == self.last_command:
                 return
 
@@ -119,6 +173,42 @@ class CommandWatcherHandler(IExternalEventHandler):
                 self.keep_running = False
                 return
 
+            if cmd == "start_capture":
+                self.capture_path = data.get("path") or \
+                    os.path.join(LOG_FOLDER, "revit_pad_capture.jsonl")
+                self.log("Capturing incoming commands to: {0}".format(self.capture_path))
+                self.clear_command_file(cmd)
+                return
+
+            if cmd == "stop_capture":
+                self.log("Command capture stopped: {0}".format(self.capture_path))
+                self.capture_path = None
+                self.clear_command_file(cmd)
+                return
+
+            # Idempotent commands: completed keys return their stored
+            # result, interrupted keys resume after their completed items
+            key = data.get("idempotency_key")
+            if key:
+                if self.journal is None:
+                    from command_journal import CommandJournal
+                    self.journal = CommandJournal()
+
+                entry = self.journal.lookup(key)
+                if entry is not None and entry["state"] == "completed":
+                    if self.journal.replay_result(key, RESPONSE_PATH):
+                        self.log("Replayed stored result for {0} ({1}).".format(cmd, key))
+                        self.clear_command_file(cmd)
+                        return
+                    self.log("No stored result for {0} ({1}); running it again.".format(cmd, key))
+
+                if entry is None:
+                    self.journal.accepted(key, cmd)
+                elif entry["items"]:
+                    data["completed_items"] = list(entry["items"])
+                    self.log("Resuming {0} ({1}) after {2} completed items.".format(
+                        cmd, key, len(entry["items"])))
+
 
             module_name = cmd.replace("-", "_")
 
@@ -142,7 +232,56 @@ class CommandWatcherHandler(IExternalEventHandler):
 
             if hasattr(module, "run"):
                 data["watch_path"] = self.watch_path
-                module.run(uiapp, data, self.log)
+
+                # Opt-in memory accounting around run()
+                probe = None
+                if data.get("memory"):
+                    from memory_stats import MemoryProbe
+                    probe = MemoryProbe(module_name)
+                    probe.start()
+
+                if key:
+                    journal = self.journal
+                    journal.running(key)
+                    data["checkpoint"] = lambda item: journal.item_done(key, item)
+
+                started = time.time()
+                try:
+                    # Opt-in profiling: profiler is only imported when asked for
+                    if data.get("profile"):
+                        from command_profiler import run_profiled
+                        run_profiled(module_name, module.run, uiapp, data, self.log)
+                    else:
+                        module.run(uiapp, data, self.log)
+                except Exception as e:
+                    if key:
+                        self.journal.failed(key, e)
+                    raise
+                else:
+                    # Modules catch their own exceptions and write an
+                    # error response: journal that as a failure
+                    if key and not self.journal.finish(key, RESPONSE_PATH, started):
+                        self.log("{0} ({1}) failed; the key stays resumable.".format(cmd, key))
+                finally:
+                    record = {
+                        "timestamp": started,
+                        "command": module_name,
+                        "duration": time.time() - started,
+                    }
+                    if "id" in data:
+                        record["id"] = data["id"]
+                    if probe is not None:
+                        self.last_memory = probe.stop()
+                        record["memory"] = self.last_memory
+                        self.log("Memory ({0}): peak {1} bytes, retained {2} bytes".format(
+                            module_name,
+                            self.last_memory.get("peak_bytes", "n/a"),
+                            self.last_memory["retained_bytes"]))
+                    self.trace(record)
+                    if self.capture_path:
+                        completed = dict(record)
+                        completed["event"] = "completed"
+                        self.capture(completed)
 
                 # NEW: clear file to stop repeats
                 try:
@@ -163,10 +302,10 @@ class CommandWatcherHandler(IExternalEventHandler):
     def GetName(self):
         return "Command Watcher Event"
 
-    def start(self, ext_event, interval=3):
+    def start(self, ext_event, interval=3, startup_delay=5):
 
         def loop():
-            time.sleep(5)
+            time.sleep(startup_delay)
             self.log("Command Watcher active.")
 
             while True:
@@ -178,7 +317,10 @@ class CommandWatcherHandler(IExternalEventHandler):
                 try:
                     heartbeat_path = os.path.join(BRIDGE_FOLDER, "revit_heartbeat.json")
                     with open(heartbeat_path, "w") as hb:
-                        hb.write(json.dumps({"timestamp": time.time(), "status": "alive"}))
+                        beat = {"timestamp": time.time(), "status": "alive"}
+                        if self.last_memory is not None:
+                            beat["memory"] = self.last_memory
+                        hb.write(json.dumps(beat))
                 except:
                     pass
 
@@ -191,7 +333,7 @@ class CommandWatcherHandler(IExternalEventHandler):
                         self.event_pending = False
 
                 # Short sleep for responsive shutdown
-                for _ in range(30):   # 30 × 0.1s = 3 seconds total
+                for _ in range(max(1, int(interval * 10))):   # 0.1s ticks
                     if not self.keep_running:
                         self.log("Watcher loop stopping during sleep.")
                         return
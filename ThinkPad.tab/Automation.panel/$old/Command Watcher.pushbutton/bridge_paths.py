@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Folder layout shared by the watcher, commands and requests.
+# REVIT_PAD_FOLDER can be moved through the environment; tools/harness.py
+# points it at a scratch folder before any bridge module is imported.
+# ----------------------------------------------------------------------
+import os
+
+REVIT_PAD_FOLDER = os.environ.get("REVIT_PAD_FOLDER", r"C:\PADApps\RevitPAD")
+BRIDGE_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Bridge")
+DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
+LOG_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Logs")
+JOURNAL_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Journal")
+RESPONSE_PATH = os.path.join(DATA_FOLDER, "response.json")
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Document change state for conditional requests and incremental caches.
+#
+# The watcher subscribes once to Application.DocumentChanged. Every
+# committed transaction, undo/redo or reload bumps a per-document
+# counter and appends its added / modified / deleted ids to a bounded
+# change log. Read requests derive a version tag from that counter plus
+# their own arguments; a client sending the tag back as "if_none_match"
+# gets {"status": "not_modified"} before any collector pass.
+# ----------------------------------------------------------------------
+import json
+import os
+import time
+import zlib
+from collections import deque
+
+# Keys that never change what a read request returns
+TRANSPORT_KEYS = (
+    "id", "sent", "watch_path", "if_none_match", "idempotency_key",
+    "profile", "profile_top", "profile_sort", "memory",
+    "checkpoint", "completed_items", "version_tag", "encoding",
+)
+
+CHANGE_LOG_SIZE = 500
+
+# Distinguishes tags across Revit sessions (counters restart at 0)
+SESSION = "{0:x}{1:x}".format(int(time.time()), os.getpid())
+
+_installed = False
+_versions = {}
+_changes = {}
+
+
+def doc_key(doc):
+    return doc.PathName or doc.Title
+
+
+def _ids(id_collection):
+    return [i.IntegerValue for i in id_collection]
+
+
+def _on_document_changed(sender, args):
+    doc = args.GetDocument()
+    key = doc_key(doc)
+    version = _versions.get(key, 0) + 1
+    _versions[key] = version
+    _changes.setdefault(key, deque(maxlen=CHANGE_LOG_SIZE)).append((
+        version,
+        _ids(args.GetAddedElementIds()),
+        _ids(args.GetModifiedElementIds()),
+        _ids(args.GetDeletedElementIds()),
+    ))
+
+
+def _on_document_opened(sender, args):
+    # A reopened file may have changed on disk: never reuse old tags
+    key = doc_key(args.Document)
+    _versions[key] = _versions.get(key, 0) + 1
+    _changes.pop(key, None)
+
+
+def install(uiapp, log=None):
+    """Subscribe to document events once per Revit session."""
+    global _installed
+    if _installed:
+        return
+    app = uiapp.Application
+    app.DocumentChanged += _on_document_changed
+    app.DocumentOpened += _on_document_opened
+    _installed = True
+    if log:
+        log("Change tracker subscribed to DocumentChanged.")
+
+
+def is_installed():
+    return _installed
+
+
+def doc_version(doc):
+    """Change counter of a document, or None when changes are not tracked."""
+    if not _installed:
+        return None
+    return _versions.get(doc_key(doc), 0)
+
+
+def changes_since(doc, version):
+    """
+    (added, modified, deleted) id sets since `version`, or None when the
+    change log no longer reaches back that far (callers rebuild fully).
+    """
+    current = doc_version(doc)
+    if current is None or version is None:
+        return None
+    if version == current:
+        return set(), set(), set()
+    log = _changes.get(doc_key(doc))
+    if not log or log[0][0] > version + 1:
+        return None
+    added, modified, deleted = set(), set(), set()
+    for v, a, m, d in log:
+        if v > version:
+            added.update(a)
+            modified.update(m)
+            deleted.update(d)
+    return added, modified, deleted
+
+
+def change_token(doc):
+    """Opaque "changed since" marker for clients, or None if untracked."""
+    version = doc_version(doc)
+    if version is None:
+        return None
+    return "{0}-{1}".format(SESSION, version)
+
+
+def changes_since_token(doc, token):
+    """changes_since() for a change_token; None if from another session."""
+    session, _, version = (token or "").rpartition("-")
+    if session != SESSION or not version.isdigit():
+        return None
+    return changes_since(doc, int(version))
+
+
+def version_tag(doc, data=None):
+    """Tag for this document state and request arguments (None if untracked)."""
+    version = doc_version(doc)
+    if version is None:
+        return None
+    args = dict((k, v) for k, v in (data or {}).items() if k not in TRANSPORT_KEYS)
+    signature = zlib.crc32(json.dumps(args, sort_keys=True, default=str).encode("utf-8")) & 0xffffffff
+    return "{0}-{1}-{2:08x}".format(SESSION, version, signature)
+
+
+def not_modified(doc, data, response_path):
+    """
+    Computes the request's version tag. If it equals the client's
+    if_none_match, writes the not_modified response and returns
+    (tag, True); otherwise (tag, False).
+    """
+    tag = version_tag(doc, data)
+    if tag is None or data.get("if_none_match") != tag:
+        return tag, False
+
+    folder = os.path.dirname(response_path)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(response_path, "w") as f:
+        json.dump({"status": "not_modified", "version": tag}, f)
+    return tag, True
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Append-only journal of idempotent commands.
+# One JSON line per state change: accepted -> running -> item* ->
+# completed | failed. Replaying the file on start rebuilds the state, so
+# a restarted watcher knows which keys finished (and where their result
+# is) and which were interrupted (and which items they had done).
+# Commands report errors by writing {"error": ...} rather than raising,
+# so finish() reads the response of the run to tell the two apart.
+# ----------------------------------------------------------------------
+import json
+import os
+import shutil
+import time
+
+from bridge_paths import JOURNAL_FOLDER
+
+JOURNAL_PATH = os.path.join(JOURNAL_FOLDER, "command_journal.jsonl")
+RESULTS_FOLDER = os.path.join(JOURNAL_FOLDER, "results")
+
+# Error responses are small {"error": ...} documents; larger ones are
+# results and are not parsed
+MAX_ERROR_BYTES = 65536
+
+
+class CommandJournal(object):
+    """Idempotency-key state, rebuilt from and appended to a JSONL file."""
+
+    def __init__(self, path=JOURNAL_PATH, results_folder=RESULTS_FOLDER):
+        self.path = path
+        self.results_folder = results_folder
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+
+    def _apply(self, event):
+        key = event["key"]
+        entry = self.entries.setdefault(key, {
+            "key": key,
+            "state": None,
+            "command": None,
+            "items": [],
+            "result_path": None,
+        })
+        state = event["state"]
+        if state == "item":
+            entry["items"].append(event["item"])
+            return
+        entry["state"] = state
+        for field in ("command", "result_path", "error"):
+            if field in event:
+                entry[field] = event[field]
+
+    def _append(self, event):
+        event["timestamp"] = time.time()
+        folder = os.path.dirname(self.path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(event)
+
+    # ------------------------------------------------------------------
+    def lookup(self, key):
+        return self.entries.get(key)
+
+    def accepted(self, key, command):
+        self._append({"key": key, "state": "accepted", "command": command})
+
+    def running(self, key):
+        self._append({"key": key, "state": "running"})
+
+    def item_done(self, key, item):
+        self._append({"key": key, "state": "item", "item": item})
+
+    def failed(self, key, error):
+        self._append({"key": key, "state": "failed", "error": str(error)})
+
+    def finish(self, key, response_path, since):
+        """
+        Records the outcome of a run that returned: failed if it wrote an
+        error response, else completed. Returns True if completed.
+        """
+        error = None
+        if _written_since(response_path, since):
+            error = response_error(response_path)
+        if error is not None:
+            self.failed(key, error)
+            return False
+        self.completed(key, response_path, since)
+        return True
+
+    def completed(self, key, response_path=None, since=None):
+        """
+        Marks the key done. A response.json written during the run
+        (mtime >= since) is kept under results/ so replays can return it.
+        """
+        result_path = None
+        if response_path and _written_since(response_path, since):
+            if not os.path.exists(self.results_folder):
+                os.makedirs(self.results_folder)
+            result_path = os.path.join(self.results_folder, _safe(key) + ".json")
+            shutil.copyfile(response_path, result_path)
+        self._append({"key": key, "state": "completed", "result_path": result_path})
+
+    def replay_result(self, key, response_path):
+        """
+        Copies the stored response of a completed key to response_path.
+        False if the run wrote none (or it is gone): the caller runs the
+        command again, resuming after its completed items.
+        """
+        entry = self.entries[key]
+        if not entry["result_path"] or not os.path.exists(entry["result_path"]):
+            return False
+        folder = os.path.dirname(response_path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        shutil.copyfile(entry["result_path"], response_path)
+        return True
+
+
+def response_error(path):
+    """The "error" of an error response at path, else None."""
+    try:
+        if os.path.getsize(path) > MAX_ERROR_BYTES:
+            return None
+        with open(path, "r") as f:
+            value = json.load(f)
+    except (OSError, IOError, ValueError):
+        return None
+    if isinstance(value, dict) and "error" in value:
+        return value["error"]
+    return None
+
+
+def _written_since(path, since):
+    try:
+        return since is None or os.path.getmtime(path) >= since
+    except OSError:
+        return False
+
+
+def _safe(key):
+    return "".join([c for c in str(key) if c.isalnum() or c in ("_", "-")])
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+from bridge_paths import DATA_FOLDER
+
+DEFAULT_TOP_N = 30
+DEFAULT_SORT = "cumulative"
+
+
+def _new_profiler():
+    """cProfile where available (CPython engine), pure-python profile otherwise."""
+    try:
+        import cProfile as profiler
+    except ImportError:
+        import profile as profiler
+    return profiler.Profile()
+
+
+def run_profiled(module_name, run, uiapp, data, log):
+    """
+    Runs a command module's run() under a deterministic profiler.
+    Writes <module>.prof and a top-N text summary next to response.json.
+    Only imported when the command carries "profile": true.
+    """
+    prof = _new_profiler()
+    start = time.time()
+    try:
+        return prof.runcall(run, uiapp, data, log)
+    finally:
+        elapsed = time.time() - start
+        write_profile(prof, module_name, elapsed, data, log)
+
+
+def write_profile(prof, module_name, elapsed, data, log):
+    import pstats
+
+    try:
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        prof_path = os.path.join(DATA_FOLDER, "profile_{0}.prof".format(module_name))
+        text_path = os.path.join(DATA_FOLDER, "profile_{0}.txt".format(module_name))
+
+        prof.dump_stats(prof_path)
+
+        top_n = int(data.get("profile_top", DEFAULT_TOP_N))
+        sort_key = data.get("profile_sort", DEFAULT_SORT)
+
+        with open(text_path, "w") as f:
+            f.write("Command: {0}\n".format(module_name))
+            f.write("Wall time: {0:.3f}s\n\n".format(elapsed))
+            stats = pstats.Stats(prof, stream=f)
+            stats.strip_dirs().sort_stats(sort_key).print_stats(top_n)
+
+        log("Profile written: {0} ({1:.3f}s)".format(prof_path, elapsed))
+
+    except Exception as e:
+        log("Failed to write profile for {0}: {1}".format(module_name, e))
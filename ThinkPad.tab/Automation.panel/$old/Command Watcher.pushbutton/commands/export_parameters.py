@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import json
+import time
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector
+
+from element_query import parameter_value, resolve_categories
+from response_writer import replace_file
+from bridge_paths import REVIT_PAD_FOLDER, DATA_FOLDER, RESPONSE_PATH
+
+
+DEFAULT_CATEGORIES = ["OST_Sheets", "OST_Views"]
+CHUNK_ROWS = 10000
+TYPE_PREFIX = "type:"
+
+
+def _csv_field(value):
+    if value is None:
+        return u""
+    if isinstance(value, bool):
+        value = int(value)
+    text = u"{0}".format(value)
+    if any(c in text for c in u',"\r\n'):
+        text = u'"' + text.replace(u'"', u'""') + u'"'
+    return text
+
+
+def _parameters(element, display):
+    """name -> value for every parameter, read in one pass."""
+    values = {}
+    for param in element.Parameters:
+        try:
+            name = param.Definition.Name
+            if name not in values:
+                values[name] = parameter_value(param, display)
+        except Exception:
+            pass
+    return values
+
+
+def iter_rows(doc, bic, display):
+    """One dict per instance; type parameters are read once per type."""
+    type_values = {}
+    collector = FilteredElementCollector(doc).OfCategory(bic).WhereElementIsNotElementType()
+    for element in collector:
+        try:
+            row = _parameters(element, display)
+            type_id = element.GetTypeId().IntegerValue
+            if type_id > 0:
+                if type_id not in type_values:
+                    element_type = doc.GetElement(ElementId(type_id))
+                    type_values[type_id] = _parameters(element_type, display) if element_type else {}
+                for name, value in type_values[type_id].items():
+                    row[TYPE_PREFIX + name] = value
+            row["id"] = element.Id.IntegerValue
+            row["type_id"] = type_id
+            yield row
+        except Exception:
+            pass
+
+
+def write_chunk(path, rows):
+    """CSV with the union of the chunk's columns; returns the columns."""
+    columns = ["id", "type_id"]
+    seen = set(columns)
+    for row in rows:
+        for name in sorted(row):
+            if name not in seen:
+                seen.add(name)
+                columns.append(name)
+
+    with io.open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+        f.write(u",".join(_csv_field(c) for c in columns) + u"\r\n")
+        for row in rows:
+            f.write(u",".join(_csv_field(row.get(c)) for c in columns) + u"\r\n")
+    replace_file(path + ".tmp", path)
+    return columns
+
+
+def export_category(doc, bic, folder, chunk_rows, display, log):
+    """Streams one category into numbered chunks; returns its manifest entry."""
+    entry = {"category": str(bic), "rows": 0, "columns": [], "chunks": []}
+    columns_seen = set()
+
+    def flush(rows):
+        name = "{0}_{1:04d}.csv".format(bic, len(entry["chunks"]))
+        columns = write_chunk(os.path.join(folder, name), rows)
+        entry["chunks"].append({
+            "file": name,
+            "rows": len(rows),
+            "first_id": rows[0]["id"],
+            "last_id": rows[-1]["id"],
+            "columns": columns
+        })
+        entry["rows"] += len(rows)
+        for c in columns:
+            if c not in columns_seen:
+                columns_seen.add(c)
+                entry["columns"].append(c)
+
+    rows = []
+    for row in iter_rows(doc, bic, display):
+        rows.append(row)
+        if len(rows) >= chunk_rows:
+            flush(rows)
+            rows = []
+    if rows:
+        flush(rows)
+
+    log("Extracted {0}: {1} rows in {2} chunks".format(bic, entry["rows"], len(entry["chunks"])))
+    return entry
+
+
+def run(uiapp, data, log):
+    """
+    Bulk parameter extract for analytics: every instance and type
+    parameter of each category, one collector pass per category, written
+    as CSV chunks of "chunk_rows" rows plus manifest.json.
+    Each chunk carries its own header; the manifest lists chunks with
+    their row counts, id ranges and columns so loaders can read them in
+    parallel or pick only what they need. The manifest is written last;
+    response.json then gives its path, the row total and per-category
+    row counts (no dialog: BlueTree drives this command).
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        categories = resolve_categories(data.get("categories") or DEFAULT_CATEGORIES)
+        chunk_rows = int(data.get("chunk_rows", CHUNK_ROWS))
+        display = bool(data.get("display_values"))
+        folder = data.get("path", os.path.join(REVIT_PAD_FOLDER, "Exports", "parameters"))
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        log("Starting export_parameters -> {0}".format(folder))
+        start = time.time()
+
+        manifest = {
+            "document": doc.Title,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "chunk_rows": chunk_rows,
+            "display_values": display,
+            "type_prefix": TYPE_PREFIX,
+            "categories": []
+        }
+        for bic in categories:
+            manifest["categories"].append(export_category(doc, bic, folder, chunk_rows, display, log))
+        manifest["duration"] = round(time.time() - start, 3)
+
+        manifest_path = os.path.join(folder, "manifest.json")
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        replace_file(manifest_path + ".tmp", manifest_path)
+
+        total = sum(c["rows"] for c in manifest["categories"])
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({
+                "manifest": manifest_path,
+                "path": folder,
+                "rows": total,
+                "categories": [{"category": c["category"], "rows": c["rows"],
+                                "chunks": len(c["chunks"])} for c in manifest["categories"]],
+                "duration": manifest["duration"],
+            }, f, indent=2)
+        log("Parameter export complete: {0} rows → {1}".format(total, folder))
+
+    except Exception as e:
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in export_parameters: {0}".format(e))
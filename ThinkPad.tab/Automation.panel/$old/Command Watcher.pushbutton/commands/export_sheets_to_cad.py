@@ -10,6 +10,9 @@ from Autodesk.Revit.DB import (
     ElementId
 )
 
+import sheet_sets
+from bridge_paths import REVIT_PAD_FOLDER
+
 # Import List for proper ICollection conversion
 clr.AddReference("System")
 from System.Collections.Generic import List
@@ -21,15 +24,21 @@ def run(uiapp, data, log):
         doc = uiapp.ActiveUIDocument.Document
 
         # Extract parameters
-        sheet_ids = data.get("sheet_ids", [])
         cad_format = data.get("cad_format", "dwg").lower()
-        export_path = data.get("path", r"C:\PADApps\RevitPAD\Exports")
+        export_path = data.get("path", os.path.join(REVIT_PAD_FOLDER, "Exports"))
+
+        # Idempotent runs: skip sheets a previous, interrupted run exported
+        done_ids = set([item["id"] for item in data.get("completed_items", [])])
+        checkpoint = data.get("checkpoint")
 
         if not os.path.exists(export_path):
             os.makedirs(export_path)
 
         log("Starting export_sheets_to_cad -> {0}".format(export_path))
-        log("Format: {0} | Sheets: {1}".format(cad_format, len(sheet_ids)))
+        # Explicit ids and named sheet sets resolve by id, no collector scan
+        export_sheets, missing = sheet_sets.resolve_sheets(doc, data)
+        if missing:
+            log("Sheet ids not found: {0}".format(missing))
 
         # Choose export options
         if cad_format == "dxf":
@@ -62,13 +71,11 @@ def run(uiapp, data, log):
         except:
             pass
 
-        # Collect target sheets
-        all_sheets = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Sheets)
-        # If sheet_ids is empty, export everything
-        if not sheet_ids:
-            export_sheets = all_sheets
-        else:
-            export_sheets = [s for s in all_sheets if s.Id.IntegerValue in sheet_ids]
+        # If no sheets are named, export everything
+        if export_sheets is None:
+            export_sheets = list(FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Sheets))
+
+        log("Format: {0} | Sheets: {1}".format(cad_format, len(export_sheets)))
 
         if not export_sheets:
             msg = "⚠️ No matching sheets found for export."
@@ -79,6 +86,8 @@ def run(uiapp, data, log):
         # Export loop
         exported = []
         for sheet in export_sheets:
+            if sheet.Id.IntegerValue in done_ids:
+                continue
             try:
                 sheetnum = sheet.SheetNumber
                 sheetname = sheet.Name
@@ -94,6 +103,8 @@ def run(uiapp, data, log):
                     file_path = os.path.join(export_path, safe_name + "." + cad_format)
                     exported.append(file_path)
                     log("Exported: {0}".format(file_path))
+                    if checkpoint:
+                        checkpoint({"id": sheet.Id.IntegerValue, "file": file_path})
 
             except Exception as e:
                 log("Failed to export sheet {0}: {1}".format(sheet.SheetNumber, e))
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import os
+from pyrevit import forms
+from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory
+
+from response_writer import open_response
+from bridge_paths import REVIT_PAD_FOLDER
+
+
+def iter_sheets(doc):
+    for s in FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Sheets):
+        try:
+            yield {
+                "id": s.Id.IntegerValue,
+                "sheet_number": s.SheetNumber,
+                "sheet_name": s.Name
+            }
+        except Exception:
+            pass
+
+
+def run(uiapp, data, log):
+    """Exports all Revit sheets to JSON file (streamed, one sheet at a time)."""
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        base_dir = os.path.dirname(data.get("watch_path", os.path.join(REVIT_PAD_FOLDER, "Bridge", "")))
+        output_path = os.path.join(base_dir, "revit_sheets.json")
+
+        with open_response(output_path, data, ensure_ascii=False) as out:
+            count = out.records("sheets", iter_sheets(doc))
+
+        msg = "✅ Exported {0} sheets → {1}".format(count, output_path)
+        log(msg)
+        forms.alert(msg, title="Revit Command Watcher")
+
+    except Exception as e:
+        log("Error in export_sheets_to_json: {0}".format(e))
@@ -1,22 +1,30 @@
 # -*- coding: utf-8 -*-
 import os
 import json
+import time
+import clr
 from pyrevit import forms
-from Autodesk.Revit.DB import (
-    FilteredElementCollector,
-    BuiltInCategory,
-    PrintRange
-)
+from Autodesk.Revit.DB import ElementId, PrintRange
 
-PDF_DRIVER = "PDFCreator"
+import file_settle
+import sheet_sets
+from bridge_paths import REVIT_PAD_FOLDER, DATA_FOLDER, RESPONSE_PATH
+
+# Native PDF export (Revit 2022+): no view activation, no print spooler
+try:
+    from Autodesk.Revit.DB import PDFExportOptions
+except ImportError:
+    PDFExportOptions = None
 
-REVIT_PAD_FOLDER = r"C:\PADApps\RevitPAD"
-DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
-RESPONSE_PATH = os.path.join(DATA_FOLDER, "response.json")
+clr.AddReference("System")
+from System.Collections.Generic import List
+
+PDF_DRIVER = "PDFCreator"
+ENGINES = ("auto", "native", "driver")
 
 
 def write_response(payload, log):
-    """Write ONLY error responses from Revit."""
+    """Error responses, and success responses of the native engine."""
     try:
         if not os.path.exists(DATA_FOLDER):
             os.makedirs(DATA_FOLDER)
@@ -27,12 +35,165 @@ def write_response(payload, log):
         log("ERROR writing response.json: {}".format(e))
 
 
+def safe_name(text):
+    return "".join([c for c in text if c.isalnum() or c in ("_", "-")])
+
+
+def safe_file_name(sheet):
+    return safe_name("{}_{}".format(sheet.SheetNumber, sheet.Name))
+
+
+def combined_file_name(data, sheets):
+    """"file_name", else the single sheet set named, else a generic one."""
+    name = data.get("file_name") or data.get("sheet_set")
+    if not name or isinstance(name, list):
+        name = "Combined_{}_sheets".format(len(sheets))
+    return safe_name(name.replace(" ", "_"))
+
+
+def choose_engine(data):
+    engine = data.get("engine", "auto")
+    if engine not in ENGINES:
+        raise Exception("Unknown engine: {}".format(engine))
+    if engine == "native" and PDFExportOptions is None:
+        raise Exception("Native PDF export needs Revit 2022 or later")
+    if engine == "auto":
+        engine = "native" if PDFExportOptions is not None else "driver"
+    if data.get("combine") and engine != "native":
+        raise Exception("combine needs the native engine (Revit 2022 or later)")
+    return engine
+
+
+def export_native(doc, sheets, export_path, done_ids, checkpoint, log):
+    """
+    One Document.Export per sheet with PDFExportOptions: sheets are
+    never activated or redrawn in the UI, and file names are exact.
+    """
+    options = PDFExportOptions()
+    # FileName only applies to combined output; a one-sheet "combined"
+    # export keeps our file name instead of Revit's naming rule
+    options.Combine = True
+
+    results = []
+    for sheet in sheets:
+        if sheet.Id.IntegerValue in done_ids:
+            continue
+
+        safe = safe_file_name(sheet)
+        out_file = os.path.join(export_path, safe + ".pdf")
+        item = {"id": sheet.Id.IntegerValue, "number": sheet.SheetNumber, "file": out_file}
+
+        started = time.time()
+        try:
+            options.FileName = safe
+            if not doc.Export(export_path, List[ElementId]([sheet.Id]), options):
+                raise Exception("Export returned false")
+        except Exception as e:
+            item["error"] = str(e)
+        item["seconds"] = round(time.time() - started, 3)
+        results.append(item)
+
+        if "error" in item:
+            log("✖ {} failed after {}s: {}".format(sheet.SheetNumber, item["seconds"], item["error"]))
+            continue
+        log("✔ Exported {} in {}s: {}".format(sheet.SheetNumber, item["seconds"], out_file))
+        if checkpoint:
+            checkpoint(item)
+    return results
+
+
+def export_combined(doc, sheets, export_path, file_name, log):
+    """
+    The whole set in one Document.Export: one PDF, one page per sheet in
+    the given order. Returns the response body, with a bookmark (page
+    and title) per sheet.
+    """
+    options = PDFExportOptions()
+    options.Combine = True
+    options.FileName = file_name
+
+    out_file = os.path.join(export_path, file_name + ".pdf")
+    started = time.time()
+    if not doc.Export(export_path, List[ElementId]([s.Id for s in sheets]), options):
+        raise Exception("Combined export returned false")
+    seconds = round(time.time() - started, 3)
+    log("✔ Exported {} sheets into {} in {}s".format(len(sheets), out_file, seconds))
+
+    return {
+        "file": out_file,
+        "pages": len(sheets),
+        "bookmarks": [
+            {"page": i + 1, "id": s.Id.IntegerValue, "number": s.SheetNumber,
+             "title": u"{} - {}".format(s.SheetNumber, s.Name)}
+            for i, s in enumerate(sheets)
+        ],
+        "seconds": seconds,
+        "seconds_per_sheet": round(seconds / len(sheets), 4),
+    }
+
+
+def export_driver(uidoc, sheets, export_path, done_ids, checkpoint, log):
+    """
+    PRINT-CURRENT-WINDOW through the PDFCreator driver: each sheet is
+    activated and submitted to the spooler. Timings cover activation
+    and submission; PDFCreator writes the file afterwards.
+    """
+    pm = uidoc.Document.PrintManager
+    pm.SelectNewPrintDriver(PDF_DRIVER)
+    pm.PrintToFile = True
+    pm.PrintRange = PrintRange.Current
+
+    # ---------------------------------------------------
+    # Loop — one sheet per file
+    # (PDFCreator overrides the filename)
+    # ---------------------------------------------------
+    results = []
+    for sheet in sheets:
+        if sheet.Id.IntegerValue in done_ids:
+            continue
+
+        log("→ Activating sheet {}".format(sheet.SheetNumber))
+        started = time.time()
+
+        uidoc.ActiveView = sheet
+
+        out_file = os.path.join(export_path, safe_file_name(sheet) + ".pdf")
+        log("→ Printing to: {}".format(out_file))
+
+        pm.PrintToFileName = out_file
+        pm.Apply()
+        pm.SubmitPrint()
+
+        item = {"id": sheet.Id.IntegerValue, "number": sheet.SheetNumber, "file": out_file,
+                "seconds": round(time.time() - started, 3)}
+        results.append(item)
+
+        log("✔ Printed in {}s (PDFCreator may rename): {}".format(item["seconds"], out_file))
+        if checkpoint:
+            checkpoint(item)
+    return results
+
+
 def run(uiapp, data, log):
     """
-    Export sheets to PDF.
+    Export sheets to PDF, one file per sheet.
+    "engine": "native" uses Revit's PDF export (2022+) without
+    activating sheets, "driver" prints through PDFCreator, "auto"
+    (default) picks native where available.
+    "combine": true (native only) exports all sheets into one PDF
+    ("file_name", default the sheet set name) in a single operation;
+    "order": "number" sorts them by sheet number instead of request
+    order. The response maps each sheet to its page ("bookmarks").
     NOTE:
-        • NO success response is written.
-        • BlueTree will detect, move, and write the final response.
+        • native: the success response lists files and per-sheet seconds.
+        • driver: PDFCreator writes (and may rename) the files after
+          this returns. A background file_settle job waits until each
+          has appeared and stopped growing. The response names the job
+          and its "result_path" (Data/exports/<job>.json), where the
+          actual paths, sizes and timings appear once the files are
+          final ("settle_timeout" seconds, default 600). "settle": false
+          writes no success response and leaves detecting the files to
+          BlueTree, as before.
     """
     try:
         uidoc = uiapp.ActiveUIDocument
@@ -41,31 +202,30 @@ def run(uiapp, data, log):
         # ---------------------------------------------------
         # Incoming request data
         # ---------------------------------------------------
-        sheet_ids = data.get("sheet_ids", [])
-        export_path = data.get("path", r"C:\PADApps\RevitPAD\ExportsPDF")
+        export_path = data.get("path", os.path.join(REVIT_PAD_FOLDER, "ExportsPDF"))
+        engine = choose_engine(data)
+
+        # Idempotent runs: skip sheets a previous, interrupted run printed
+        completed = data.get("completed_items", [])
+        done_ids = set([item["id"] for item in completed])
+        checkpoint = data.get("checkpoint")
 
         if not os.path.exists(export_path):
             os.makedirs(export_path)
 
-        if not sheet_ids:
-            msg = "No sheet_ids passed to export_sheets_to_pdf"
+        # ---------------------------------------------------
+        # Resolve "sheet_ids" / named "sheet_set" by id
+        # ---------------------------------------------------
+        sheets, missing = sheet_sets.resolve_sheets(doc, data)
+
+        if sheets is None:
+            msg = "No sheet_ids or sheet_set passed to export_sheets_to_pdf"
             log(msg)
             write_response({"error": msg}, log)
             return
 
-        log("PRINT-CURRENT-WINDOW mode started")
-        log("Sheet IDs received: {}".format(sheet_ids))
-
-        # ---------------------------------------------------
-        # Collect matching sheets
-        # ---------------------------------------------------
-        collector = (
-            FilteredElementCollector(doc)
-            .OfCategory(BuiltInCategory.OST_Sheets)
-            .WhereElementIsNotElementType()
-        )
-
-        sheets = [s for s in collector if s.Id.IntegerValue in sheet_ids]
+        log("{} engine started".format(engine.upper()))
+        log("Sheets resolved: {} ({} missing)".format(len(sheets), len(missing)))
 
         if not sheets:
             msg = "No valid sheets found for provided IDs."
@@ -73,42 +233,68 @@ def run(uiapp, data, log):
             write_response({"error": msg}, log)
             return
 
-        # ---------------------------------------------------
-        # Configure PDF print driver
-        # ---------------------------------------------------
-        pm = doc.PrintManager
-        pm.SelectNewPrintDriver(PDF_DRIVER)
-        pm.PrintToFile = True
-        pm.PrintRange = PrintRange.Current
-
-        # ---------------------------------------------------
-        # Loop — one sheet per file
-        # (PDFCreator overrides the filename)
-        # ---------------------------------------------------
-        for sheet in sheets:
-            log("→ Activating sheet {}".format(sheet.SheetNumber))
+        if data.get("order") == "number":
+            sheets = sorted(sheets, key=lambda s: s.SheetNumber)
 
-            uidoc.ActiveView = sheet
+        if data.get("combine"):
+            result = export_combined(doc, sheets, export_path,
+                                     combined_file_name(data, sheets), log)
+            result.update({"engine": engine, "combined": True, "missing": missing})
+            write_response(result, log)
+            return
 
-            num = sheet.SheetNumber
-            name = sheet.Name
-            combined = "{}_{}".format(num, name)
-            safe = "".join([c for c in combined if c.isalnum() or c in ("_", "-")])
+        # Snapshot the folder before printing: the settle job only
+        # considers files that appear or change afterwards
+        settle = None
+        if engine == "driver" and data.get("settle", True):
+            # Request ids repeat (retries, resumed runs): the timestamp
+            # keeps each job's result file its own
+            job_id = "{}_{}".format(safe_name(u"{}".format(data.get("id") or "")) or "pdf",
+                                    int(time.time() * 1000))
+            settle = file_settle.SettleJob(
+                export_path, os.path.join(DATA_FOLDER, "exports"), job_id,
+                timeout=float(data.get("settle_timeout", file_settle.TIMEOUT)), log=log)
 
-            out_file = os.path.join(export_path, safe + ".pdf")
-            log("→ Printing to: {}".format(out_file))
+        started = time.time()
+        if engine == "native":
+            results = export_native(doc, sheets, export_path, done_ids, checkpoint, log)
+        else:
+            results = export_driver(uidoc, sheets, export_path, done_ids, checkpoint, log)
+        total = round(time.time() - started, 3)
+        log("{} sheets in {}s ({} engine)".format(len(results), total, engine))
 
-            pm.PrintToFileName = out_file
-            pm.Apply()
-            pm.SubmitPrint()
+        if settle is not None:
+            settle.watch(results, done=completed, engine=engine, missing=missing,
+                         submit_seconds=total)
+            log("Waiting in the background for {} files (job {})".format(len(results), settle.job_id))
+            write_response({
+                "engine": engine,
+                "status": "settling",
+                "job": settle.job_id,
+                "result_path": settle.result_path,
+                "path": export_path,
+                "submitted": len(results),
+                "missing": missing,
+                "seconds": total,
+            }, log)
 
-            log("✔ Printed (PDFCreator may rename): {}".format(out_file))
+        if engine == "native":
+            failed = [r for r in results if "error" in r]
+            write_response({
+                "engine": engine,
+                "path": export_path,
+                "sheets": list(completed) + results,
+                "exported": len(results) - len(failed),
+                "failed": len(failed),
+                "missing": missing,
+                "seconds": total,
+            }, log)
 
         # ---------------------------------------------------
-        # IMPORTANT:
-        # NO SUCCESS RESPONSE WRITTEN HERE.
-        # BlueTree detects and moves the files,
-        # then generates the REAL response with correct paths.
+        # IMPORTANT (driver engine):
+        # NO FILE LIST IN THE RESPONSE.
+        # The settle job writes it to result_path once the files
+        # are final, with the paths PDFCreator actually used.
         # ---------------------------------------------------
 
     except Exception as e:
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+from Autodesk.Revit.DB import Transaction, ViewSet
+
+import sheet_sets
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def save_document_set(doc, name, sheets):
+    """Creates or replaces a Revit ViewSheetSet; returns its id."""
+    setting = doc.PrintManager.ViewSheetSetting
+    existing = sheet_sets.document_sets(doc).get(name)
+    views = ViewSet()
+    for sheet in sheets:
+        views.Insert(sheet)
+
+    t = Transaction(doc, "RevitPAD save_sheet_set")
+    t.Start()
+    try:
+        if existing is not None:
+            setting.CurrentViewSheetSet = existing
+            setting.CurrentViewSheetSet.Views = views
+            setting.Save()
+        else:
+            setting.CurrentViewSheetSet = setting.InSession
+            setting.CurrentViewSheetSet.Views = views
+            setting.SaveAs(name)
+        t.Commit()
+    except Exception:
+        t.RollBack()
+        raise
+    return setting.CurrentViewSheetSet.Id.IntegerValue
+
+
+def delete_document_set(doc, name):
+    existing = sheet_sets.document_sets(doc).get(name)
+    if existing is None:
+        return False
+    setting = doc.PrintManager.ViewSheetSetting
+    t = Transaction(doc, "RevitPAD delete_sheet_set")
+    t.Start()
+    try:
+        setting.CurrentViewSheetSet = existing
+        setting.Delete()
+        t.Commit()
+    except Exception:
+        t.RollBack()
+        raise
+    return True
+
+
+def run(uiapp, data, log):
+    """
+    Saves a named sheet set for later export commands ("sheet_set").
+    "name" plus "sheet_ids" (and/or existing "sheet_set" names to copy).
+    "store": "bridge" (default, a file next to the bridge data) or
+    "document" (a Revit ViewSheetSet, visible in the Print dialog).
+    "delete": true removes the named set instead.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        name = data.get("name")
+        store = data.get("store", "bridge")
+
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        if not name:
+            raise Exception("Missing 'name' for save_sheet_set")
+        if store not in sheet_sets.STORES:
+            raise Exception("Unknown store: {0}".format(store))
+
+        if data.get("delete"):
+            if store == "document":
+                deleted = delete_document_set(doc, name)
+            else:
+                deleted = sheet_sets.delete_bridge_set(doc, name)
+            result = {"name": name, "store": store, "deleted": deleted}
+        else:
+            sheets, missing = sheet_sets.resolve_sheets(doc, data)
+            if not sheets:
+                raise Exception("No valid sheets for sheet set {0}".format(name))
+            result = {"name": name, "store": store, "count": len(sheets), "missing": missing}
+            if store == "document":
+                result["id"] = save_document_set(doc, name, sheets)
+            else:
+                sheet_sets.save_bridge_set(doc, name, [s.Id.IntegerValue for s in sheets])
+
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+        log("save_sheet_set: {0}".format(result))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in save_sheet_set: {0}".format(e))
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+from Autodesk.Revit.DB import (
+    BuiltInParameter,
+    ElementId,
+    FailureProcessingResult,
+    FailureSeverity,
+    IFailuresPreprocessor,
+    StorageType,
+    Transaction,
+    TransactionGroup
+)
+
+from element_query import parameter_value
+from response_writer import open_response
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+BATCH_SIZE = 500
+GROUP_NAME = "RevitPAD set_parameters"
+
+
+class ParameterResolver(object):
+    """
+    Finds the parameter an update names. Where it was found (instance or
+    type, and its Definition / BuiltInParameter) is remembered per
+    (type, category, name), so the next element of the same type goes
+    straight to get_Parameter instead of a LookupParameter name scan.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._cache = {}
+        self.lookups = 0
+
+    def _type_of(self, element):
+        type_id = element.GetTypeId()
+        if type_id is None or type_id.IntegerValue < 0:
+            return None
+        return self.doc.GetElement(type_id)
+
+    def _search(self, element, name, builtin):
+        if builtin is not None:
+            param = element.get_Parameter(builtin)
+            return param, builtin
+        param = element.LookupParameter(name)
+        return param, param.Definition if param is not None else None
+
+    def resolve(self, element, name=None, builtin=None):
+        """(parameter, "instance" | "type") or (None, None)."""
+        cat = element.Category
+        type_id = element.GetTypeId()
+        key = (type_id.IntegerValue if type_id is not None else None,
+               cat.Id.IntegerValue if cat is not None else None,
+               name if builtin is None else str(builtin))
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            where, lookup = cached
+            if where is None:
+                return None, None
+            target = element if where == "instance" else self._type_of(element)
+            param = target.get_Parameter(lookup) if target is not None else None
+            if param is not None:
+                return param, where
+
+        self.lookups += 1
+        param, lookup = self._search(element, name, builtin)
+        where = "instance"
+        if param is None:
+            element_type = self._type_of(element)
+            if element_type is not None:
+                param, lookup = self._search(element_type, name, builtin)
+                where = "type"
+        self._cache[key] = (where if param is not None else None, lookup)
+        return (param, where) if param is not None else (None, None)
+
+
+class BatchFailures(IFailuresPreprocessor):
+    """
+    Failure handling for one batch transaction. Warnings are deleted, so
+    no dialog waits for a click, and kept per failing element id; any
+    error rolls the batch back instead of prompting.
+    """
+
+    def __init__(self):
+        self.warnings = {}
+        self.errors = {}
+
+    def PreprocessFailures(self, failuresAccessor):
+        rollback = False
+        for message in failuresAccessor.GetFailureMessages():
+            if message.GetSeverity() == FailureSeverity.Warning:
+                failuresAccessor.DeleteWarning(message)
+                found = self.warnings
+            else:
+                rollback = True
+                found = self.errors
+            text = message.GetDescriptionText()
+            for element_id in message.GetFailingElementIds() or [None]:
+                key = element_id.IntegerValue if element_id is not None else None
+                found.setdefault(key, []).append(text)
+        if rollback:
+            return FailureProcessingResult.ProceedWithRollBack
+        return FailureProcessingResult.Continue
+
+    def attach(self, transaction):
+        options = transaction.GetFailureHandlingOptions()
+        options.SetFailuresPreprocessor(self)
+        options.SetClearAfterRollback(True)
+        transaction.SetFailureHandlingOptions(options)
+
+
+def convert(param, value):
+    st = param.StorageType
+    if st == StorageType.String:
+        return u"" if value is None else u"{0}".format(value)
+    if st == StorageType.Integer:
+        return int(value)
+    if st == StorageType.Double:
+        return float(value)
+    if st == StorageType.ElementId:
+        return ElementId(int(value))
+    raise ValueError("Parameter has no value storage")
+
+
+def element_key(value):
+    """Update id as the int failure messages report, None if not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_update(doc, resolver, elements, update):
+    """Sets one value; returns the status ("ok" / "unchanged")."""
+    element_id = int(update["id"])
+    element = elements.get(element_id)
+    if element is None:
+        element = elements[element_id] = doc.GetElement(ElementId(element_id))
+    if element is None:
+        raise ValueError("No element with id {0}".format(element_id))
+
+    builtin = None
+    if update.get("builtin"):
+        builtin = getattr(BuiltInParameter, update["builtin"], None)
+        if builtin is None:
+            raise ValueError("Unknown built-in parameter: {0}".format(update["builtin"]))
+    elif not update.get("parameter"):
+        raise ValueError("Update needs 'parameter' or 'builtin'")
+
+    param, where = resolver.resolve(element, update.get("parameter"), builtin)
+    if param is None:
+        raise ValueError("Parameter not found")
+    if where == "type" and not update.get("on_type"):
+        raise ValueError("Type parameter; pass \"on_type\": true to change the type")
+    if param.IsReadOnly:
+        raise ValueError("Parameter is read-only")
+
+    value = convert(param, update.get("value"))
+    current = parameter_value(param)
+    if current == (value.IntegerValue if isinstance(value, ElementId) else value):
+        return "unchanged"
+    if not param.Set(value):
+        raise ValueError("Revit rejected the value")
+    return "ok"
+
+
+def run(uiapp, data, log):
+    """
+    Bulk parameter write. "updates" is a list of
+    {"id": element id, "parameter": name | "builtin": BuiltInParameter,
+     "value": ..., "on_type": true to allow changing a type parameter}.
+    Updates run inside one TransactionGroup, committed in transactions
+    of "batch_size" (default 500) and assimilated into a single undo
+    step. "atomic": true rolls everything back if any update fails.
+    Revit warnings are dismissed and listed on the item they name
+    ("warnings"); a Revit error rolls back its batch: the items it names
+    fail, the batch's other changes are "rolled_back".
+    Per-item results stream to response.json ("results"), in order.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        updates = data.get("updates") or []
+        batch_size = int(data.get("batch_size", BATCH_SIZE)) or len(updates) or 1
+        atomic = bool(data.get("atomic"))
+
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        if not updates:
+            raise Exception("Missing 'updates' for set_parameters")
+
+        start = time.time()
+        resolver = ParameterResolver(doc)
+        elements = {}
+        results = []
+        transactions = 0
+
+        group = TransactionGroup(doc, GROUP_NAME)
+        group.Start()
+        try:
+            for first in range(0, len(updates), batch_size):
+                batch = []
+                failures = BatchFailures()
+                t = Transaction(doc, "{0} {1}".format(GROUP_NAME, first // batch_size + 1))
+                failures.attach(t)
+                t.Start()
+                for index in range(first, min(first + batch_size, len(updates))):
+                    update = updates[index]
+                    result = {"index": index, "id": update.get("id")}
+                    try:
+                        result["status"] = apply_update(doc, resolver, elements, update)
+                    except Exception as e:
+                        result["status"] = "error"
+                        result["error"] = str(e)
+                    batch.append(result)
+
+                status = t.Commit()
+                transactions += 1
+                committed = str(status) == "Committed"
+                reason = "; ".join(sum(failures.errors.values(), [])) or \
+                    "Transaction not committed: {0}".format(status)
+                for result in batch:
+                    element_id = element_key(result["id"])
+                    if element_id in failures.warnings:
+                        result["warnings"] = failures.warnings[element_id]
+                    if committed or result["status"] != "ok":
+                        continue
+                    if element_id in failures.errors:
+                        result["status"] = "error"
+                        result["error"] = "; ".join(failures.errors[element_id])
+                    else:
+                        result["status"] = "rolled_back"
+                        result["error"] = "Batch rolled back: {0}".format(reason)
+                results.extend(batch)
+
+            failed = sum(1 for r in results if r["status"] in ("error", "rolled_back"))
+            if atomic and failed:
+                group.RollBack()
+                for result in results:
+                    if result["status"] == "ok":
+                        result["status"] = "rolled_back"
+            else:
+                group.Assimilate()
+        except Exception:
+            if group.HasStarted():
+                group.RollBack()
+            raise
+
+        counts = {}
+        warnings = 0
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            warnings += len(result.get("warnings", []))
+
+        with open_response(RESPONSE_PATH, data) as out:
+            out.records("results", results)
+            out.field("counts", counts)
+            out.field("warnings", warnings)
+            out.field("transactions", transactions)
+            out.field("parameter_lookups", resolver.lookups)
+            out.field("duration", round(time.time() - start, 3))
+
+        log("set_parameters: {0} updates in {1} transactions, {2}".format(
+            len(updates), transactions, counts))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in set_parameters: {0}".format(e))
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Shared collector building for generic element requests.
+#
+# Filters are applied cheapest first:
+#   1. quick filters    categories / classes / instance-vs-type
+#   2. slow filter      ElementParameterFilter for built-in parameters
+#   3. python predicate named (project / shared) parameters
+#
+#   "categories": ["OST_Walls", "OST_Doors"]
+#   "classes":    ["Wall", "FamilyInstance"]
+#   "element_types": false                   instances (default) or types
+#   "where": [{"builtin": "ALL_MODEL_MARK", "op": "begins_with", "value": "D"},
+#             {"name": "Comments", "op": "contains", "value": "fire"}]
+#   "parameters": ["Mark", "Comments"]        values added per record
+# ----------------------------------------------------------------------
+import clr
+from Autodesk.Revit import DB
+from Autodesk.Revit.DB import (
+    BuiltInCategory,
+    BuiltInParameter,
+    ElementId,
+    ElementMulticategoryFilter,
+    ElementMulticlassFilter,
+    ElementParameterFilter,
+    FilteredElementCollector,
+    ParameterFilterRuleFactory,
+    ParameterValueProvider,
+    StorageType,
+)
+
+clr.AddReference("System")
+from System import Type
+from System.Collections.Generic import List
+
+ELEMENT_FIELDS = ("id", "name", "category", "class", "type_id", "parameters")
+
+OPERATORS = ("equals", "not_equals", "contains", "begins_with", "ends_with",
+             "greater", "greater_or_equal", "less", "less_or_equal", "has_value")
+
+_RULE_FACTORIES = {
+    "equals": "CreateEqualsRule",
+    "not_equals": "CreateNotEqualsRule",
+    "contains": "CreateContainsRule",
+    "begins_with": "CreateBeginsWithRule",
+    "ends_with": "CreateEndsWithRule",
+    "greater": "CreateGreaterRule",
+    "greater_or_equal": "CreateGreaterOrEqualRule",
+    "less": "CreateLessRule",
+    "less_or_equal": "CreateLessOrEqualRule",
+}
+
+DOUBLE_EPSILON = 1e-6
+
+
+# ----------------------------------------------------------------------
+# Name resolution
+# ----------------------------------------------------------------------
+def resolve_categories(names):
+    cats = []
+    for name in names or []:
+        if not name.startswith("OST_"):
+            name = "OST_" + name
+        bic = getattr(BuiltInCategory, name, None)
+        if bic is None:
+            raise ValueError("Unknown category: {0}".format(name))
+        cats.append(bic)
+    return cats
+
+
+def resolve_classes(names):
+    classes = []
+    for name in names or []:
+        cls = getattr(DB, name, None)
+        if cls is None:
+            raise ValueError("Unknown class: {0}".format(name))
+        classes.append(cls)
+    return classes
+
+
+def resolve_builtin(name):
+    bip = getattr(BuiltInParameter, name, None)
+    if bip is None:
+        raise ValueError("Unknown built-in parameter: {0}".format(name))
+    return bip
+
+
+# ----------------------------------------------------------------------
+# Filters
+# ----------------------------------------------------------------------
+def quick_filtered(doc, data, view_id=None):
+    """Collector narrowed by the quick (index-only) filters."""
+    collector = FilteredElementCollector(doc, view_id) if view_id else FilteredElementCollector(doc)
+
+    cats = resolve_categories(data.get("categories"))
+    if len(cats) == 1:
+        collector = collector.OfCategory(cats[0])
+    elif cats:
+        collector = collector.WherePasses(ElementMulticategoryFilter(List[BuiltInCategory](cats)))
+
+    classes = resolve_classes(data.get("classes"))
+    if len(classes) == 1:
+        collector = collector.OfClass(classes[0])
+    elif classes:
+        types = List[Type]([clr.GetClrType(c) for c in classes])
+        collector = collector.WherePasses(ElementMulticlassFilter(types))
+
+    if data.get("element_types"):
+        collector = collector.WhereElementIsElementType()
+    else:
+        collector = collector.WhereElementIsNotElementType()
+
+    return collector
+
+
+def _create_rule(op, param_id, value):
+    factory = getattr(ParameterFilterRuleFactory, _RULE_FACTORIES[op])
+    if isinstance(value, float):
+        return factory(param_id, value, DOUBLE_EPSILON)
+    if isinstance(value, bool) or isinstance(value, int):
+        return factory(param_id, int(value))
+    try:
+        return factory(param_id, value)
+    except TypeError:
+        # Revit <= 2022 string rules take a case-sensitivity flag
+        return factory(param_id, value, False)
+
+
+def builtin_parameter_filter(predicates):
+    """ElementParameterFilter for the built-in parameter predicates, or None."""
+    rules = []
+    for pred in predicates:
+        if "builtin" not in pred or pred.get("op") == "has_value":
+            continue
+        param_id = ElementId(resolve_builtin(pred["builtin"]))
+        rules.append(_create_rule(pred["op"], param_id, pred.get("value")))
+    if not rules:
+        return None
+    return ElementParameterFilter(List[DB.FilterRule](rules))
+
+
+def parameter_value(param, display=False):
+    """Plain value of a parameter; display=True gives Revit's formatted text."""
+    if param is None or not param.HasValue:
+        return None
+    if display:
+        return param.AsValueString() or param.AsString()
+    st = param.StorageType
+    if st == StorageType.String:
+        return param.AsString()
+    if st == StorageType.Integer:
+        return param.AsInteger()
+    if st == StorageType.Double:
+        return param.AsDouble()
+    if st == StorageType.ElementId:
+        return param.AsElementId().IntegerValue
+    return param.AsValueString()
+
+
+def _compare(op, actual, expected):
+    if op == "has_value":
+        return actual is not None and actual != ""
+    if actual is None:
+        return op == "not_equals"
+    if op in ("contains", "begins_with", "ends_with"):
+        a = u"{0}".format(actual).lower()
+        e = u"{0}".format(expected).lower()
+        if op == "contains":
+            return e in a
+        if op == "begins_with":
+            return a.startswith(e)
+        return a.endswith(e)
+    if isinstance(actual, str) and isinstance(expected, str):
+        actual, expected = actual.lower(), expected.lower()
+    try:
+        if op == "equals":
+            return actual == expected
+        if op == "not_equals":
+            return actual != expected
+        if op == "greater":
+            return actual > expected
+        if op == "greater_or_equal":
+            return actual >= expected
+        if op == "less":
+            return actual < expected
+        if op == "less_or_equal":
+            return actual <= expected
+    except TypeError:
+        return False
+    return False
+
+
+def python_predicate(predicates):
+    """Predicate for what the native filters could not express, or None."""
+    checks = []
+    for pred in predicates:
+        if "builtin" in pred and pred.get("op") != "has_value":
+            continue
+        if "name" not in pred and "builtin" not in pred:
+            raise ValueError("Predicate needs 'name' or 'builtin': {0}".format(pred))
+        key = resolve_builtin(pred["builtin"]) if "builtin" in pred else None
+        checks.append((pred.get("name"), key, pred["op"], pred.get("value")))
+
+    if not checks:
+        return None
+
+    def passes(element):
+        for name, key, op, expected in checks:
+            param = element.get_Parameter(key) if key is not None else element.LookupParameter(name)
+            if not _compare(op, parameter_value(param), expected):
+                return False
+        return True
+
+    return passes
+
+
+def validate_predicates(predicates):
+    for pred in predicates:
+        if pred.get("op") not in OPERATORS:
+            raise ValueError("Unknown operator: {0}".format(pred.get("op")))
+
+
+def filtered_elements(doc, data, extra_filters=None, view_id=None, query=None):
+    """
+    Yields elements passing quick filters, then any extra native filters
+    (e.g. bounding box), then the slow parameter filter, then python
+    predicates. With a paged RecordQuery, elements up to its cursor are
+    dropped and the rest sorted by id before any predicate runs, so
+    predicates only run as far as the page reaches.
+    """
+    predicates = data.get("where") or []
+    validate_predicates(predicates)
+
+    collector = quick_filtered(doc, data, view_id)
+    for extra in extra_filters or []:
+        collector = collector.WherePasses(extra)
+
+    slow = builtin_parameter_filter(predicates)
+    if slow is not None:
+        collector = collector.WherePasses(slow)
+
+    elements = query.in_id_order(collector) if query is not None else collector
+    passes = python_predicate(predicates)
+    for element in elements:
+        if passes is None or passes(element):
+            yield element
+
+
+# ----------------------------------------------------------------------
+# Records
+# ----------------------------------------------------------------------
+def element_record(element, query, param_names):
+    record = {"id": element.Id.IntegerValue}
+    if query.wants("name"):
+        record["name"] = element.Name
+    if query.wants("category"):
+        cat = element.Category
+        record["category"] = cat.Name if cat is not None else None
+    if query.wants("class"):
+        record["class"] = element.GetType().Name if hasattr(element, "GetType") \
+            else element.__class__.__name__
+    if query.wants("type_id"):
+        record["type_id"] = element.GetTypeId().IntegerValue
+    if param_names and query.wants("parameters"):
+        values = {}
+        for name in param_names:
+            values[name] = parameter_value(element.LookupParameter(name))
+        record["parameters"] = values
+    return record
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Background detection of files written by another process (PDFCreator).
+#
+# A print driver writes its output after SubmitPrint() returns, possibly
+# under another name. export_sheets_to_pdf snapshots the folder, submits
+# its sheets and hands the expected files to a SettleJob; a daemon
+# thread then polls the folder while Revit carries on:
+#   appeared   a new .pdf (not there, or since rewritten, when the job
+#              started) matched to its sheet, for all sheets at once:
+#              first the expected path or file name (stem), then a file
+#              whose name has the sheet number as a whole token ("A1"
+#              matches "A1_Plan.pdf", not "A10_Sections.pdf") and no
+#              other sheet's. Anything else stays unmatched and is
+#              reported, never paired by guesswork
+#   settled    size > 0, unchanged for SETTLE_POLLS polls, and the file
+#              opens for append (the driver has let go of it)
+# When every file has settled or the timeout passes, the result (actual
+# paths, sizes, seconds) is written to <results folder>/<job>.json
+# (Data/exports), which clients poll. response.json belongs to the
+# command loop and is never written from this thread.
+# Only the filesystem is touched: no Revit API calls off the UI thread.
+# ----------------------------------------------------------------------
+import json
+import os
+import re
+import threading
+import time
+
+from response_writer import replace_file
+
+POLL_INTERVAL = 0.5
+SETTLE_POLLS = 3
+TIMEOUT = 600.0
+
+_jobs = {}
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _released(path):
+    try:
+        with open(path, "ab"):
+            return True
+    except (IOError, OSError):
+        return False
+
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0].lower()
+
+
+def _token(number):
+    """Sheet number bounded by non-alphanumerics (or the name's ends)."""
+    if not number:
+        return None
+    return re.compile(u"(?<![0-9a-z]){0}(?![0-9a-z])".format(re.escape(u"{0}".format(number))),
+                      re.IGNORECASE | re.UNICODE)
+
+
+def _write_json(path, value):
+    folder = os.path.dirname(path)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(value, f, indent=2)
+    replace_file(tmp_path, path)
+
+
+class SettleJob(object):
+    """Expected outputs of one export, watched on a background thread."""
+
+    def __init__(self, folder, results_folder, job_id, timeout=TIMEOUT,
+                 interval=POLL_INTERVAL, extension=".pdf", log=None):
+        self.folder = folder
+        self.job_id = job_id
+        self.result_path = os.path.join(results_folder, u"{0}.json".format(job_id))
+        self.timeout = timeout
+        self.interval = interval
+        self.extension = extension.lower()
+        self.log = log
+        self.items = []
+        self.done = []
+        self.extra = {}
+        self.result = None
+        # Taken before anything is printed: only files new or rewritten
+        # since then count
+        self._created = time.time()
+        self._before = {}
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                self._before[name] = _mtime(os.path.join(folder, name))
+        self._thread = None
+
+    def watch(self, items, done=(), **extra):
+        """
+        Starts the background thread for the submitted items. "done"
+        items (finished by an earlier, interrupted run) are not watched
+        but lead the reported sheets.
+        """
+        self.items = [dict(item) for item in items]
+        self.done = list(done)
+        self.extra = extra
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        _jobs[self.job_id] = self
+        self._thread.start()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    def _new_files(self, claimed):
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return []
+        found = []
+        for name in names:
+            path = os.path.join(self.folder, name)
+            if path in claimed or not name.lower().endswith(self.extension):
+                continue
+            mtime = _mtime(path)
+            if mtime is None or (name in self._before and mtime == self._before[name]):
+                continue
+            found.append((mtime, path))
+        return [path for _, path in sorted(found)]
+
+    def _match(self, pending, claimed):
+        new_files = self._new_files(claimed)
+        waiting = [item for item in pending if not item.get("actual_file")]
+
+        # Exact path or file name first, for every sheet, so a looser
+        # match never takes a file that is some sheet's own
+        stems = dict((_stem(path), path) for path in new_files)
+        for item in waiting:
+            expected = item["file"]
+            if expected in new_files:
+                self._claim(item, expected, "exact", new_files, claimed)
+            elif _stem(expected) in stems and stems[_stem(expected)] in new_files:
+                self._claim(item, stems[_stem(expected)], "name", new_files, claimed)
+
+        # Then the sheet number as a delimited token, if no other sheet
+        # still waiting has a number in that name
+        waiting = [item for item in waiting if not item.get("actual_file")]
+        patterns = [(item, _token(item.get("number"))) for item in waiting]
+        for path in list(new_files):
+            name = os.path.basename(path)
+            hits = [item for item, pattern in patterns if pattern and pattern.search(name)]
+            if len(hits) == 1 and not hits[0].get("actual_file"):
+                self._claim(hits[0], path, "number", new_files, claimed)
+
+    def _claim(self, item, path, how, new_files, claimed):
+        item["actual_file"], item["matched"] = path, how
+        claimed.add(path)
+        new_files.remove(path)
+
+    def _run(self):
+        pending = list(self.items)
+        claimed = set()
+        sizes = {}
+        deadline = self._started + self.timeout
+        while pending and time.time() < deadline:
+            self._match(pending, claimed)
+            for item in list(pending):
+                path = item.get("actual_file")
+                if not path:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                last, stable = sizes.get(path, (None, 0))
+                stable = stable + 1 if size == last and size > 0 else 0
+                sizes[path] = (size, stable)
+                if stable >= SETTLE_POLLS and _released(path):
+                    item["size"] = size
+                    item["settled_after"] = round(time.time() - self._created, 3)
+                    pending.remove(item)
+            if pending:
+                time.sleep(self.interval)
+
+        # New files no sheet could be matched to: listed for the client,
+        # and their sheets reported as unmatched rather than missing
+        unclaimed = self._new_files(claimed)
+        for item in pending:
+            if item.get("actual_file"):
+                item["error"] = "settling"
+            else:
+                item["error"] = "unmatched" if unclaimed else "not written"
+        self._finish(len(pending), unclaimed)
+
+    def _finish(self, timed_out, unclaimed):
+        result = dict(self.extra)
+        result.update({
+            "job": self.job_id,
+            "path": self.folder,
+            "sheets": self.done + self.items,
+            "settled": len(self.items) - timed_out,
+            "timed_out": timed_out,
+            "unclaimed_files": unclaimed,
+            "seconds": round(time.time() - self._created, 3),
+        })
+        self.result = result
+        try:
+            _write_json(self.result_path, result)
+            if self.log:
+                self.log("Export {0}: {1} files settled, {2} timed out -> {3}".format(
+                    self.job_id, result["settled"], timed_out, self.result_path))
+        except Exception as e:
+            if self.log:
+                self.log("Export {0}: could not write result: {1}".format(self.job_id, e))
+        finally:
+            _jobs.pop(self.job_id, None)
+
+
+def active_jobs():
+    return sorted(_jobs)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Linked model inventory (get_links).
+#
+# One record per RevitLinkType: load status, path, attachment, its
+# instances with their transforms and, when loaded, the linked
+# document's title and element count. Collected once per document and
+# kept until a link changes:
+#   load state      (type id, LinkedFileStatus) of every link type, one
+#                   quick OfClass pass per request. Load / unload / reload
+#                   do not reliably raise DocumentChanged, so this is
+#                   checked even when the version is unchanged
+#   change log      added / modified / deleted link types or instances
+#                   (placing, moving, removing links)
+# Anything else in the change log leaves the inventory as it is.
+# ----------------------------------------------------------------------
+import math
+import os
+
+from Autodesk.Revit.DB import (
+    ElementId,
+    FilteredElementCollector,
+    ModelPathUtils,
+    RevitLinkInstance,
+    RevitLinkType
+)
+
+import change_tracker
+
+# Beyond this many added ids, rebuilding is cheaper than checking them
+MAX_INCREMENTAL = 500
+DECIMALS = 6
+
+_inventories = {}
+
+
+def load_states(doc):
+    return tuple(sorted((t.Id.IntegerValue, str(t.GetLinkedFileStatus()))
+                        for t in FilteredElementCollector(doc).OfClass(RevitLinkType)))
+
+
+def _xyz(point):
+    return [round(point.X, DECIMALS), round(point.Y, DECIMALS), round(point.Z, DECIMALS)]
+
+
+def instance_record(instance):
+    transform = instance.GetTotalTransform()
+    basis_x = transform.BasisX
+    return {
+        "id": instance.Id.IntegerValue,
+        "name": instance.Name,
+        "origin": _xyz(transform.Origin),
+        "basis_x": _xyz(basis_x),
+        "basis_y": _xyz(transform.BasisY),
+        "basis_z": _xyz(transform.BasisZ),
+        "rotation": round(math.degrees(math.atan2(basis_x.Y, basis_x.X)), DECIMALS),
+    }
+
+
+def link_path(link_type):
+    """(user-visible path, path type) or (None, None) for non-file links."""
+    try:
+        reference = link_type.GetExternalFileReference()
+        path = ModelPathUtils.ConvertModelPathToUserVisiblePath(reference.GetAbsolutePath())
+        return path, str(reference.GetPathType())
+    except Exception:
+        return None, None
+
+
+def link_record(link_type, instances):
+    status = link_type.GetLinkedFileStatus()
+    path, path_type = link_path(link_type)
+    record = {
+        "id": link_type.Id.IntegerValue,
+        "name": link_type.Name,
+        "status": str(status),
+        "loaded": str(status) == "Loaded",
+        "path": path,
+        "path_type": path_type,
+        "attachment": str(link_type.AttachmentType),
+        "nested": link_type.IsNestedLink,
+        "instance_count": len(instances),
+        "instances": [instance_record(i) for i in instances],
+        "title": None,
+        "elements": None,
+        "file_size": None,
+    }
+    try:
+        if path and os.path.exists(path):
+            record["file_size"] = os.path.getsize(path)
+    except Exception:
+        pass
+
+    link_doc = None
+    for instance in instances:
+        link_doc = instance.GetLinkDocument()
+        if link_doc is not None:
+            break
+    if link_doc is not None:
+        record["title"] = link_doc.Title
+        record["elements"] = FilteredElementCollector(link_doc) \
+            .WhereElementIsNotElementType().GetElementCount()
+    return record
+
+
+class LinkInventory(object):
+    def __init__(self):
+        self.version = None
+        self.states = None
+        self.links = None
+        self.refresh_kind = None
+        self._ids = set()
+
+    def full(self, doc):
+        instances = {}
+        for instance in FilteredElementCollector(doc).OfClass(RevitLinkInstance):
+            instances.setdefault(instance.GetTypeId().IntegerValue, []).append(instance)
+
+        self.links = []
+        self._ids = set()
+        for link_type in FilteredElementCollector(doc).OfClass(RevitLinkType):
+            placed = instances.get(link_type.Id.IntegerValue, [])
+            self.links.append(link_record(link_type, placed))
+            self._ids.add(link_type.Id.IntegerValue)
+            self._ids.update(i.Id.IntegerValue for i in placed)
+        self.links.sort(key=lambda r: r["name"].lower())
+        self.refresh_kind = "full"
+
+    def refresh(self, doc):
+        current = change_tracker.doc_version(doc)
+        states = load_states(doc)
+        if self.links is not None and states == self.states and self._unchanged(doc, current):
+            self.refresh_kind = "cached"
+        else:
+            self.full(doc)
+        self.states = states
+        self.version = current
+
+    def _unchanged(self, doc, current):
+        """True if the change log since the last build touches no link."""
+        if current is None or self.version is None:
+            return False
+        changes = change_tracker.changes_since(doc, self.version)
+        if changes is None:
+            return False
+        added, modified, deleted = changes
+        if self._ids.intersection(modified) or self._ids.intersection(deleted):
+            return False
+        if len(added) > MAX_INCREMENTAL:
+            return False
+        for element_id in added:
+            element = doc.GetElement(ElementId(element_id))
+            if isinstance(element, (RevitLinkInstance, RevitLinkType)):
+                return False
+        return True
+
+
+def inventory_for(doc):
+    """The document's link inventory, rebuilt only if a link changed."""
+    key = change_tracker.doc_key(doc)
+    inventory = _inventories.get(key)
+    if inventory is None:
+        inventory = _inventories[key] = LinkInventory()
+    inventory.refresh(doc)
+    return inventory
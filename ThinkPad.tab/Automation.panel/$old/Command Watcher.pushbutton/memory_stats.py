@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Per-command memory accounting.
+# tracemalloc on the CPython engine; .NET GC / process counters under
+# IronPython (totals only, no allocation sites).
+# A probe that switches tracing on switches it off again in stop(), so
+# later commands do not pay for it; the allocation sites of the last
+# measured command stay available to get_memory_top as a snapshot.
+# ----------------------------------------------------------------------
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Last measured command, reported by the heartbeat and get_memory_top
+LAST_COMMAND = None
+# Traces at the end of that command, kept when its probe stopped tracing
+LAST_SNAPSHOT = None
+
+
+def backend():
+    return "tracemalloc" if tracemalloc is not None else "clr"
+
+
+def _clr_counters():
+    from System import GC
+    from System.Diagnostics import Process
+
+    proc = Process.GetCurrentProcess()
+    return {
+        "managed": int(GC.GetTotalMemory(False)),
+        "working_set": int(proc.WorkingSet64),
+        "peak_working_set": int(proc.PeakWorkingSet64),
+    }
+
+
+class MemoryProbe(object):
+    """Measures allocation peak and retained delta around one run()."""
+
+    def __init__(self, command):
+        self.command = command
+        self.before = None
+        self.started_tracing = False
+
+    def start(self):
+        if tracemalloc is not None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.started_tracing = True
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            self.before = tracemalloc.get_traced_memory()[0]
+        else:
+            self.before = _clr_counters()
+
+    def stop(self):
+        global LAST_COMMAND, LAST_SNAPSHOT
+
+        if tracemalloc is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            stats = {
+                "backend": "tracemalloc",
+                "peak_bytes": peak - self.before,
+                "retained_bytes": current - self.before,
+                "traced_bytes": current,
+            }
+            if self.started_tracing:
+                LAST_SNAPSHOT = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+        else:
+            # PeakWorkingSet64 is the process high-water mark since Revit
+            # started, not this command's peak: reported as it is
+            after = _clr_counters()
+            stats = {
+                "backend": "clr",
+                "retained_bytes": after["managed"] - self.before["managed"],
+                "working_set_bytes": after["working_set"],
+                "peak_working_set_bytes": after["peak_working_set"],
+            }
+
+        stats["command"] = self.command
+        stats["timestamp"] = time.time()
+        LAST_COMMAND = stats
+        return stats
+
+
+def top_allocations(limit=25, group_by="lineno"):
+    """Current top allocation sites (tracemalloc only)."""
+    if tracemalloc is None:
+        return {"backend": "clr", "supported": False, "totals": _clr_counters()}
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        snapshot = tracemalloc.take_snapshot()
+    elif LAST_SNAPSHOT is not None:
+        snapshot = LAST_SNAPSHOT
+    else:
+        return {
+            "backend": "tracemalloc",
+            "supported": True,
+            "tracing": False,
+            "sites": [],
+        }
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+    sites = []
+    for stat in snapshot.statistics(group_by)[:limit]:
+        frame = stat.traceback[0]
+        sites.append({
+            "site": "{0}:{1}".format(frame.filename, frame.lineno),
+            "size_bytes": stat.size,
+            "count": stat.count,
+        })
+
+    result = {
+        "backend": "tracemalloc",
+        "supported": True,
+        "tracing": tracing,
+        "sites": sites,
+    }
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        result.update({"traced_bytes": current, "peak_bytes": peak})
+    else:
+        # Sites as they were when the last measured command finished
+        result["snapshot_of"] = LAST_COMMAND and LAST_COMMAND["command"]
+    return result
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Model health counts (get_model_stats).
+#
+# Every figure is a quick-filter GetElementCount(): category, class and
+# instance/type filters are answered from Revit's element index without
+# expanding a single element. Per category that is
+#   FilteredElementCollector(doc).OfCategoryId(id)
+#       .WhereElementIsNotElementType().GetElementCount()
+#
+# Counts are cached per document against the change_tracker version:
+#   unchanged document    served from the cache, no API calls
+#   only modifications    counts still valid
+#   additions             the added elements' categories are recounted
+#   deletions             recounted by the categories remembered for
+#                         elements seen being added; otherwise all
+# The file size is not cached: saving changes it without a document
+# change, so get_model_stats reads it on every request.
+# ----------------------------------------------------------------------
+import os
+
+from Autodesk.Revit.DB import (
+    BuiltInCategory,
+    ElementId,
+    FilteredElementCollector,
+    ViewSchedule
+)
+
+import change_tracker
+
+# Beyond this many added ids, recounting everything is cheaper
+MAX_INCREMENTAL = 500
+
+_stats = {}
+
+
+def count_category(doc, category_id):
+    return FilteredElementCollector(doc).OfCategoryId(category_id) \
+        .WhereElementIsNotElementType().GetElementCount()
+
+
+def count_totals(doc):
+    def of_category(bic):
+        return FilteredElementCollector(doc).OfCategory(bic) \
+            .WhereElementIsNotElementType().GetElementCount()
+
+    return {
+        "elements": FilteredElementCollector(doc).WhereElementIsNotElementType().GetElementCount(),
+        "element_types": FilteredElementCollector(doc).WhereElementIsElementType().GetElementCount(),
+        "views": of_category(BuiltInCategory.OST_Views),
+        "sheets": of_category(BuiltInCategory.OST_Sheets),
+        "schedules": FilteredElementCollector(doc).OfClass(ViewSchedule).GetElementCount(),
+        "levels": of_category(BuiltInCategory.OST_Levels),
+        "links": of_category(BuiltInCategory.OST_RvtLinks),
+    }
+
+
+def file_size(doc):
+    path = doc.PathName
+    try:
+        return os.path.getsize(path) if path and os.path.exists(path) else None
+    except Exception:
+        return None
+
+
+class ModelStats(object):
+    def __init__(self):
+        self.version = None
+        self.categories = {}
+        self.totals = {}
+        self.refresh_kind = None
+        # id -> category id for elements seen added, so deleting them
+        # can be attributed without a full recount
+        self._added = {}
+
+    def full(self, doc):
+        self.categories = {}
+        for category in doc.Settings.Categories:
+            try:
+                self.categories[category.Id.IntegerValue] = (category.Name, count_category(doc, category.Id))
+            except Exception:
+                pass
+        self.totals = count_totals(doc)
+        self.refresh_kind = "full"
+
+    def refresh(self, doc):
+        current = change_tracker.doc_version(doc)
+        if self.version is not None and current is not None and self.version == current:
+            self.refresh_kind = "cached"
+            return
+        changes = None
+        if self.version is not None and current is not None:
+            changes = change_tracker.changes_since(doc, self.version)
+
+        if changes is None or len(changes[0]) > MAX_INCREMENTAL:
+            self.full(doc)
+        else:
+            self._incremental(doc, changes)
+        self.version = current
+
+    def _incremental(self, doc, changes):
+        added, modified, deleted = changes
+        if not added and not deleted:
+            self.refresh_kind = "modified"
+            return
+        if any(d not in self._added for d in deleted):
+            self.full(doc)
+            return
+
+        dirty = set(self._added.pop(d) for d in deleted)
+        dirty.discard(None)
+        for element_id in added:
+            element = doc.GetElement(ElementId(element_id))
+            category = element.Category if element is not None else None
+            self._added[element_id] = category.Id.IntegerValue if category is not None else None
+            if category is not None:
+                dirty.add(category.Id.IntegerValue)
+                if category.Id.IntegerValue not in self.categories:
+                    self.categories[category.Id.IntegerValue] = (category.Name, 0)
+
+        for cat_id in dirty:
+            name, _ = self.categories[cat_id]
+            self.categories[cat_id] = (name, count_category(doc, ElementId(cat_id)))
+        self.totals = count_totals(doc)
+        self.refresh_kind = "incremental"
+
+
+def stats_for(doc):
+    """The document's stats, refreshed to its current version."""
+    key = change_tracker.doc_key(doc)
+    stats = _stats.get(key)
+    if stats is None:
+        stats = _stats[key] = ModelStats()
+    stats.refresh(doc)
+    return stats
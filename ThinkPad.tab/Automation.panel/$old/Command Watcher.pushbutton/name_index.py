@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# In-memory name search over views and sheets (find_views).
+#
+# Every view name, sheet number and sheet name is reduced to lowercase
+# letters and digits ("A-101 Level 1" -> "a101level1") and indexed by
+#   trigram         "a10", "101", ... -> ids   (queries of 3+ chars)
+#   word prefix     1-2 leading chars of each word / field -> ids
+# A query intersects the trigram sets (smallest first), then ranks the
+# few candidates: exact field > field prefix > word prefix > substring.
+#
+# One index per document, built on first use and then patched from the
+# change_tracker log (added / modified / deleted ids) instead of a new
+# collector pass. Without change tracking it is rebuilt per query.
+# ----------------------------------------------------------------------
+import heapq
+import re
+
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector, View, ViewSheet
+
+import change_tracker
+
+GRAM = 3
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_WORD = 2
+RANK_SUBSTRING = 3
+
+_indexes = {}
+
+
+def _words(text):
+    return [w for w in _NON_ALNUM.split((text or u"").lower()) if w]
+
+
+def compact(text):
+    return u"".join(_words(text))
+
+
+def _grams(text):
+    return set(text[i:i + GRAM] for i in range(len(text) - GRAM + 1))
+
+
+class NameIndex(object):
+    def __init__(self):
+        self.builds = 0
+        self.updates = 0
+        self._clear()
+
+    def _clear(self):
+        self.version = None
+        self.records = {}
+        # id -> [(compact field, [words])]
+        self._fields = {}
+        # id -> keys it was filed under, for removal
+        self._keys = {}
+        self._grams = {}
+        self._short = {}
+
+    # ------------------------------------------------------------------
+    def build(self, doc):
+        self._clear()
+        for view in FilteredElementCollector(doc).OfClass(View):
+            self._add(view)
+        self.version = change_tracker.doc_version(doc)
+        self.builds += 1
+
+    def refresh(self, doc):
+        """Brings the index up to the document's current change version."""
+        current = change_tracker.doc_version(doc)
+        if self.version is not None and current is not None and self.version == current:
+            return
+        changes = None
+        if self.version is not None and current is not None:
+            changes = change_tracker.changes_since(doc, self.version)
+        if changes is None:
+            self.build(doc)
+            return
+
+        added, modified, deleted = changes
+        for element_id in deleted:
+            self._remove(element_id)
+        for element_id in added | modified:
+            # Non-view changes (walls, parameters, ...) are skipped without
+            # an API call; only views can be in or enter the index
+            if element_id not in self.records and element_id not in added:
+                continue
+            self._remove(element_id)
+            view = doc.GetElement(ElementId(element_id))
+            if isinstance(view, View):
+                self._add(view)
+        self.version = current
+        self.updates += 1
+
+    # ------------------------------------------------------------------
+    def _add(self, view):
+        try:
+            if view.IsTemplate:
+                return
+            view_id = view.Id.IntegerValue
+            record = {"id": view_id, "name": view.Name, "view_type": str(view.ViewType)}
+            texts = [view.Name]
+            if isinstance(view, ViewSheet):
+                record["kind"] = "sheet"
+                record["sheet_number"] = view.SheetNumber
+                texts.insert(0, view.SheetNumber)
+            else:
+                record["kind"] = "view"
+        except Exception:
+            return
+
+        fields, keys = [], set()
+        for text in texts:
+            words = _words(text)
+            field = u"".join(words)
+            if not field:
+                continue
+            fields.append((field, words))
+            keys.update(_grams(field))
+            for word in words + [field]:
+                keys.add(word[:1])
+                keys.add(word[:2])
+
+        self.records[view_id] = record
+        self._fields[view_id] = fields
+        self._keys[view_id] = keys
+        for key in keys:
+            table = self._grams if len(key) == GRAM else self._short
+            table.setdefault(key, set()).add(view_id)
+
+    def _remove(self, view_id):
+        if self.records.pop(view_id, None) is None:
+            return
+        self._fields.pop(view_id, None)
+        for key in self._keys.pop(view_id, ()):
+            table = self._grams if len(key) == GRAM else self._short
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(view_id)
+                if not ids:
+                    del table[key]
+
+    # ------------------------------------------------------------------
+    def _candidates(self, query):
+        if len(query) < GRAM:
+            return self._short.get(query, set())
+        sets = []
+        for gram in _grams(query):
+            ids = self._grams.get(gram)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def _rank(self, view_id, query):
+        best = None
+        for field, words in self._fields[view_id]:
+            if field == query:
+                rank = RANK_EXACT
+            elif field.startswith(query):
+                rank = RANK_PREFIX
+            elif any(w.startswith(query) for w in words):
+                rank = RANK_WORD
+            elif query in field:
+                rank = RANK_SUBSTRING
+            else:
+                continue
+            score = (rank, len(field))
+            if best is None or score < best:
+                best = score
+        return best
+
+    def search(self, text, limit=20, kinds=None):
+        """(matches, total): top `limit` records by rank, then shortest."""
+        query = compact(text)
+        if not query:
+            return [], 0
+        scored = []
+        for view_id in self._candidates(query):
+            record = self.records[view_id]
+            if kinds and record["kind"] not in kinds:
+                continue
+            score = self._rank(view_id, query)
+            if score is not None:
+                scored.append((score, record["name"], view_id))
+
+        matches = []
+        for (rank, _), _, view_id in heapq.nsmallest(limit, scored):
+            match = dict(self.records[view_id])
+            match["rank"] = rank
+            matches.append(match)
+        return matches, len(scored)
+
+
+def index_for(doc):
+    """The document's index, built or updated to the current version."""
+    key = change_tracker.doc_key(doc)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = NameIndex()
+    index.refresh(doc)
+    return index
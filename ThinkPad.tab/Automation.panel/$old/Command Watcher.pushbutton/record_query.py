@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Field projection, filtering and cursor pagination for read requests.
+#
+#   "fields": ["id", "sheet_number"]           only these keys
+#   "filter": {"view_type": "FloorPlan",       equality
+#              "sheet_number": ["A-1", "A-2"], any of
+#              "name": {"contains": "level"},  case-insensitive substring
+#              "sheet_name": {"prefix": "GA"}} case-insensitive prefix
+#   "limit": 500, "cursor": 123456             page size / resume point
+#
+# Cursors are element ids: a page resumes after the last id returned.
+# Collectors do not promise id order, so paged requests walk their
+# elements through in_id_order() before building any record. Request
+# modules ask wants() before computing a field, so unrequested fields
+# cost no API calls.
+# ----------------------------------------------------------------------
+
+
+class RecordQuery(object):
+
+    def __init__(self, data, all_fields):
+        self.all_fields = list(all_fields)
+
+        fields = data.get("fields")
+        if fields:
+            unknown = [f for f in fields if f not in self.all_fields]
+            if unknown:
+                raise ValueError("Unknown fields: {0}".format(", ".join(unknown)))
+            self.fields = list(fields)
+        else:
+            self.fields = None
+
+        self.filter = data.get("filter") or {}
+        unknown = [f for f in self.filter if f not in self.all_fields]
+        if unknown:
+            raise ValueError("Unknown filter fields: {0}".format(", ".join(unknown)))
+
+        self.limit = int(data.get("limit") or 0)
+        cursor = data.get("cursor")
+        self.cursor = int(cursor) if cursor not in (None, "") else None
+        self.next_cursor = None
+
+    @property
+    def paged(self):
+        return bool(self.limit) or self.cursor is not None
+
+    # ------------------------------------------------------------------
+    def wants(self, *names):
+        """True if any of these fields must be computed (output or filter)."""
+        if self.fields is None:
+            return True
+        for name in names:
+            if name in self.fields or name in self.filter:
+                return True
+        return False
+
+    def in_id_order(self, elements):
+        """
+        Elements after the cursor, sorted by id, when paging; unpaged
+        requests keep collector order. Only ids are read, so the sort
+        costs no API calls and earlier pages are dropped before it.
+        """
+        if not self.paged:
+            return elements
+        return sorted((e for e in elements if not self.skip_id(e.Id.IntegerValue)),
+                      key=lambda e: e.Id.IntegerValue)
+
+    def skip_id(self, element_id):
+        """True for elements at or before the cursor (skip before any work)."""
+        return self.cursor is not None and element_id <= self.cursor
+
+    def matches(self, record):
+        for name, cond in self.filter.items():
+            value = record.get(name)
+            if isinstance(cond, dict):
+                text = u"{0}".format(value if value is not None else "").lower()
+                if "contains" in cond and cond["contains"].lower() not in text:
+                    return False
+                if "prefix" in cond and not text.startswith(cond["prefix"].lower()):
+                    return False
+            elif isinstance(cond, list):
+                if value not in cond:
+                    return False
+            elif value != cond:
+                return False
+        return True
+
+    def project(self, record):
+        if self.fields is None:
+            return record
+        return dict((f, record.get(f)) for f in self.fields)
+
+    def apply(self, records):
+        """
+        Filter, project and page a record stream in ascending id order
+        (see in_id_order); sets next_cursor.
+        """
+        returned = 0
+        last_id = None
+        for record in records:
+            if not self.matches(record):
+                continue
+            if self.limit and returned >= self.limit:
+                # One more match exists: the page is full
+                self.next_cursor = last_id
+                return
+            returned += 1
+            last_id = record.get("id")
+            yield self.project(record)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+
+import name_index
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    """
+    Search-as-you-type over view names, sheet numbers and sheet names.
+    "query" is matched ignoring case, spaces and punctuation; the top
+    "limit" (default 20) matches come back ranked, each with the "id"
+    open_view_by_id takes. "kinds": ["sheet"] or ["view"] narrows it.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        text = data.get("query")
+
+        if not text:
+            raise Exception("Missing 'query' field for find_views")
+
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        index = name_index.index_for(doc)
+        matches, total = index.search(text, int(data.get("limit", 20)), data.get("kinds"))
+
+        result = {
+            "matches": matches,
+            "total": total,
+            "indexed": len(index.records),
+            "index_version": index.version
+        }
+
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+
+        log("find_views '{0}': {1} of {2} matches".format(text, len(matches), total))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in find_views: {0}".format(e))
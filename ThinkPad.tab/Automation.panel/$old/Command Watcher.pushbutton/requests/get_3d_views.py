@@ -6,9 +6,28 @@ from Autodesk.Revit.DB import (
     View3D
 )
 
-REVIT_PAD_FOLDER = r"C:\PADApps\RevitPAD"
-DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
-RESPONSE_PATH = os.path.join(DATA_FOLDER, "response.json")
+import change_tracker
+from response_writer import open_response
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def iter_views(doc):
+    collector = FilteredElementCollector(doc).OfClass(View3D)
+
+    for v in collector:
+        try:
+            # Skip templates
+            if v.IsTemplate:
+                continue
+
+            yield {
+                "id": v.Id.IntegerValue,
+                "name": v.Name,
+                "is_perspective": bool(v.IsPerspective),
+                "view_type": str(v.ViewType)
+            }
+        except Exception:
+            pass
 
 
 def run(uiapp, data, log):
@@ -22,30 +41,17 @@ def run(uiapp, data, log):
         if not os.path.exists(DATA_FOLDER):
             os.makedirs(DATA_FOLDER)
 
-        views = []
-        collector = FilteredElementCollector(doc).OfClass(View3D)
+        # Conditional request: unchanged document, same arguments
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("get_3d_views: not modified ({0})".format(version))
+            return
 
-        for v in collector:
-            try:
-                # Skip templates
-                if v.IsTemplate:
-                    continue
-
-                views.append({
-                    "id": v.Id.IntegerValue,
-                    "name": v.Name,
-                    "is_perspective": bool(v.IsPerspective),
-                    "view_type": str(v.ViewType)
-                })
-            except Exception:
-                pass
-
-        result = {"views": views}
-
-        with open(RESPONSE_PATH, "w") as f:
-            json.dump(result, f, indent=2)
+        with open_response(RESPONSE_PATH, data) as out:
+            count = out.records("views", iter_views(doc))
+            out.field("version", version)
 
-        log("Returned 3D views: {0}".format(len(views)))
+        log("Returned 3D views: {0}".format(count))
 
     except Exception as e:
         with open(RESPONSE_PATH, "w") as f:
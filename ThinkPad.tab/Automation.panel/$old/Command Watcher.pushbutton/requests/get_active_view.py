@@ -2,9 +2,7 @@
 import os
 import json
 
-REVIT_PAD_FOLDER = r"C:\PADApps\RevitPAD"
-DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
-RESPONSE_PATH = os.path.join(DATA_FOLDER, "response.json")
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
 
 
 def run(uiapp, data, log):
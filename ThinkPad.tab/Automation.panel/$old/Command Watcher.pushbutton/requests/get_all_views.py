@@ -6,55 +6,84 @@ from Autodesk.Revit.DB import (
     View
 )
 
-REVIT_PAD_FOLDER = r"C:\PADApps\RevitPAD"
-DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
-RESPONSE_PATH = os.path.join(DATA_FOLDER, "response.json")
+import change_tracker
+from record_query import RecordQuery
+from response_writer import open_response, response_format
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
 
 
-def run(uiapp, data, log):
-    """
-    Returns ALL non-template views in the model.
-    Grouped by general view type.
-    """
-    try:
-        doc = uiapp.ActiveUIDocument.Document
-
-        if not os.path.exists(DATA_FOLDER):
-            os.makedirs(DATA_FOLDER)
-
-        # Prepare container for grouping
-        views_by_type = {}
-
-        collector = FilteredElementCollector(doc).OfClass(View)
+VIEW_FIELDS = ("id", "name", "view_type")
 
-        for v in collector:
-            try:
-                if v.IsTemplate:
-                    continue
 
-                vtype = str(v.ViewType)
+def iter_views(doc, query):
+    """Yields one record per non-template view."""
+    collector = FilteredElementCollector(doc).OfClass(View)
 
-                if vtype not in views_by_type:
-                    views_by_type[vtype] = []
+    for v in query.in_id_order(collector):
+        try:
+            view_id = v.Id.IntegerValue
+            if query.skip_id(view_id) or v.IsTemplate:
+                continue
 
-                views_by_type[vtype].append({
-                    "id": v.Id.IntegerValue,
-                    "name": v.Name,
-                    "view_type": vtype
-                })
+            record = {"id": view_id}
+            if query.wants("name"):
+                record["name"] = v.Name
+            if query.wants("view_type"):
+                record["view_type"] = str(v.ViewType)
+            yield record
 
-            except Exception:
-                pass
+        except Exception:
+            pass
 
-        result = {"views": views_by_type}
 
-        with open(RESPONSE_PATH, "w") as f:
-            json.dump(result, f, indent=2)
-
-        log("Returned all views grouped by type.")
+def run(uiapp, data, log):
+    """
+    Returns ALL non-template views in the model.
+    Grouped by general view type ("format": "json", the default), or one
+    view per line with "format": "ndjson". "fields", "filter", "limit"
+    and "cursor" select and page views (see record_query.py); records
+    without a view_type field are grouped under "views". "encoding"
+    selects a gzip or binary rows body (see response_writer.py).
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        fmt = response_format(data)
+
+        # --- Conditional request: unchanged document, same arguments ---
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("get_all_views: not modified ({0})".format(version))
+            return
+
+        query = RecordQuery(data, VIEW_FIELDS)
+
+        with open_response(RESPONSE_PATH, data) as out:
+            views = query.apply(iter_views(doc, query))
+            if fmt == "ndjson":
+                count = out.records("views", views)
+            else:
+                # Grouping needs every view of a type before the type's
+                # list closes; only the small records are held
+                views_by_type = {}
+                for record in views:
+                    views_by_type.setdefault(record.get("view_type", "views"), []).append(record)
+
+                count = 0
+                out.begin_object("views")
+                for vtype, records in views_by_type.items():
+                    count += out.records(vtype, records)
+                out.end_object()
+
+            if query.paged:
+                out.field("next_cursor", query.next_cursor)
+            out.field("version", version)
+
+        log("Returned all views grouped by type: {0} views.".format(count))
 
     except Exception as e:
         # Return error
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
         with open(RESPONSE_PATH, "w") as f:
             json.dump({"error": str(e)}, f, indent=2)
 
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import json
+
+import change_tracker
+from element_query import filtered_elements
+from response_writer import open_response
+from bridge_paths import RESPONSE_PATH
+
+
+PRECISION = 4
+
+
+def iter_boxes(doc, data, precision):
+    """id, category and model bounding box of each selected element."""
+    categories = {}
+    for element in filtered_elements(doc, data):
+        try:
+            box = element.get_BoundingBox(None)
+            if box is None:
+                continue
+            lo, hi = box.Min, box.Max
+            cat = element.Category
+            cat_id = cat.Id.IntegerValue if cat is not None else None
+            if cat_id not in categories:
+                categories[cat_id] = cat.Name if cat is not None else None
+            yield {
+                "id": element.Id.IntegerValue,
+                "category": categories[cat_id],
+                "bbox": [round(lo.X, precision), round(lo.Y, precision), round(lo.Z, precision),
+                         round(hi.X, precision), round(hi.Y, precision), round(hi.Z, precision)]
+            }
+        except Exception:
+            pass
+
+
+def run(uiapp, data, log):
+    """
+    Streams axis-aligned model bounding boxes for spatial queries on the
+    client (see tools/spatial_index.py): one record per element with
+    "bbox": [min x, min y, min z, max x, max y, max z] in feet.
+    Elements are selected as in query_elements ("categories", "classes",
+    "where"); elements without geometry are left out. "precision" sets
+    the decimals kept (default 4).
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("get_bounding_boxes: not modified ({0})".format(version))
+            return
+
+        precision = int(data.get("precision", PRECISION))
+
+        with open_response(RESPONSE_PATH, data) as out:
+            count = out.records("elements", iter_boxes(doc, data, precision))
+            out.field("units", "ft")
+            out.field("version", version)
+
+        log("Returned bounding boxes: {0} elements".format(count))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_bounding_boxes: {0}".format(e))
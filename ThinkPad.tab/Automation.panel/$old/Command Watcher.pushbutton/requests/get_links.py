@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+
+import link_inventory
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    """
+    Linked Revit models: status, path, attachment, instances with their
+    transforms and, for loaded links, the linked document's title and
+    element count, so a client can decide whether an export should
+    include links. Served from a cache rebuilt only when a link is
+    loaded, unloaded, placed, moved or removed. "instances": false
+    leaves out the per-instance transforms.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        start = time.time()
+
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        inventory = link_inventory.inventory_for(doc)
+        links = inventory.links
+        if data.get("instances") is False:
+            links = [dict((k, v) for k, v in r.items() if k != "instances") for r in links]
+
+        loaded = [r for r in inventory.links if r["loaded"]]
+        result = {
+            "links": links,
+            "count": len(links),
+            "loaded": len(loaded),
+            "instance_count": sum(r["instance_count"] for r in inventory.links),
+            "loaded_elements": sum(r["elements"] or 0 for r in loaded),
+            "refresh": inventory.refresh_kind,
+            "duration": round(time.time() - start, 4),
+        }
+
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+
+        log("Returned links: {0} ({1} loaded, {2})".format(
+            result["count"], result["loaded"], inventory.refresh_kind))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_links: {0}".format(e))
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+
+import memory_stats
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    """
+    Returns the current top allocation sites plus the memory figures of
+    the last command that ran with "memory": true.
+    Sites are live while tracing is on, otherwise those recorded when
+    the last measured command finished.
+    """
+    try:
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        limit = int(data.get("limit", 25))
+        result = memory_stats.top_allocations(limit, data.get("group_by", "lineno"))
+        result["last_command"] = memory_stats.LAST_COMMAND
+
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+
+        log("Returned memory top allocation sites: {0}".format(len(result.get("sites", []))))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_memory_top: {0}".format(e))
@@ -2,7 +2,8 @@
 import os, json
 from Autodesk.Revit.DB import ModelPathUtils
 
-DATA_FOLDER = r"C:\PADApps\RevitPAD\Data"
+from bridge_paths import DATA_FOLDER
+
 RESPONSE = os.path.join(DATA_FOLDER, "response.json")
 
 def run(uiapp, data, log):
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+
+import change_tracker
+import model_stats
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    """
+    Model health figures for dashboards: element count per category,
+    view / sheet / schedule / level / link totals and file size.
+    Counts come from quick-filter GetElementCount() calls and are cached
+    until the document changes (see model_stats.py), so polling is cheap.
+    Categories with no elements are left out unless "all_categories"
+    is true; "categories" (names) narrows the list.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        # Saving changes path and size without a DocumentChanged event:
+        # both are read every time and are part of the version tag
+        path = doc.PathName
+        size = model_stats.file_size(doc)
+        tagged = dict(data, file=[path, size])
+        version, unchanged = change_tracker.not_modified(doc, tagged, RESPONSE_PATH)
+        if unchanged:
+            log("get_model_stats: not modified ({0})".format(version))
+            return
+
+        stats = model_stats.stats_for(doc)
+        wanted = set(data.get("categories") or [])
+        categories = {}
+        for name, count in stats.categories.values():
+            if wanted and name not in wanted:
+                continue
+            if count or data.get("all_categories"):
+                categories[name] = count
+
+        result = {
+            "title": doc.Title,
+            "path": path,
+            "is_workshared": bool(doc.IsWorkshared),
+            "file_size": size,
+            "totals": stats.totals,
+            "categories": categories,
+            "refresh": stats.refresh_kind,
+            "version": version
+        }
+
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+
+        log("Returned model stats ({0}): {1} elements".format(
+            stats.refresh_kind, stats.totals.get("elements")))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_model_stats: {0}".format(e))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import json
+
+import change_tracker
+import schedule_tables
+from response_writer import open_response
+from bridge_paths import RESPONSE_PATH
+
+
+def select_schedules(doc, data):
+    ids = set(data.get("schedule_ids") or [])
+    names = set(data.get("names") or [])
+    for schedule in schedule_tables.list_schedules(doc, bool(data.get("include_internal"))):
+        if ids and schedule.Id.IntegerValue not in ids:
+            continue
+        if names and schedule.Name not in names:
+            continue
+        yield schedule
+
+
+def run(uiapp, data, log):
+    """
+    Lists schedules and extracts their tables in one call.
+    "rows" streams {"schedule": id, "cells": [...]} one body row at a
+    time; "schedules" follows with id, name, title, columns and row
+    count per schedule. "schedule_ids" / "names" select schedules,
+    "include_data": false lists them only, "include_internal": true adds
+    revision and keynote schedules. Bodies are cached until the document
+    changes; "cache": false always reads them from Revit.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        include_data = data.get("include_data", True)
+        use_cache = data.get("cache", True)
+
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("get_schedules: not modified ({0})".format(version))
+            return
+
+        schedules = []
+
+        def rows():
+            for schedule in select_schedules(doc, data):
+                hit = schedule_tables.cached(doc, schedule) if use_cache and include_data else None
+                columns = schedule_tables.headings(schedule)
+                info = {
+                    "id": schedule.Id.IntegerValue,
+                    "name": schedule.Name,
+                    "title": hit[0] if hit else schedule_tables.title(schedule),
+                    "columns": columns,
+                    "rows": 0
+                }
+                schedules.append(info)
+                if not include_data:
+                    continue
+
+                info["cached"] = hit is not None
+                collected = [] if hit is None and use_cache else None
+                for cells in hit[1] if hit else schedule_tables.iter_body(schedule, columns):
+                    if collected is not None:
+                        collected.append(cells)
+                    info["rows"] += 1
+                    yield {"schedule": info["id"], "cells": cells}
+                if collected is not None:
+                    schedule_tables.store(doc, schedule, info["title"], collected)
+
+        with open_response(RESPONSE_PATH, data) as out:
+            count = out.records("rows", rows())
+            out.field("schedules", schedules)
+            out.field("version", version)
+
+        log("Returned {0} schedules, {1} rows.".format(len(schedules), count))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_schedules: {0}".format(e))
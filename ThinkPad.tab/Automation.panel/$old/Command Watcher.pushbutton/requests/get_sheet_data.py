@@ -8,67 +8,140 @@ from Autodesk.Revit.DB import (
     Revision
 )
 
-REVIT_PAD_FOLDER = r"C:\PADApps\RevitPAD"
-DATA_FOLDER = os.path.join(REVIT_PAD_FOLDER, "Data")
-RESPONSE_PATH = os.path.join(DATA_FOLDER, "response.json")
+import change_tracker
+from record_query import RecordQuery
+from response_writer import open_response
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+SHEET_FIELDS = ("id", "sheet_number", "sheet_name", "revision_number",
+                "revision_description", "revision_date", "revision_ids")
+REVISION_FIELDS = ("revision_number", "revision_description", "revision_date")
+
+
+def build_revision_index(doc):
+    """One pass over all revisions: {id: Revision} and {number: [Revision]}."""
+    by_id = {}
+    by_number = {}
+    for rev in FilteredElementCollector(doc).OfClass(Revision):
+        by_id[rev.Id.IntegerValue] = rev
+        by_number.setdefault(rev.RevisionNumber, []).append(rev)
+    return by_id, by_number
+
+
+def revision_record(rev):
+    return {
+        "id": rev.Id.IntegerValue,
+        "revision_number": rev.RevisionNumber,
+        "revision_description": rev.Description,
+        "revision_date": rev.RevisionDate,
+        "sequence": rev.SequenceNumber,
+    }
+
+
+def iter_sheets(doc, query, revs_by_id, revs_by_number, with_matrix):
+    """Yields one record per sheet, computing only the fields the query needs."""
+    collector = FilteredElementCollector(doc).OfCategory(
+        BuiltInCategory.OST_Sheets
+    )
+    with_revisions = query.wants(*REVISION_FIELDS)
+
+    for s in query.in_id_order(collector):
+        try:
+            sheet_id = s.Id.IntegerValue
+            if query.skip_id(sheet_id):
+                continue
+
+            record = {"id": sheet_id}
+            if query.wants("sheet_number"):
+                record["sheet_number"] = s.SheetNumber
+            if query.wants("sheet_name"):
+                record["sheet_name"] = s.Name
+            if not (with_revisions or with_matrix):
+                yield record
+                continue
+
+            # --- Current revision number ---
+            current_rev_num = None
+            if with_revisions:
+                rev_param = s.get_Parameter(BuiltInParameter.SHEET_CURRENT_REVISION)
+                current_rev_num = rev_param.AsString() if rev_param else None
+                if not current_rev_num:
+                    current_rev_num = None
+
+            rev_desc = None
+            rev_date = None
+            sheet_rev_ids = []
+
+            if current_rev_num or with_matrix:
+                sheet_rev_ids = [r.IntegerValue for r in s.GetAllRevisionIds()]
+
+            # --- Match the Revision element (on this sheet, same number) ---
+            if current_rev_num:
+                for rev in revs_by_number.get(current_rev_num, []):
+                    if rev.Id.IntegerValue in sheet_rev_ids:
+                        rev_desc = rev.Description
+                        rev_date = rev.RevisionDate
+                        break
+
+            if with_revisions:
+                record["revision_number"] = current_rev_num
+                record["revision_description"] = rev_desc
+                record["revision_date"] = rev_date
+            if with_matrix:
+                record["revision_ids"] = [r for r in sheet_rev_ids if r in revs_by_id]
+
+            yield record
+
+        except Exception:
+            pass
 
 
 def run(uiapp, data, log):
     """
     Request handler: returns all Revit sheets and revision metadata.
     Writes output to response.json for BlueTree to read.
+    Pass "revision_matrix": true to also get every revision and the
+    revision ids placed on each sheet; "format": "ndjson" for one
+    record per line, "encoding": "gzip" / "rows" for a compressed or
+    binary body (see response_writer.py). "fields", "filter", "limit" and "cursor" select
+    and page sheets (see record_query.py).
     """
     try:
         doc = uiapp.ActiveUIDocument.Document
+        with_matrix = bool(data.get("revision_matrix"))
 
-        if not os.path.exists(DATA_FOLDER):
-            os.makedirs(DATA_FOLDER)
-
-        sheets_out = []
-
-        collector = FilteredElementCollector(doc).OfCategory(
-            BuiltInCategory.OST_Sheets
-        )
+        # --- Conditional request: unchanged document, same arguments ---
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("get_sheet_data: not modified ({0})".format(version))
+            return
 
-        for s in collector:
-            try:
-                # --- Current revision number ---
-                rev_param = s.get_Parameter(BuiltInParameter.SHEET_CURRENT_REVISION)
-                current_rev_num = rev_param.AsString() if rev_param else None
-                if not current_rev_num:
-                    current_rev_num = None
+        query = RecordQuery(data, SHEET_FIELDS)
+        if with_matrix and query.fields is not None and "revision_ids" not in query.fields:
+            query.fields.append("revision_ids")
 
-                rev_desc = None
-                rev_date = None
-
-                # --- Match the Revision element ---
-                if current_rev_num:
-                    for rev_id in s.GetAllRevisionIds():
-                        rev = doc.GetElement(rev_id)
-                        if isinstance(rev, Revision) and rev.RevisionNumber == current_rev_num:
-                            rev_desc = rev.Description
-                            rev_date = rev.RevisionDate
-                            break
-
-                sheets_out.append({
-                    "id": s.Id.IntegerValue,
-                    "sheet_number": s.SheetNumber,
-                    "sheet_name": s.Name,
-                    "revision_number": current_rev_num,
-                    "revision_description": rev_desc,
-                    "revision_date": rev_date
-                })
-
-            except Exception:
-                pass
-
-        # --- Write request result ---
-        result = {"sheets": sheets_out}
+        # --- Revisions collected once, looked up in memory per sheet ---
+        revs_by_id, revs_by_number = {}, {}
+        if with_matrix or query.wants(*REVISION_FIELDS):
+            revs_by_id, revs_by_number = build_revision_index(doc)
 
-        with open(RESPONSE_PATH, "w") as f:
-            json.dump(result, f, indent=2)
+        # --- Stream request result ---
+        with open_response(RESPONSE_PATH, data) as out:
+            sheets = iter_sheets(doc, query, revs_by_id, revs_by_number, with_matrix)
+            count = out.records("sheets", query.apply(sheets))
+            if query.paged:
+                out.field("next_cursor", query.next_cursor)
+            out.field("version", version)
+            if with_matrix:
+                revisions = sorted(revs_by_id.values(), key=lambda r: r.SequenceNumber)
+                out.field("revisions", [revision_record(r) for r in revisions])
 
-        log("Returned sheet data: {0} sheets".format(len(sheets_out)))
+        log("Returned sheet data: {0} sheets".format(count))
 
     except Exception as e:
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
         log("Error in get_sheet_data: {0}".format(e))
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+
+import sheet_sets
+from bridge_paths import DATA_FOLDER, RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    """
+    Lists the named sheet sets export commands accept as "sheet_set":
+    bridge-stored sets and the model's ViewSheetSets, with sheet counts.
+    "name" also returns that set's sheet ids.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+
+        if not os.path.exists(DATA_FOLDER):
+            os.makedirs(DATA_FOLDER)
+
+        result = {"sheet_sets": sheet_sets.list_sets(doc)}
+        name = data.get("name")
+        if name:
+            ids = sheet_sets.set_ids(doc, name)
+            if ids is None:
+                raise Exception("Unknown sheet set: {0}".format(name))
+            result["sheet_ids"] = ids
+
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+
+        log("Returned sheet sets: {0}".format(len(result["sheet_sets"])))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_sheet_sets: {0}".format(e))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import json
+
+import change_tracker
+import sheet_graph
+from response_writer import open_response
+from bridge_paths import RESPONSE_PATH
+
+
+DIRECTIONS = ("both", "sheets", "views")
+
+
+def iter_sheets(graph, sheet_ids):
+    viewports = {}
+    for vp_id, (sheet_id, _) in graph.viewports.items():
+        viewports.setdefault(sheet_id, []).append(vp_id)
+    for sheet_id in sheet_ids if sheet_ids is not None else sorted(graph.sheet_views):
+        yield {
+            "id": sheet_id,
+            "views": list(graph.sheet_views.get(sheet_id, [])),
+            "viewports": sorted(viewports.get(sheet_id, []))
+        }
+
+
+def iter_views(graph, view_ids):
+    for view_id in view_ids if view_ids is not None else sorted(graph.view_sheets):
+        yield {"id": view_id, "sheets": list(graph.view_sheets.get(view_id, []))}
+
+
+def run(uiapp, data, log):
+    """
+    Which views are placed on which sheets, in both directions, from one
+    cached pass over viewports (see sheet_graph.py).
+    "direction": "sheets" / "views" returns one side only; "sheet_ids" /
+    "view_ids" narrow each side. With "changed_since" set to a previous
+    response's "change_token", "changed_sheets" lists the sheets whose
+    viewports, placed views or view-owned elements changed since; it is
+    null when any sheet may have changed (model elements changed, other
+    session, log too short) and every sheet must be treated as changed.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        direction = data.get("direction", "both")
+        if direction not in DIRECTIONS:
+            raise Exception("Unknown direction: {0}".format(direction))
+
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("get_sheet_view_graph: not modified ({0})".format(version))
+            return
+
+        graph = sheet_graph.graph_for(doc)
+
+        with open_response(RESPONSE_PATH, data) as out:
+            if direction in ("both", "sheets"):
+                out.records("sheets", iter_sheets(graph, data.get("sheet_ids")))
+            if direction in ("both", "views"):
+                out.records("views", iter_views(graph, data.get("view_ids")))
+            if "changed_since" in data:
+                changes = change_tracker.changes_since_token(doc, data["changed_since"])
+                changed = None if changes is None else graph.changed_sheets(doc, changes)
+                out.field("changed_sheets", None if changed is None else sorted(changed))
+            out.field("change_token", change_tracker.change_token(doc))
+            out.field("version", version)
+
+        log("Returned sheet/view graph: {0} sheets, {1} placed views.".format(
+            len(graph.sheet_views), len(graph.view_sheets)))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in get_sheet_view_graph: {0}".format(e))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import json
+
+import change_tracker
+from element_query import ELEMENT_FIELDS, element_record, filtered_elements
+from record_query import RecordQuery
+from response_writer import open_response
+from bridge_paths import RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    """
+    Generic element query: categories, classes and parameter predicates
+    are turned into collector filters (quick first, slow last), then
+    only matching elements are returned.
+    See element_query.py for the arguments; "fields", "limit",
+    "cursor", "format" and "encoding" work as in get_all_views.
+    An element whose data cannot be read (e.g. a parameter that throws)
+    is listed in "failed" with its error instead of ending the query.
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("query_elements: not modified ({0})".format(version))
+            return
+
+        query = RecordQuery(data, ELEMENT_FIELDS)
+        param_names = data.get("parameters") or []
+        # Elements whose record could not be read, reported, not fatal
+        failed = []
+
+        def records():
+            for element in filtered_elements(doc, data, query=query):
+                element_id = element.Id.IntegerValue
+                try:
+                    record = element_record(element, query, param_names)
+                except Exception as e:
+                    failed.append({"id": element_id, "error": str(e)})
+                    continue
+                yield record
+
+        with open_response(RESPONSE_PATH, data) as out:
+            count = out.records("elements", query.apply(records()))
+            out.field("failed", failed)
+            if query.paged:
+                out.field("next_cursor", query.next_cursor)
+            out.field("version", version)
+
+        log("query_elements returned {0} elements ({1} failed).".format(count, len(failed)))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in query_elements: {0}".format(e))
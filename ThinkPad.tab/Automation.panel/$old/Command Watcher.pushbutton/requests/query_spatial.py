@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import json
+from Autodesk.Revit.DB import (
+    BoundingBoxContainsPointFilter,
+    BoundingBoxIntersectsFilter,
+    BoundingBoxIsInsideFilter,
+    ElementId,
+    Outline,
+    XYZ
+)
+
+import change_tracker
+from element_query import ELEMENT_FIELDS, element_record, filtered_elements
+from record_query import RecordQuery
+from response_writer import open_response
+from bridge_paths import RESPONSE_PATH
+
+
+SPATIAL_FIELDS = ELEMENT_FIELDS + ("bbox",)
+MODES = ("intersects", "inside")
+
+
+def reference_box(doc, data):
+    """(min XYZ, max XYZ, reference id) from "box" or "element_id"."""
+    if data.get("box"):
+        x0, y0, z0, x1, y1, z1 = [float(v) for v in data["box"]]
+        return XYZ(min(x0, x1), min(y0, y1), min(z0, z1)), XYZ(max(x0, x1), max(y0, y1), max(z0, z1)), None
+
+    element_id = data.get("element_id")
+    element = doc.GetElement(ElementId(int(element_id))) if element_id else None
+    if element is None:
+        raise Exception("No element found with id {0}".format(element_id))
+    box = element.get_BoundingBox(None)
+    if box is None:
+        raise Exception("Element {0} has no bounding box".format(element_id))
+    grow = float(data.get("expand", 0.0))
+    lo, hi = box.Min, box.Max
+    return (XYZ(lo.X - grow, lo.Y - grow, lo.Z - grow),
+            XYZ(hi.X + grow, hi.Y + grow, hi.Z + grow),
+            int(element_id))
+
+
+def spatial_filter(doc, data):
+    """Bounding-box quick filter for the request, and the id to leave out."""
+    tolerance = float(data.get("tolerance", 0.0))
+    if data.get("point"):
+        x, y, z = [float(v) for v in data["point"]]
+        return BoundingBoxContainsPointFilter(XYZ(x, y, z), tolerance), None
+
+    mode = data.get("mode", "intersects")
+    if mode not in MODES:
+        raise Exception("Unknown mode: {0}".format(mode))
+    lo, hi, reference_id = reference_box(doc, data)
+    outline = Outline(lo, hi)
+    if mode == "inside":
+        return BoundingBoxIsInsideFilter(outline, tolerance), reference_id
+    return BoundingBoxIntersectsFilter(outline, tolerance), reference_id
+
+
+def run(uiapp, data, log):
+    """
+    Elements near a box, a point or another element, found by Revit's
+    bounding-box quick filters in one collector pass.
+    Give "box": [min x, y, z, max x, y, z] (feet), "element_id" (its box,
+    grown by "expand" feet) or "point": [x, y, z]. "mode" is
+    "intersects" (default) or "inside"; "tolerance" widens the test.
+    The reference element itself is left out. "categories", "classes"
+    and "where" narrow the result as in query_elements; "fields",
+    "limit" and "cursor" project and page it ("bbox" is an extra field).
+    Elements that cannot be read are listed in "failed".
+    """
+    try:
+        doc = uiapp.ActiveUIDocument.Document
+
+        version, unchanged = change_tracker.not_modified(doc, data, RESPONSE_PATH)
+        if unchanged:
+            log("query_spatial: not modified ({0})".format(version))
+            return
+
+        query = RecordQuery(data, SPATIAL_FIELDS)
+        param_names = data.get("parameters") or []
+        bbox_filter, reference_id = spatial_filter(doc, data)
+        failed = []
+
+        def records():
+            for element in filtered_elements(doc, data, extra_filters=[bbox_filter], query=query):
+                element_id = element.Id.IntegerValue
+                if element_id == reference_id:
+                    continue
+                try:
+                    record = element_record(element, query, param_names)
+                    if query.wants("bbox"):
+                        box = element.get_BoundingBox(None)
+                        record["bbox"] = [box.Min.X, box.Min.Y, box.Min.Z,
+                                          box.Max.X, box.Max.Y, box.Max.Z] if box else None
+                except Exception as e:
+                    failed.append({"id": element_id, "error": str(e)})
+                    continue
+                yield record
+
+        with open_response(RESPONSE_PATH, data) as out:
+            count = out.records("elements", query.apply(records()))
+            out.field("failed", failed)
+            if query.paged:
+                out.field("next_cursor", query.next_cursor)
+            out.field("version", version)
+
+        log("query_spatial returned {0} elements ({1} failed).".format(count, len(failed)))
+
+    except Exception as e:
+        with open(RESPONSE_PATH, "w") as f:
+            json.dump({"error": str(e)}, f, indent=2)
+        log("Error in query_spatial: {0}".format(e))
@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Streaming response writer.
+# Request modules yield records and the writer serialises them one at a
+# time, so a response is never held twice in memory (dicts + one big
+# json.dump string). Output goes to <path>.tmp and is renamed into place
+# when complete, so BlueTree never reads a half-written response.
+#
+#   json   (default) {"sheets":[{...},{...}],"revisions":[...]}
+#          compact separators, no indentation
+#   ndjson one record per line; top-level fields as {"_meta": {...}} lines
+#
+# "encoding" picks how the body is stored:
+#   json   (default) the body is response.json itself
+#   gzip   json / ndjson body gzip-compressed to response.json.gz
+#   rows   binary rows with a shared string table, response.json.rows
+# For gzip and rows, response.json is a small header written after the
+# body is complete:
+#   {"encoding": "gzip", "format": "json", "body_path": "...",
+#    "raw_bytes": 1234567, "encoded_bytes": 98765}
+#
+# rows layout: b"RPR1" then frames, each starting with one tag byte
+#   S <len><utf-8>      define the next string table entry
+#   O <key>             begin object            (key = string index)
+#   L <key>             begin list of records
+#   C <name>            add a column to the current list
+#   R <value>*          record, one value per column defined so far
+#   V <value>           non-record list item
+#   F <key><value>      field of the current object
+#   E                   end object / list
+# values: N null, T / X true / false, I zigzag varint, D float64 LE,
+#         s <index> table string, U <len><utf-8> inline string,
+#         J <len><json> nested value, M missing column
+# Lengths and indexes are unsigned LEB128 varints. read_response()
+# decodes all three encodings.
+# ----------------------------------------------------------------------
+import gzip
+import json
+import os
+import struct
+
+FORMATS = ("json", "ndjson")
+ENCODINGS = ("json", "gzip", "rows")
+SEPARATORS = (",", ":")
+
+BODY_SUFFIX = {"gzip": ".gz", "rows": ".rows"}
+GZIP_LEVEL = 6
+ROWS_MAGIC = b"RPR1"
+# Beyond this many distinct strings, values are written inline
+MAX_STRINGS = 65536
+
+try:
+    _INTEGER_TYPES = (int, long)
+    _STRING_TYPES = (str, unicode)
+except NameError:  # CPython 3 (tools/)
+    _INTEGER_TYPES = (int,)
+    _STRING_TYPES = (str,)
+
+
+def response_format(data):
+    fmt = (data.get("format") or "json").lower()
+    if fmt not in FORMATS:
+        raise ValueError("Unknown response format: {0}".format(fmt))
+    return fmt
+
+
+def response_encoding(data):
+    encoding = (data.get("encoding") or "json").lower()
+    if encoding not in ENCODINGS:
+        raise ValueError("Unknown response encoding: {0}".format(encoding))
+    if encoding == "rows" and response_format(data) != "json":
+        raise ValueError("rows encoding replaces format; drop \"format\"")
+    return encoding
+
+
+def open_response(path, data, ensure_ascii=True):
+    """Writer for the request's format and encoding."""
+    encoding = response_encoding(data)
+    if encoding == "rows":
+        return RowsWriter(path)
+    return ResponseWriter(path, response_format(data), ensure_ascii, encoding)
+
+
+def replace_file(src, dst):
+    """os.replace for IronPython 2.7 (rename fails on Windows if dst exists)."""
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+        return
+    if os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+def _write_json(path, value):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(value, f)
+    replace_file(tmp_path, path)
+
+
+class ResponseWriter(object):
+    """Incremental JSON / NDJSON emitter. Use as a context manager."""
+
+    def __init__(self, path, fmt="json", ensure_ascii=True, encoding="json"):
+        if fmt not in FORMATS:
+            raise ValueError("Unknown response format: {0}".format(fmt))
+        if encoding not in ("json", "gzip"):
+            raise ValueError("Unknown response encoding: {0}".format(encoding))
+        self._setup(path, fmt, encoding)
+        self.ensure_ascii = ensure_ascii
+        # json mode: one "first element written?" flag per open container
+        self._stack = []
+
+    def _setup(self, path, fmt, encoding):
+        self.path = path
+        self.fmt = fmt
+        self.encoding = encoding
+        self.body_path = path + BODY_SUFFIX.get(encoding, "")
+        self.tmp_path = self.body_path + ".tmp"
+        self.bytes_written = 0
+        self._f = None
+
+    # ------------------------------------------------------------------
+    def __enter__(self):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        if self.encoding == "gzip":
+            self._f = gzip.GzipFile(self.tmp_path, "wb", GZIP_LEVEL)
+        else:
+            self._f = open(self.tmp_path, "wb")
+        self._begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._end()
+            self._f.close()
+            replace_file(self.tmp_path, self.body_path)
+            if self.body_path != self.path:
+                # Header last: a reader never sees it before the body
+                _write_json(self.path, self.header())
+        else:
+            self._f.close()
+            try:
+                os.remove(self.tmp_path)
+            except Exception:
+                pass
+        return False
+
+    def _begin(self):
+        if self.fmt == "json":
+            self._write("{")
+            self._stack.append(False)
+
+    def _end(self):
+        if self.fmt == "json":
+            self._write("}")
+
+    def header(self):
+        return {
+            "encoding": self.encoding,
+            "format": self.fmt,
+            "body_path": self.body_path,
+            "raw_bytes": self.bytes_written,
+            "encoded_bytes": os.path.getsize(self.body_path),
+        }
+
+    # ------------------------------------------------------------------
+    def _write(self, text):
+        if isinstance(text, bytearray):
+            text = bytes(text)
+        elif not isinstance(text, bytes):
+            text = text.encode("utf-8")
+        self._f.write(text)
+        self.bytes_written += len(text)
+
+    def _dumps(self, value):
+        return json.dumps(value, separators=SEPARATORS, ensure_ascii=self.ensure_ascii)
+
+    def _comma(self):
+        if self._stack[-1]:
+            self._write(",")
+        self._stack[-1] = True
+
+    def _key(self, key):
+        self._comma()
+        self._write(self._dumps(key) + ":")
+
+    # ------------------------------------------------------------------
+    def field(self, key, value):
+        """A top-level (or current object) field."""
+        if self.fmt == "ndjson":
+            self._write(self._dumps({"_meta": {key: value}}) + "\n")
+            return
+        self._key(key)
+        self._write(self._dumps(value))
+
+    def begin_object(self, key):
+        if self.fmt == "json":
+            self._key(key)
+            self._write("{")
+            self._stack.append(False)
+
+    def begin_list(self, key):
+        if self.fmt == "json":
+            self._key(key)
+            self._write("[")
+            self._stack.append(False)
+
+    def end_object(self):
+        if self.fmt == "json":
+            self._stack.pop()
+            self._write("}")
+
+    def end_list(self):
+        if self.fmt == "json":
+            self._stack.pop()
+            self._write("]")
+
+    def record(self, value):
+        if self.fmt == "ndjson":
+            self._write(self._dumps(value) + "\n")
+            return
+        self._comma()
+        self._write(self._dumps(value))
+
+    def records(self, key, iterable):
+        """Streams an iterable of records under key; returns the count."""
+        count = 0
+        self.begin_list(key)
+        for value in iterable:
+            self.record(value)
+            count += 1
+        self.end_list()
+        return count
+
+
+# ----------------------------------------------------------------------
+# Binary rows
+# ----------------------------------------------------------------------
+def _varint(n, out=None):
+    out = bytearray() if out is None else out
+    while True:
+        bits = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return out
+
+
+def _frame(tag, *parts):
+    frame = bytearray(tag)
+    for part in parts:
+        frame.extend(part)
+    return frame
+
+
+def _zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+class RowsWriter(ResponseWriter):
+    """
+    Same interface as ResponseWriter, binary rows body (see header).
+    Record keys become per-list columns and every string goes through
+    the string table, so repeated names and view types cost one varint.
+    """
+
+    def __init__(self, path):
+        self._setup(path, "rows", "rows")
+        self._strings = {}
+        # per open list: column names, column -> position
+        self._columns = []
+        self.rows = 0
+
+    def _begin(self):
+        self._write(ROWS_MAGIC)
+
+    def _end(self):
+        pass
+
+    def header(self):
+        return {
+            "encoding": self.encoding,
+            "format": self.fmt,
+            "body_path": self.body_path,
+            "encoded_bytes": os.path.getsize(self.body_path),
+            "rows": self.rows,
+            "strings": len(self._strings),
+        }
+
+    # ------------------------------------------------------------------
+    def _string(self, text):
+        """Table index for text, defining it first if new; None if full."""
+        index = self._strings.get(text)
+        if index is None:
+            if len(self._strings) >= MAX_STRINGS:
+                return None
+            index = len(self._strings)
+            self._strings[text] = index
+            raw = text.encode("utf-8")
+            self._write(_frame(b"S", _varint(len(raw)), raw))
+        return index
+
+    def _key(self, key):
+        index = self._string(key)
+        if index is None:
+            raise ValueError("String table full; cannot add key {0}".format(key))
+        return _varint(index)
+
+    def _key_frame(self, tag, key):
+        self._write(_frame(tag, self._key(key)))
+
+    def _encode(self, value, out):
+        """Appends value to out; new strings are defined on the way."""
+        if value is None:
+            out.extend(b"N")
+        elif value is True:
+            out.extend(b"T")
+        elif value is False:
+            out.extend(b"X")
+        elif isinstance(value, _INTEGER_TYPES):
+            out.extend(b"I")
+            _varint(_zigzag(value), out)
+        elif isinstance(value, float):
+            out.extend(b"D")
+            out.extend(struct.pack("<d", value))
+        elif isinstance(value, _STRING_TYPES) and self._string(value) is not None:
+            out.extend(b"s")
+            _varint(self._strings[value], out)
+        else:
+            if isinstance(value, _STRING_TYPES):
+                tag, raw = b"U", value.encode("utf-8")
+            else:
+                tag, raw = b"J", json.dumps(value, separators=SEPARATORS).encode("utf-8")
+            out.extend(tag)
+            _varint(len(raw), out)
+            out.extend(raw)
+        return out
+
+    # ------------------------------------------------------------------
+    def field(self, key, value):
+        frame = _frame(b"F", self._key(key))
+        self._write(self._encode(value, frame))
+
+    def begin_object(self, key):
+        self._key_frame(b"O", key)
+        self._columns.append(None)
+
+    def begin_list(self, key):
+        self._key_frame(b"L", key)
+        self._columns.append(([], {}))
+
+    def end_object(self):
+        self._columns.pop()
+        self._write(b"E")
+
+    def end_list(self):
+        self._columns.pop()
+        self._write(b"E")
+
+    def record(self, value):
+        if not isinstance(value, dict):
+            self._write(self._encode(value, bytearray(b"V")))
+            return
+        names, positions = self._columns[-1]
+        for name in value:
+            if name not in positions:
+                self._key_frame(b"C", name)
+                positions[name] = len(names)
+                names.append(name)
+        # Values are encoded before the frame is written, so any string
+        # definitions they need land ahead of it
+        frame = bytearray(b"R")
+        for name in names:
+            if name in value:
+                self._encode(value[name], frame)
+            else:
+                frame.extend(b"M")
+        self._write(frame)
+        self.rows += 1
+
+
+# ----------------------------------------------------------------------
+# Reading (harness scripts and Python clients)
+# ----------------------------------------------------------------------
+def _read_varint(buf, pos):
+    shift = result = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _decode_value(buf, pos, strings):
+    tag = buf[pos:pos + 1]
+    pos += 1
+    if tag == b"N":
+        return None, pos
+    if tag == b"T":
+        return True, pos
+    if tag == b"X":
+        return False, pos
+    if tag == b"M":
+        return _MISSING, pos
+    if tag == b"I":
+        n, pos = _read_varint(buf, pos)
+        return (n >> 1) ^ -(n & 1), pos
+    if tag == b"D":
+        return struct.unpack("<d", bytes(buf[pos:pos + 8]))[0], pos + 8
+    if tag == b"s":
+        index, pos = _read_varint(buf, pos)
+        return strings[index], pos
+    if tag in (b"U", b"J"):
+        length, pos = _read_varint(buf, pos)
+        text = bytes(buf[pos:pos + length]).decode("utf-8")
+        return (text if tag == b"U" else json.loads(text)), pos + length
+    raise ValueError("Bad rows value tag {0!r} at {1}".format(tag, pos - 1))
+
+
+_MISSING = object()
+
+
+def decode_rows(raw):
+    """Rebuilds the JSON-equivalent value of a rows body."""
+    buf = bytearray(raw)
+    if bytes(buf[:4]) != ROWS_MAGIC:
+        raise ValueError("Not a rows body")
+    strings = []
+    root = {}
+    # (container, columns or None)
+    stack = [(root, None)]
+    pos = 4
+    while pos < len(buf):
+        tag = buf[pos:pos + 1]
+        pos += 1
+        container, columns = stack[-1]
+        if tag == b"S":
+            length, pos = _read_varint(buf, pos)
+            strings.append(bytes(buf[pos:pos + length]).decode("utf-8"))
+            pos += length
+        elif tag in (b"O", b"L"):
+            index, pos = _read_varint(buf, pos)
+            child = {} if tag == b"O" else []
+            container[strings[index]] = child
+            stack.append((child, None if tag == b"O" else []))
+        elif tag == b"C":
+            index, pos = _read_varint(buf, pos)
+            columns.append(strings[index])
+        elif tag == b"R":
+            record = {}
+            for name in columns:
+                value, pos = _decode_value(buf, pos, strings)
+                if value is not _MISSING:
+                    record[name] = value
+            container.append(record)
+        elif tag == b"V":
+            value, pos = _decode_value(buf, pos, strings)
+            container.append(value)
+        elif tag == b"F":
+            index, pos = _read_varint(buf, pos)
+            value, pos = _decode_value(buf, pos, strings)
+            container[strings[index]] = value
+        elif tag == b"E":
+            stack.pop()
+        else:
+            raise ValueError("Bad rows frame tag {0!r} at {1}".format(tag, pos - 1))
+    return root
+
+
+def read_response(path):
+    """
+    Parsed response at path, following a gzip / rows header to its
+    body. NDJSON bodies come back as a list of line values.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw.startswith(b"{"):
+        try:
+            value = json.loads(raw.decode("utf-8"))
+        except ValueError:
+            value = None
+        if isinstance(value, dict) and "body_path" in value and value.get("encoding") in BODY_SUFFIX:
+            header = value
+            if header["encoding"] == "rows":
+                with open(header["body_path"], "rb") as f:
+                    return decode_rows(f.read())
+            with gzip.open(header["body_path"], "rb") as f:
+                raw = f.read()
+            if header["format"] == "json":
+                return json.loads(raw.decode("utf-8"))
+        elif value is not None:
+            return value
+    return [json.loads(line) for line in raw.decode("utf-8").splitlines() if line.strip()]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# ViewSchedule table extraction (get_schedules).
+#
+# Column headings come from the schedule definition (visible fields);
+# body cells from ViewSchedule.GetCellText, row by row. The heading row
+# Revit repeats at the top of the body section is skipped.
+#
+# Extracted bodies are cached per schedule against the document's
+# change_tracker version: any committed change invalidates them, an
+# unchanged document serves them without a single GetCellText call.
+# The cache is bounded by cell count, least recently used out first.
+# ----------------------------------------------------------------------
+from collections import OrderedDict
+
+from Autodesk.Revit.DB import FilteredElementCollector, SectionType, ViewSchedule
+
+import change_tracker
+
+MAX_CACHED_CELLS = 1000000
+
+# (document key, schedule id) -> (version, title, rows)
+_cache = OrderedDict()
+_cached_cells = [0]
+
+
+def list_schedules(doc, include_internal=False):
+    """Non-template schedules; revision / keynote schedules on request."""
+    for schedule in FilteredElementCollector(doc).OfClass(ViewSchedule):
+        try:
+            if schedule.IsTemplate:
+                continue
+            if not include_internal and (schedule.IsTitleblockRevisionSchedule or
+                                         schedule.IsInternalKeynoteSchedule):
+                continue
+        except Exception:
+            continue
+        yield schedule
+
+
+def headings(schedule):
+    definition = schedule.Definition
+    fields = [definition.GetField(i) for i in range(definition.GetFieldCount())]
+    return [f.ColumnHeading for f in fields if not f.IsHidden]
+
+
+def title(schedule):
+    section = schedule.GetTableData().GetSectionData(SectionType.Header)
+    if section is None or section.NumberOfRows == 0:
+        return schedule.Name
+    cells = [schedule.GetCellText(SectionType.Header, section.FirstRowNumber, c)
+             for c in range(section.FirstColumnNumber,
+                            section.FirstColumnNumber + section.NumberOfColumns)]
+    return u" ".join(c for c in cells if c) or schedule.Name
+
+
+def iter_body(schedule, columns):
+    """Body rows as lists of cell strings, heading row(s) skipped."""
+    section = schedule.GetTableData().GetSectionData(SectionType.Body)
+    if section is None:
+        return
+    first_col = section.FirstColumnNumber
+    col_range = range(first_col, first_col + section.NumberOfColumns)
+    leading = True
+    for r in range(section.FirstRowNumber, section.FirstRowNumber + section.NumberOfRows):
+        row = [schedule.GetCellText(SectionType.Body, r, c) for c in col_range]
+        if leading and row == columns:
+            continue
+        leading = False
+        yield row
+
+
+def _key(doc, schedule):
+    return change_tracker.doc_key(doc), schedule.Id.IntegerValue
+
+
+def cached(doc, schedule):
+    """(title, rows) cached for the current version, else None."""
+    version = change_tracker.doc_version(doc)
+    key = _key(doc, schedule)
+    hit = _cache.get(key)
+    if version is None or hit is None or hit[0] != version:
+        return None
+    # mark as recently used
+    _cache[key] = _cache.pop(key)
+    return hit[1], hit[2]
+
+
+def store(doc, schedule, title_text, rows):
+    version = change_tracker.doc_version(doc)
+    if version is None:
+        return
+    key = _key(doc, schedule)
+    old = _cache.pop(key, None)
+    if old is not None:
+        _cached_cells[0] -= _cells(old[2])
+    size = _cells(rows)
+    if size > MAX_CACHED_CELLS:
+        return
+    while _cache and _cached_cells[0] + size > MAX_CACHED_CELLS:
+        _, (_, _, evicted) = _cache.popitem(last=False)
+        _cached_cells[0] -= _cells(evicted)
+    _cache[key] = (version, title_text, rows)
+    _cached_cells[0] += size
+
+
+def _cells(rows):
+    return sum(len(r) for r in rows)
@@ -4,16 +4,19 @@ from pyrevit import forms
 from Autodesk.Revit.UI import ExternalEvent
 
 from CommandWatcherHelper import CommandWatcherHandler
+from bridge_paths import BRIDGE_FOLDER
 
 
 
 
 __title__ = "👀 Command Watcher"
 __doc__ = "Background watcher for file modifications using ExternalEvent."
-BRIDGE_FOLDER = r"C:\PADApps\RevitPAD\Bridge"
 WATCH_PATH = os.path.join(BRIDGE_FOLDER, "revit_command.json")
 LOCK_FILE = os.path.join(BRIDGE_FOLDER, "watcher.lock")
 
+# Set REVIT_PAD_CAPTURE to a file path to record all incoming commands
+CAPTURE_PATH = os.environ.get("REVIT_PAD_CAPTURE")
+
 
 def main():
     if not os.path.exists(WATCH_PATH):
@@ -29,7 +32,7 @@ def main():
     with open(LOCK_FILE, "w") as f:
         f.write("running")
 
-    handler = CommandWatcherHandler(WATCH_PATH)
+    handler = CommandWatcherHandler(WATCH_PATH, capture_path=CAPTURE_PATH)
     ext_event = ExternalEvent.Create(handler)
 
     handler.start(ext_event)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Sheet <-> view placement graph (get_sheet_view_graph).
+#
+# Built from one collector pass over Viewports (SheetId / ViewId), so
+# neither direction needs per-sheet GetAllPlacedViews() calls:
+#   sheet_views   sheet id -> [view ids]
+#   view_sheets   view id  -> [sheet ids]   (legends can be on many)
+# Kept per document and patched from the change_tracker log like
+# name_index. Only sheets with at least one viewport appear.
+#
+# changed_sheets() maps a change set onto sheets: a sheet is dirty when
+# it, one of its viewports, one of its placed views, or an element
+# owned by one of those views (OwnerViewId: annotations, detail items)
+# was added, modified or deleted. Model elements are not traced to the
+# views that show them (that would need a view-filtered collector per
+# placed view), so any other change - a wall, a level, a type, or a
+# deleted element the graph never saw - returns None: every sheet may
+# have changed.
+# ----------------------------------------------------------------------
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector, View, Viewport
+
+import change_tracker
+
+_graphs = {}
+
+
+class SheetViewGraph(object):
+    def __init__(self):
+        self.builds = 0
+        self.updates = 0
+        self._clear()
+
+    def _clear(self):
+        self.version = None
+        # viewport id -> (sheet id, view id)
+        self.viewports = {}
+        self.sheet_views = {}
+        self.view_sheets = {}
+        # owned elements seen in change sets: element id -> view id
+        self._owners = {}
+        # viewports removed or moved since the build: id -> old sheet id,
+        # so the sheet they left is still reported as changed
+        self._left = {}
+
+    # ------------------------------------------------------------------
+    def build(self, doc):
+        self._clear()
+        for vp in FilteredElementCollector(doc).OfClass(Viewport):
+            self._add(vp)
+        self.version = change_tracker.doc_version(doc)
+        self.builds += 1
+
+    def refresh(self, doc):
+        """Brings the graph up to the document's current change version."""
+        current = change_tracker.doc_version(doc)
+        if self.version is not None and current is not None and self.version == current:
+            return
+        changes = None
+        if self.version is not None and current is not None:
+            changes = change_tracker.changes_since(doc, self.version)
+        if changes is None:
+            self.build(doc)
+            return
+
+        added, modified, deleted = changes
+        for element_id in deleted:
+            self._remove(element_id)
+        for element_id in added | modified:
+            # Viewports can be moved to another sheet; anything else new
+            # is checked once with GetElement
+            if element_id not in self.viewports and element_id not in added:
+                continue
+            self._remove(element_id)
+            vp = doc.GetElement(ElementId(element_id))
+            if isinstance(vp, Viewport):
+                self._add(vp)
+        self.version = current
+        self.updates += 1
+
+    def _add(self, vp):
+        try:
+            vp_id = vp.Id.IntegerValue
+            sheet_id = vp.SheetId.IntegerValue
+            view_id = vp.ViewId.IntegerValue
+        except Exception:
+            return
+        self.viewports[vp_id] = (sheet_id, view_id)
+        self.sheet_views.setdefault(sheet_id, []).append(view_id)
+        self.view_sheets.setdefault(view_id, []).append(sheet_id)
+
+    def _remove(self, vp_id):
+        placed = self.viewports.pop(vp_id, None)
+        if placed is None:
+            return
+        sheet_id, view_id = placed
+        self._left[vp_id] = sheet_id
+        for table, key, value in ((self.sheet_views, sheet_id, view_id),
+                                  (self.view_sheets, view_id, sheet_id)):
+            values = table.get(key)
+            if values is not None:
+                values.remove(value)
+                if not values:
+                    del table[key]
+
+    # ------------------------------------------------------------------
+    def changed_sheets(self, doc, changes):
+        """
+        Sheet ids affected by an (added, modified, deleted) change set,
+        or None if it touches model elements and any sheet may show the
+        change. May include sheets deleted in the meantime.
+        """
+        added, modified, deleted = changes
+        dirty = set()
+
+        def touch(element_id):
+            if element_id in self.sheet_views:
+                dirty.add(element_id)
+            if element_id in self.view_sheets:
+                dirty.update(self.view_sheets[element_id])
+            if element_id in self._left:
+                dirty.add(self._left[element_id])
+            owner = self._owners.get(element_id)
+            if owner in self.view_sheets:
+                dirty.update(self.view_sheets[owner])
+
+        def known(element_id):
+            return (element_id in self.sheet_views or element_id in self.view_sheets or
+                    element_id in self._left or element_id in self._owners)
+
+        for element_id in deleted:
+            if not known(element_id):
+                return None
+            touch(element_id)
+        for element_id in added | modified:
+            touch(element_id)
+            if element_id in self.viewports:
+                # the viewport is already in the graph at its new position
+                dirty.add(self.viewports[element_id][0])
+                continue
+            if element_id in self.sheet_views or element_id in self.view_sheets:
+                continue
+            element = doc.GetElement(ElementId(element_id))
+            owner = getattr(element, "OwnerViewId", None) if element is not None else None
+            if owner is not None and owner.IntegerValue > 0:
+                self._owners[element_id] = owner.IntegerValue
+                touch(element_id)
+            elif element is not None and not isinstance(element, View):
+                # Model element: visible in views we do not trace
+                return None
+        return dirty
+
+
+def graph_for(doc):
+    """The document's graph, built or updated to the current version."""
+    key = change_tracker.doc_key(doc)
+    graph = _graphs.get(key)
+    if graph is None:
+        graph = _graphs[key] = SheetViewGraph()
+    graph.refresh(doc)
+    return graph
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Named sheet sets for the export commands.
+#
+# Instead of shipping thousands of ids with every command, a client
+# saves a set once (save_sheet_set) and then names it:
+#   {"command": "export_sheets_to_pdf", "sheet_set": "Issue 12"}
+# Names resolve against
+#   bridge store    Data/sheet_sets.json, ids per document
+#   document        Revit ViewSheetSets (the Print dialog's sheet sets)
+# bridge first. "sheet_ids" still works and may be combined with sets.
+#
+# Every id is resolved with a direct GetElement and de-duplicated with a
+# set, so selecting n sheets costs n lookups, not a collector pass with
+# a list scan per sheet.
+# ----------------------------------------------------------------------
+import json
+import os
+
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector, ViewSheet, ViewSheetSet
+
+import change_tracker
+from response_writer import replace_file
+from bridge_paths import DATA_FOLDER
+
+STORE_PATH = os.path.join(DATA_FOLDER, "sheet_sets.json")
+
+STORES = ("bridge", "document")
+
+
+def load_store():
+    """{doc key: {set name: [sheet ids]}}"""
+    if not os.path.exists(STORE_PATH):
+        return {}
+    try:
+        with open(STORE_PATH, "r") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def _write_store(store):
+    if not os.path.exists(DATA_FOLDER):
+        os.makedirs(DATA_FOLDER)
+    tmp_path = STORE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(store, f)
+    replace_file(tmp_path, STORE_PATH)
+
+
+def bridge_sets(doc):
+    return load_store().get(change_tracker.doc_key(doc), {})
+
+
+def document_sets(doc):
+    """name -> ViewSheetSet saved in the model."""
+    return dict((s.Name, s) for s in FilteredElementCollector(doc).OfClass(ViewSheetSet))
+
+
+def list_sets(doc):
+    sets = []
+    for name, ids in sorted(bridge_sets(doc).items()):
+        sets.append({"name": name, "store": "bridge", "count": len(ids)})
+    for name, sheet_set in sorted(document_sets(doc).items()):
+        sets.append({"name": name, "store": "document", "id": sheet_set.Id.IntegerValue,
+                     "count": sum(1 for view in sheet_set.Views if isinstance(view, ViewSheet))})
+    return sets
+
+
+def set_ids(doc, name):
+    """Sheet ids of a named set, or None if no store knows the name."""
+    ids = bridge_sets(doc).get(name)
+    if ids is not None:
+        return ids
+    sheet_set = document_sets(doc).get(name)
+    if sheet_set is None:
+        return None
+    return [view.Id.IntegerValue for view in sheet_set.Views if isinstance(view, ViewSheet)]
+
+
+def save_bridge_set(doc, name, ids):
+    store = load_store()
+    store.setdefault(change_tracker.doc_key(doc), {})[name] = [int(i) for i in ids]
+    _write_store(store)
+
+
+def delete_bridge_set(doc, name):
+    store = load_store()
+    sets = store.get(change_tracker.doc_key(doc), {})
+    if name not in sets:
+        return False
+    del sets[name]
+    _write_store(store)
+    return True
+
+
+def requested_ids(doc, data):
+    """
+    Ids from "sheet_ids" plus every set named in "sheet_set" (a name or
+    a list), in request order without duplicates. None if the request
+    names neither.
+    """
+    names = data.get("sheet_set") or []
+    if not isinstance(names, list):
+        names = [names]
+    if not names and not data.get("sheet_ids"):
+        return None
+
+    ids = []
+    seen = set()
+    for group in [data.get("sheet_ids") or []] + [_named(doc, n) for n in names]:
+        for sheet_id in group:
+            sheet_id = int(sheet_id)
+            if sheet_id not in seen:
+                seen.add(sheet_id)
+                ids.append(sheet_id)
+    return ids
+
+
+def _named(doc, name):
+    ids = set_ids(doc, name)
+    if ids is None:
+        raise Exception("Unknown sheet set: {0}".format(name))
+    return ids
+
+
+def resolve_sheets(doc, data):
+    """
+    (sheets, missing ids) for the request, or (None, []) if it names no
+    sheets. Ids that are gone or not sheets are reported as missing.
+    """
+    ids = requested_ids(doc, data)
+    if ids is None:
+        return None, []
+    sheets = []
+    missing = []
+    for sheet_id in ids:
+        element = doc.GetElement(ElementId(sheet_id))
+        if isinstance(element, ViewSheet):
+            sheets.append(element)
+        else:
+            missing.append(sheet_id)
+    return sheets, missing
@@ -0,0 +1,1254 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Stand-in for Autodesk.Revit.DB.
+# Pure-python, in-memory; mirrors the member names the bridge modules use.
+# Every Document keeps a `calls` counter of API round trips so benchmarks
+# can report API call counts as well as wall time.
+# ----------------------------------------------------------------------
+import os
+from collections import Counter, OrderedDict
+
+
+class _EnumValue(object):
+    def __init__(self, enum_name, name, value):
+        self.enum_name = enum_name
+        self.name = name
+        self.value = value
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return "{0}.{1}".format(self.enum_name, self.name)
+
+    def __int__(self):
+        return self.value
+
+    def __eq__(self, other):
+        return isinstance(other, _EnumValue) and \
+            (self.enum_name, self.name) == (other.enum_name, other.name)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.enum_name, self.name))
+
+
+def _enum(enum_name, names, start=0, step=1):
+    cls = type(enum_name, (object,), {})
+    for i, name in enumerate(names):
+        setattr(cls, name, _EnumValue(enum_name, name, start + i * step))
+    return cls
+
+
+# ----------------------------------------------------------------------
+# Enumerations
+# ----------------------------------------------------------------------
+BuiltInCategory = _enum("BuiltInCategory", [
+    "OST_Sheets", "OST_Views", "OST_Revisions", "OST_Viewports",
+    "OST_Schedules", "OST_TitleBlocks", "OST_Walls", "OST_Doors",
+    "OST_Windows", "OST_Rooms", "OST_Levels", "OST_Floors",
+    "OST_GenericModel", "OST_RvtLinks", "OST_ProjectInformation",
+], start=-2000000, step=-1)
+
+BuiltInParameter = _enum("BuiltInParameter", [
+    "SHEET_CURRENT_REVISION", "SHEET_NUMBER", "SHEET_NAME",
+    "VIEW_NAME", "ALL_MODEL_MARK", "ALL_MODEL_TYPE_NAME",
+    "ELEM_FAMILY_AND_TYPE_PARAM", "SHEET_CURRENT_REVISION_DESCRIPTION",
+    "SHEET_CURRENT_REVISION_DATE", "ALL_MODEL_INSTANCE_COMMENTS",
+    "FAMILY_LEVEL_PARAM",
+], start=-1000000, step=-1)
+
+ViewType = _enum("ViewType", [
+    "Undefined", "FloorPlan", "CeilingPlan", "Elevation", "ThreeD",
+    "Schedule", "DrawingSheet", "ProjectBrowser", "Report",
+    "DraftingView", "Legend", "EngineeringPlan", "AreaPlan", "Section",
+    "Detail", "CostReport", "LoadsReport", "PresureLossReport",
+    "ColumnSchedule", "PanelSchedule", "Walkthrough", "Rendering",
+])
+
+StorageType = _enum("StorageType", ["None", "Integer", "Double", "String", "ElementId"])
+
+PrintRange = _enum("PrintRange", ["Current", "Visible", "Select"])
+
+LinkedFileStatus = _enum("LinkedFileStatus", [
+    "Invalid", "Loaded", "NotFound", "Unloaded", "LocallyUnloaded",
+    "InClosedWorkset", "Imported", "NotLoaded",
+])
+AttachmentType = _enum("AttachmentType", ["Attachment", "Overlay"])
+PathType = _enum("PathType", ["Relative", "Absolute", "Server"])
+
+SectionType = _enum("SectionType", ["None", "Header", "Body", "Summary", "Footer"], start=-1)
+
+FailureSeverity = _enum("FailureSeverity", ["None", "Warning", "Error", "DocumentCorruption"])
+FailureProcessingResult = _enum("FailureProcessingResult", [
+    "Continue", "ProceedWithRollBack", "ProceedWithCommit", "WaitForUserInput",
+])
+
+
+# ----------------------------------------------------------------------
+# Ids, categories, parameters
+# ----------------------------------------------------------------------
+class ElementId(object):
+    def __init__(self, value):
+        if isinstance(value, _EnumValue):
+            value = value.value
+        self.IntegerValue = int(value)
+
+    @property
+    def Value(self):
+        return self.IntegerValue
+
+    def __eq__(self, other):
+        return isinstance(other, ElementId) and other.IntegerValue == self.IntegerValue
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.IntegerValue)
+
+    def __repr__(self):
+        return "ElementId({0})".format(self.IntegerValue)
+
+
+ElementId.InvalidElementId = ElementId(-1)
+
+
+class Category(object):
+    def __init__(self, bic, name):
+        self.BuiltInCategory = bic
+        self.Id = ElementId(bic.value)
+        self.Name = name
+
+
+_CATEGORIES = {}
+
+
+def category_for(bic):
+    if bic not in _CATEGORIES:
+        _CATEGORIES[bic] = Category(bic, bic.name.replace("OST_", ""))
+    return _CATEGORIES[bic]
+
+
+class Definition(object):
+    def __init__(self, name):
+        self.Name = name
+
+
+class Parameter(object):
+    def __init__(self, name, value=None, storage_type=None, read_only=False,
+                 builtin=None):
+        self.Definition = Definition(name)
+        self.BuiltInParameter = builtin
+        self.IsReadOnly = read_only
+        self.Element = None
+        if storage_type is None:
+            storage_type = _storage_for(value)
+        self.StorageType = storage_type
+        self._value = value
+
+    @property
+    def Id(self):
+        return ElementId(self.BuiltInParameter.value) if self.BuiltInParameter else ElementId(-1)
+
+    @property
+    def HasValue(self):
+        return self._value is not None
+
+    def AsString(self):
+        if self.StorageType == StorageType.String:
+            return self._value
+        return None
+
+    def AsInteger(self):
+        return int(self._value or 0)
+
+    def AsDouble(self):
+        return float(self._value or 0.0)
+
+    def AsElementId(self):
+        return self._value if isinstance(self._value, ElementId) else ElementId.InvalidElementId
+
+    def AsValueString(self):
+        if self._value is None:
+            return None
+        if isinstance(self._value, ElementId):
+            return str(self._value.IntegerValue)
+        return str(self._value)
+
+    def Set(self, value):
+        if self.IsReadOnly:
+            raise InvalidOperationException("Parameter is read-only")
+        doc = getattr(self.Element, "Document", None)
+        if doc is not None and not doc.IsModifiable:
+            raise InvalidOperationException("Document is not in a transaction")
+        if doc is not None:
+            doc._modified(self.Element)
+            doc._txn_undo.append((self, self._value))
+            if doc._group_undo is not None:
+                doc._group_undo.append((self, self._value))
+            severity = doc.failure_rules.get(self.Definition.Name)
+            if severity is not None:
+                doc.PostFailure(FailureMessage(
+                    severity, "{0} failure on {1}".format(severity, self.Definition.Name),
+                    [self.Element.Id]))
+        self._value = value
+        return True
+
+
+def _storage_for(value):
+    if value is None or isinstance(value, str):
+        return StorageType.String
+    if isinstance(value, bool) or isinstance(value, int):
+        return StorageType.Integer
+    if isinstance(value, float):
+        return StorageType.Double
+    if isinstance(value, ElementId):
+        return StorageType.ElementId
+    return StorageType.String
+
+
+class InvalidOperationException(Exception):
+    pass
+
+
+# ----------------------------------------------------------------------
+# Failures
+# ----------------------------------------------------------------------
+class FailureMessage(object):
+    def __init__(self, severity, text, element_ids=None):
+        self._severity = severity
+        self._text = text
+        self._element_ids = list(element_ids or [])
+
+    def GetSeverity(self):
+        return self._severity
+
+    def GetDescriptionText(self):
+        return self._text
+
+    def GetFailingElementIds(self):
+        return list(self._element_ids)
+
+
+class FailuresAccessor(object):
+    def __init__(self, doc, messages):
+        self._doc = doc
+        self._messages = list(messages)
+
+    def GetDocument(self):
+        return self._doc
+
+    def GetFailureMessages(self):
+        return list(self._messages)
+
+    def DeleteWarning(self, message):
+        if message.GetSeverity() != FailureSeverity.Warning:
+            raise InvalidOperationException("Only warnings can be deleted")
+        self._messages.remove(message)
+
+
+class IFailuresPreprocessor(object):
+    def PreprocessFailures(self, failuresAccessor):
+        raise NotImplementedError
+
+
+class FailureHandlingOptions(object):
+    def __init__(self):
+        self.preprocessor = None
+        self.clear_after_rollback = False
+
+    def SetFailuresPreprocessor(self, preprocessor):
+        self.preprocessor = preprocessor
+        return self
+
+    def SetClearAfterRollback(self, clear):
+        self.clear_after_rollback = clear
+        return self
+
+
+# ----------------------------------------------------------------------
+# Geometry
+# ----------------------------------------------------------------------
+class XYZ(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.X = float(x)
+        self.Y = float(y)
+        self.Z = float(z)
+
+    def __repr__(self):
+        return "XYZ({0}, {1}, {2})".format(self.X, self.Y, self.Z)
+
+
+class BoundingBoxXYZ(object):
+    def __init__(self, min_point=None, max_point=None):
+        self.Min = min_point or XYZ()
+        self.Max = max_point or XYZ()
+
+
+class Outline(object):
+    def __init__(self, min_point, max_point):
+        self.MinimumPoint = min_point
+        self.MaximumPoint = max_point
+
+
+class Transform(object):
+    def __init__(self, origin=None, basis_x=None, basis_y=None, basis_z=None):
+        self.Origin = origin or XYZ()
+        self.BasisX = basis_x or XYZ(1, 0, 0)
+        self.BasisY = basis_y or XYZ(0, 1, 0)
+        self.BasisZ = basis_z or XYZ(0, 0, 1)
+
+    @staticmethod
+    def CreateTranslation(vector):
+        return Transform(origin=vector)
+
+
+# ----------------------------------------------------------------------
+# Elements
+# ----------------------------------------------------------------------
+class Element(object):
+    _category = None
+
+    def __init__(self, name="", category=None, params=None, type_id=None):
+        self.Id = ElementId.InvalidElementId
+        self.Document = None
+        self.Name = name
+        bic = category or self._category
+        self.Category = category_for(bic) if bic is not None else None
+        self._type_id = type_id or ElementId.InvalidElementId
+        self.OwnerViewId = ElementId.InvalidElementId
+        self._bbox = None
+        self._params = OrderedDict()
+        for p in params or []:
+            self.add_parameter(p)
+
+    def add_parameter(self, param):
+        param.Element = self
+        key = param.BuiltInParameter or param.Definition.Name
+        self._params[key] = param
+        if param.BuiltInParameter is not None:
+            self._params[param.Definition.Name] = param
+        return param
+
+    def _count(self, name):
+        if self.Document is not None:
+            self.Document.calls[name] += 1
+
+    def get_Parameter(self, key):
+        self._count("get_Parameter")
+        if isinstance(key, Definition):
+            key = key.Name
+        return self._params.get(key)
+
+    def LookupParameter(self, name):
+        self._count("LookupParameter")
+        return self._params.get(name)
+
+    @property
+    def Parameters(self):
+        self._count("Parameters")
+        seen = []
+        for p in self._params.values():
+            if p not in seen:
+                seen.append(p)
+        return seen
+
+    def GetTypeId(self):
+        return self._type_id
+
+    def get_BoundingBox(self, view):
+        self._count("get_BoundingBox")
+        return self._bbox
+
+    @property
+    def IsValidObject(self):
+        return self.Document is not None
+
+
+class ElementType(Element):
+    pass
+
+
+class View(Element):
+    _category = BuiltInCategory.OST_Views
+
+    def __init__(self, name="", view_type=None, is_template=False, **kwargs):
+        Element.__init__(self, name, **kwargs)
+        self.ViewType = view_type or ViewType.FloorPlan
+        self.IsTemplate = is_template
+
+
+class View3D(View):
+    def __init__(self, name="", is_perspective=False, **kwargs):
+        kwargs.setdefault("view_type", ViewType.ThreeD)
+        View.__init__(self, name, **kwargs)
+        self.IsPerspective = is_perspective
+
+
+class ViewSheet(View):
+    _category = BuiltInCategory.OST_Sheets
+
+    def __init__(self, number="", name="", revision_ids=None, **kwargs):
+        kwargs.setdefault("view_type", ViewType.DrawingSheet)
+        View.__init__(self, name, **kwargs)
+        self.SheetNumber = number
+        self._revision_ids = list(revision_ids or [])
+
+    def GetAllRevisionIds(self):
+        self._count("GetAllRevisionIds")
+        return list(self._revision_ids)
+
+    def _viewports(self):
+        return [e for e in self.Document._elements.values()
+                if isinstance(e, Viewport) and e.SheetId == self.Id]
+
+    def GetAllViewports(self):
+        self._count("GetAllViewports")
+        return [vp.Id for vp in self._viewports()]
+
+    def GetAllPlacedViews(self):
+        self._count("GetAllPlacedViews")
+        return [vp.ViewId for vp in self._viewports()]
+
+
+class ScheduleField(object):
+    def __init__(self, heading, hidden=False):
+        self.ColumnHeading = heading
+        self.IsHidden = hidden
+
+
+class ScheduleDefinition(object):
+    def __init__(self, fields, show_headers=True):
+        self._fields = fields
+        self.ShowHeaders = show_headers
+
+    def GetFieldCount(self):
+        return len(self._fields)
+
+    def GetField(self, index):
+        return self._fields[index]
+
+
+class TableSectionData(object):
+    def __init__(self, rows, columns):
+        self.NumberOfRows = rows
+        self.NumberOfColumns = columns
+        self.FirstRowNumber = 0
+        self.FirstColumnNumber = 0
+
+
+class TableData(object):
+    def __init__(self, sections):
+        self._sections = sections
+
+    def GetSectionData(self, section_type):
+        return self._sections.get(section_type)
+
+
+class ViewSchedule(View):
+    """Header section: title row. Body: heading row (if shown) + rows."""
+    _category = BuiltInCategory.OST_Schedules
+
+    def __init__(self, name="", columns=None, rows=None, show_headers=True,
+                 revision_schedule=False, **kwargs):
+        kwargs.setdefault("view_type", ViewType.Schedule)
+        View.__init__(self, name, **kwargs)
+        self.Definition = ScheduleDefinition([ScheduleField(c) for c in columns or []], show_headers)
+        self.IsTitleblockRevisionSchedule = revision_schedule
+        self.IsInternalKeynoteSchedule = False
+        self._rows = [list(r) for r in rows or []]
+
+    def _heading_rows(self):
+        return 1 if self.Definition.ShowHeaders else 0
+
+    def GetTableData(self):
+        self._count("GetTableData")
+        columns = len(self.Definition._fields)
+        return TableData({
+            SectionType.Header: TableSectionData(1, columns),
+            SectionType.Body: TableSectionData(self._heading_rows() + len(self._rows), columns),
+        })
+
+    def GetCellText(self, section_type, row, column):
+        self._count("GetCellText")
+        if section_type == SectionType.Header:
+            return self.Name if column == 0 else u""
+        if row < self._heading_rows():
+            return self.Definition._fields[column].ColumnHeading
+        return u"{0}".format(self._rows[row - self._heading_rows()][column])
+
+
+class Viewport(Element):
+    _category = BuiltInCategory.OST_Viewports
+
+    def __init__(self, sheet_id, view_id, **kwargs):
+        Element.__init__(self, "Viewport", **kwargs)
+        self.SheetId = sheet_id
+        self.ViewId = view_id
+
+
+class Revision(Element):
+    _category = BuiltInCategory.OST_Revisions
+
+    def __init__(self, number="", description="", date="", sequence=0, **kwargs):
+        Element.__init__(self, "Revision", **kwargs)
+        self.RevisionNumber = number
+        self.Description = description
+        self.RevisionDate = date
+        self.SequenceNumber = sequence
+
+
+class ProjectInfo(Element):
+    _category = BuiltInCategory.OST_ProjectInformation
+
+
+class Level(Element):
+    _category = BuiltInCategory.OST_Levels
+
+    def __init__(self, name="", elevation=0.0, **kwargs):
+        Element.__init__(self, name, **kwargs)
+        self.Elevation = elevation
+
+
+class WallType(ElementType):
+    _category = BuiltInCategory.OST_Walls
+
+
+class FamilySymbol(ElementType):
+    pass
+
+
+class Wall(Element):
+    _category = BuiltInCategory.OST_Walls
+
+
+class Floor(Element):
+    _category = BuiltInCategory.OST_Floors
+
+
+class FamilyInstance(Element):
+    pass
+
+
+class ModelPath(object):
+    def __init__(self, path):
+        self._path = path
+
+    def __str__(self):
+        return self._path
+
+
+class ExternalFileReference(object):
+    def __init__(self, path, path_type=None):
+        self._path = ModelPath(path)
+        self._path_type = path_type or PathType.Absolute
+
+    def GetAbsolutePath(self):
+        return self._path
+
+    def GetPath(self):
+        return self._path
+
+    def GetPathType(self):
+        return self._path_type
+
+
+class RevitLinkType(ElementType):
+    """Load() / Unload() change status without a DocumentChanged event."""
+    _category = BuiltInCategory.OST_RvtLinks
+
+    def __init__(self, name="", path="", link_doc=None, attachment=None, nested=False, **kwargs):
+        ElementType.__init__(self, name, **kwargs)
+        self._reference = ExternalFileReference(path)
+        self._link_doc = link_doc
+        self._status = LinkedFileStatus.Loaded if link_doc is not None else LinkedFileStatus.NotFound
+        self.AttachmentType = attachment or AttachmentType.Overlay
+        self.IsNestedLink = nested
+
+    def GetLinkedFileStatus(self):
+        self._count("GetLinkedFileStatus")
+        return self._status
+
+    def GetExternalFileReference(self):
+        return self._reference
+
+    @staticmethod
+    def IsLoaded(doc, type_id):
+        return doc.GetElement(type_id)._status == LinkedFileStatus.Loaded
+
+    def Load(self):
+        if self._link_doc is None:
+            raise InvalidOperationException("Linked file not found")
+        self._status = LinkedFileStatus.Loaded
+
+    def Unload(self, callback):
+        self._status = LinkedFileStatus.Unloaded
+
+
+class RevitLinkInstance(Element):
+    _category = BuiltInCategory.OST_RvtLinks
+
+    def __init__(self, name="", type_id=None, transform=None, **kwargs):
+        Element.__init__(self, name, type_id=type_id, **kwargs)
+        self._transform = transform or Transform()
+
+    def GetLinkDocument(self):
+        self._count("GetLinkDocument")
+        link_type = self.Document.GetElement(self._type_id)
+        return link_type._link_doc if link_type._status == LinkedFileStatus.Loaded else None
+
+    def GetTotalTransform(self):
+        return self._transform
+
+    def GetTransform(self):
+        return self._transform
+
+
+# ----------------------------------------------------------------------
+# Element filters
+# ----------------------------------------------------------------------
+class ElementFilter(object):
+    def PassesElement(self, element):
+        raise NotImplementedError
+
+
+class ElementCategoryFilter(ElementFilter):
+    def __init__(self, bic, inverted=False):
+        self._bic = bic
+        self._inverted = inverted
+
+    def PassesElement(self, e):
+        ok = e.Category is not None and e.Category.BuiltInCategory == self._bic
+        return ok != self._inverted
+
+
+class ElementMulticategoryFilter(ElementFilter):
+    def __init__(self, bics, inverted=False):
+        self._bics = set(bics)
+        self._inverted = inverted
+
+    def PassesElement(self, e):
+        ok = e.Category is not None and e.Category.BuiltInCategory in self._bics
+        return ok != self._inverted
+
+
+class ElementClassFilter(ElementFilter):
+    def __init__(self, cls, inverted=False):
+        self._cls = cls
+        self._inverted = inverted
+
+    def PassesElement(self, e):
+        return isinstance(e, self._cls) != self._inverted
+
+
+class ElementMulticlassFilter(ElementFilter):
+    def __init__(self, classes, inverted=False):
+        self._classes = tuple(classes)
+        self._inverted = inverted
+
+    def PassesElement(self, e):
+        return isinstance(e, self._classes) != self._inverted
+
+
+class _BoundingBoxFilter(ElementFilter):
+    """Optional (tolerance: float, inverted: bool) after the shape, as in Revit."""
+
+    def __init__(self, shape, *args):
+        self._shape = shape
+        self._tolerance = 0.0
+        self._inverted = False
+        for arg in args:
+            if isinstance(arg, bool):
+                self._inverted = arg
+            else:
+                self._tolerance = float(arg)
+
+    def PassesElement(self, e):
+        box = e._bbox
+        if box is None:
+            return self._inverted
+        return self._test(box.Min, box.Max, self._tolerance) != self._inverted
+
+
+class BoundingBoxIntersectsFilter(_BoundingBoxFilter):
+    def _test(self, lo, hi, tol):
+        o = self._shape
+        return (lo.X <= o.MaximumPoint.X + tol and o.MinimumPoint.X - tol <= hi.X and
+                lo.Y <= o.MaximumPoint.Y + tol and o.MinimumPoint.Y - tol <= hi.Y and
+                lo.Z <= o.MaximumPoint.Z + tol and o.MinimumPoint.Z - tol <= hi.Z)
+
+
+class BoundingBoxIsInsideFilter(_BoundingBoxFilter):
+    def _test(self, lo, hi, tol):
+        o = self._shape
+        return (o.MinimumPoint.X - tol <= lo.X and hi.X <= o.MaximumPoint.X + tol and
+                o.MinimumPoint.Y - tol <= lo.Y and hi.Y <= o.MaximumPoint.Y + tol and
+                o.MinimumPoint.Z - tol <= lo.Z and hi.Z <= o.MaximumPoint.Z + tol)
+
+
+class BoundingBoxContainsPointFilter(_BoundingBoxFilter):
+    def _test(self, lo, hi, tol):
+        p = self._shape
+        return (lo.X - tol <= p.X <= hi.X + tol and
+                lo.Y - tol <= p.Y <= hi.Y + tol and
+                lo.Z - tol <= p.Z <= hi.Z + tol)
+
+
+class LogicalAndFilter(ElementFilter):
+    def __init__(self, *filters):
+        if len(filters) == 1:
+            filters = tuple(filters[0])
+        self._filters = filters
+
+    def PassesElement(self, e):
+        return all(f.PassesElement(e) for f in self._filters)
+
+
+class LogicalOrFilter(ElementFilter):
+    def __init__(self, *filters):
+        if len(filters) == 1:
+            filters = tuple(filters[0])
+        self._filters = filters
+
+    def PassesElement(self, e):
+        return any(f.PassesElement(e) for f in self._filters)
+
+
+class FilterRule(object):
+    def __init__(self, param_id, op, value):
+        self.param_id = param_id
+        self.op = op
+        self.value = value
+
+    def passes(self, element):
+        param = None
+        for p in element._params.values():
+            if p.Id == self.param_id:
+                param = p
+                break
+        if param is None or not param.HasValue:
+            return False
+        actual = param._value
+        expected = self.value
+        if isinstance(actual, ElementId):
+            actual = actual.IntegerValue
+        if isinstance(actual, str):
+            actual = actual.lower()
+            expected = u"{0}".format(expected).lower()
+        try:
+            return {
+                "eq": lambda: actual == expected,
+                "ne": lambda: actual != expected,
+                "contains": lambda: expected in actual,
+                "begins": lambda: actual.startswith(expected),
+                "ends": lambda: actual.endswith(expected),
+                "gt": lambda: actual > expected,
+                "ge": lambda: actual >= expected,
+                "lt": lambda: actual < expected,
+                "le": lambda: actual <= expected,
+            }[self.op]()
+        except (TypeError, AttributeError):
+            return False
+
+
+def _rule_factory(op):
+    def create(param_id, value, *extra):
+        return FilterRule(param_id, op, value)
+    return staticmethod(create)
+
+
+class ParameterFilterRuleFactory(object):
+    CreateEqualsRule = _rule_factory("eq")
+    CreateNotEqualsRule = _rule_factory("ne")
+    CreateContainsRule = _rule_factory("contains")
+    CreateBeginsWithRule = _rule_factory("begins")
+    CreateEndsWithRule = _rule_factory("ends")
+    CreateGreaterRule = _rule_factory("gt")
+    CreateGreaterOrEqualRule = _rule_factory("ge")
+    CreateLessRule = _rule_factory("lt")
+    CreateLessOrEqualRule = _rule_factory("le")
+
+
+class ParameterValueProvider(object):
+    def __init__(self, param_id):
+        self.Parameter = param_id
+
+
+class ElementParameterFilter(ElementFilter):
+    """Slow filter: element must satisfy every rule."""
+
+    def __init__(self, rules, inverted=False):
+        if isinstance(rules, FilterRule):
+            rules = [rules]
+        self._rules = list(rules)
+        self._inverted = inverted
+
+    def PassesElement(self, e):
+        e._count("ParameterFilter")
+        return all(r.passes(e) for r in self._rules) != self._inverted
+
+
+# ----------------------------------------------------------------------
+# Collector
+# ----------------------------------------------------------------------
+class FilteredElementCollector(object):
+    def __init__(self, doc, view_id=None):
+        self._doc = doc
+        self._preds = []
+        doc.calls["FilteredElementCollector"] += 1
+
+    def _add(self, pred):
+        self._preds.append(pred)
+        return self
+
+    def OfClass(self, cls):
+        return self._add(lambda e: isinstance(e, cls))
+
+    def OfCategory(self, bic):
+        return self._add(lambda e: e.Category is not None and e.Category.BuiltInCategory == bic)
+
+    def OfCategoryId(self, cat_id):
+        return self._add(lambda e: e.Category is not None and e.Category.Id == cat_id)
+
+    def WhereElementIsNotElementType(self):
+        return self._add(lambda e: not isinstance(e, ElementType))
+
+    def WhereElementIsElementType(self):
+        return self._add(lambda e: isinstance(e, ElementType))
+
+    def WherePasses(self, element_filter):
+        return self._add(element_filter.PassesElement)
+
+    def __iter__(self):
+        preds = self._preds
+        for e in self._doc._elements.values():
+            if all(p(e) for p in preds):
+                self._doc.calls["collected"] += 1
+                yield e
+
+    def ToElements(self):
+        return list(self)
+
+    def ToElementIds(self):
+        return [e.Id for e in self]
+
+    def FirstElement(self):
+        for e in self:
+            return e
+        return None
+
+    def GetElementCount(self):
+        self._doc.calls["GetElementCount"] += 1
+        preds = self._preds
+        return sum(1 for e in self._doc._elements.values() if all(p(e) for p in preds))
+
+
+# ----------------------------------------------------------------------
+# Printing / export
+# ----------------------------------------------------------------------
+class ViewSet(object):
+    def __init__(self):
+        self._views = []
+
+    def Insert(self, view):
+        if view in self._views:
+            return False
+        self._views.append(view)
+        return True
+
+    def Contains(self, view):
+        return view in self._views
+
+    @property
+    def Size(self):
+        return len(self._views)
+
+    @property
+    def IsEmpty(self):
+        return not self._views
+
+    def __iter__(self):
+        return iter(list(self._views))
+
+
+class ViewSheetSet(Element):
+    def __init__(self, name="", views=None):
+        Element.__init__(self, name)
+        self.Views = views or ViewSet()
+
+
+class InSessionViewSheetSet(object):
+    def __init__(self):
+        self.Name = "<In-session>"
+        self.Views = ViewSet()
+
+
+class ViewSheetSetting(object):
+    """Saving and deleting named sets needs an open transaction, as in Revit."""
+
+    def __init__(self, doc):
+        self._doc = doc
+        self.InSession = InSessionViewSheetSet()
+        self.CurrentViewSheetSet = self.InSession
+
+    def _check(self):
+        if not self._doc.IsModifiable:
+            raise InvalidOperationException("Document is not in a transaction")
+
+    def SaveAs(self, name):
+        self._check()
+        if any(isinstance(e, ViewSheetSet) and e.Name == name
+               for e in self._doc._elements.values()):
+            raise InvalidOperationException("A view sheet set named {0} exists".format(name))
+        views = ViewSet()
+        for view in self.CurrentViewSheetSet.Views:
+            views.Insert(view)
+        self.CurrentViewSheetSet = self._doc.add(ViewSheetSet(name, views))
+        return True
+
+    def Save(self):
+        self._check()
+        if isinstance(self.CurrentViewSheetSet, ViewSheetSet):
+            self._doc._modified(self.CurrentViewSheetSet)
+        return True
+
+    def Delete(self):
+        self._check()
+        current = self.CurrentViewSheetSet
+        if not isinstance(current, ViewSheetSet):
+            raise InvalidOperationException("The in-session set cannot be deleted")
+        self._doc.Delete(current.Id)
+        self.CurrentViewSheetSet = self.InSession
+        return True
+
+
+class PrintManager(object):
+    def __init__(self, doc):
+        self._doc = doc
+        self.ViewSheetSetting = ViewSheetSetting(doc)
+        self.PrinterName = None
+        self.PrintToFile = False
+        self.PrintRange = PrintRange.Current
+        self.PrintToFileName = None
+
+    def SelectNewPrintDriver(self, name):
+        self.PrinterName = name
+
+    def Apply(self):
+        return True
+
+    def SubmitPrint(self, view=None):
+        self._doc.calls["SubmitPrint"] += 1
+        if self.PrintToFile and self.PrintToFileName:
+            _touch(self.PrintToFileName)
+        return True
+
+
+class _ExportOptions(object):
+    pass
+
+
+class DWGExportOptions(_ExportOptions):
+    extension = ".dwg"
+
+
+class DXFExportOptions(_ExportOptions):
+    extension = ".dxf"
+
+
+class PDFExportOptions(_ExportOptions):
+    """Native PDF export (Revit 2022+). FileName is used when Combine is set."""
+    extension = ".pdf"
+
+    def __init__(self):
+        self.Combine = False
+        self.FileName = ""
+        self.HideCropBoundaries = True
+        self.HideScopeBoxes = True
+        self.HideUnreferencedViewTags = True
+
+
+def _touch(path, size=1024):
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+class ModelPathUtils(object):
+    @staticmethod
+    def ConvertModelPathToUserVisiblePath(model_path):
+        return str(model_path)
+
+
+# ----------------------------------------------------------------------
+# Application, events, transactions
+# ----------------------------------------------------------------------
+class _Event(object):
+    """.NET-style event: handlers attached with += / -=."""
+
+    def __init__(self):
+        self._handlers = []
+
+    def __iadd__(self, handler):
+        self._handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+        return self
+
+    def fire(self, sender, args):
+        for handler in list(self._handlers):
+            handler(sender, args)
+
+
+class Application(object):
+    def __init__(self):
+        self.VersionNumber = "2024"
+        self.DocumentChanged = _Event()
+        self.DocumentOpened = _Event()
+
+
+class DocumentChangedEventArgs(object):
+    def __init__(self, doc, added, modified, deleted, names):
+        self._doc = doc
+        self._added = [ElementId(i) for i in added]
+        self._modified = [ElementId(i) for i in modified]
+        self._deleted = [ElementId(i) for i in deleted]
+        self._names = list(names)
+
+    def GetDocument(self):
+        return self._doc
+
+    def GetAddedElementIds(self):
+        return list(self._added)
+
+    def GetModifiedElementIds(self):
+        return list(self._modified)
+
+    def GetDeletedElementIds(self):
+        return list(self._deleted)
+
+    def GetTransactionNames(self):
+        return list(self._names)
+
+
+class DocumentOpenedEventArgs(object):
+    def __init__(self, doc):
+        self.Document = doc
+
+
+class Transaction(object):
+    """
+    Commit hands posted failures to the preprocessor. Errors left over,
+    or ProceedWithRollBack, roll the transaction back; warnings nobody
+    deleted count as a "FailureDialog" call (Revit would show one).
+    """
+
+    def __init__(self, doc, name="Transaction"):
+        self._doc = doc
+        self._name = name
+        self._started = False
+        self._options = FailureHandlingOptions()
+
+    def GetFailureHandlingOptions(self):
+        return self._options
+
+    def SetFailureHandlingOptions(self, options):
+        self._options = options
+
+    def Start(self, name=None):
+        if self._doc.IsModifiable:
+            raise InvalidOperationException("A transaction is already open")
+        self._doc.calls["Transaction"] += 1
+        self._doc.IsModifiable = True
+        self._doc._pending = (set(), set(), set())
+        self._doc._failures = []
+        self._doc._txn_undo = []
+        self._started = True
+        return "Started"
+
+    def Commit(self):
+        messages, self._doc._failures = self._doc._failures, []
+        if messages:
+            accessor = FailuresAccessor(self._doc, messages)
+            result = FailureProcessingResult.Continue
+            if self._options.preprocessor is not None:
+                result = self._options.preprocessor.PreprocessFailures(accessor)
+            left = accessor.GetFailureMessages()
+            if result == FailureProcessingResult.ProceedWithRollBack or \
+                    any(m.GetSeverity() != FailureSeverity.Warning for m in left):
+                self.RollBack()
+                return "RolledBack"
+            if left:
+                self._doc.calls["FailureDialog"] += 1
+        self._doc.IsModifiable = False
+        self._started = False
+        self._doc._commit(self._name)
+        return "Committed"
+
+    def RollBack(self):
+        for param, value in reversed(self._doc._txn_undo):
+            param._value = value
+        self._doc._txn_undo = []
+        self._doc._failures = []
+        self._doc.IsModifiable = False
+        self._started = False
+        self._doc._pending = None
+        return "RolledBack"
+
+    def HasStarted(self):
+        return self._started
+
+    def Dispose(self):
+        if self._started:
+            self.RollBack()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Dispose()
+
+
+class TransactionGroup(object):
+    """RollBack restores parameter values set inside the group."""
+
+    def __init__(self, doc, name="Transaction Group"):
+        self._doc = doc
+        self._name = name
+        self._started = False
+
+    def Start(self, name=None):
+        if self._doc._group_undo is not None:
+            raise InvalidOperationException("A transaction group is already open")
+        self._doc._group_undo = []
+        self._started = True
+        self._doc.calls["TransactionGroup"] += 1
+        return "Started"
+
+    def _close(self):
+        self._doc._group_undo = None
+        self._started = False
+
+    def Assimilate(self):
+        self._close()
+        return "Committed"
+
+    def Commit(self):
+        self._close()
+        return "Committed"
+
+    def RollBack(self):
+        for param, value in reversed(self._doc._group_undo or []):
+            param._value = value
+        self._close()
+        return "RolledBack"
+
+    def HasStarted(self):
+        return self._started
+
+    def Dispose(self):
+        if self._started:
+            self.RollBack()
+
+
+# ----------------------------------------------------------------------
+# Document
+# ----------------------------------------------------------------------
+class Settings(object):
+    @property
+    def Categories(self):
+        return [category_for(getattr(BuiltInCategory, name))
+                for name in sorted(vars(BuiltInCategory)) if name.startswith("OST_")]
+
+
+class Document(object):
+    def __init__(self, title="Synthetic", path_name="", application=None):
+        self.Title = title
+        self.PathName = path_name
+        self.Application = application or Application()
+        self.IsWorkshared = False
+        self.IsModifiable = False
+        self.ActiveView = None
+        self.calls = Counter()
+        self._elements = OrderedDict()
+        self._next_id = 100000
+        self._pending = None
+        self._group_undo = None
+        self._txn_undo = []
+        self._failures = []
+        # parameter name -> FailureSeverity posted when it is set
+        self.failure_rules = {}
+        self.PrintManager = PrintManager(self)
+        self.Settings = Settings()
+
+    def add(self, element):
+        element.Id = ElementId(self._next_id)
+        element.Document = self
+        self._elements[self._next_id] = element
+        self._next_id += 1
+        if self._pending is not None:
+            self._pending[0].add(element.Id.IntegerValue)
+        return element
+
+    def Delete(self, element_id):
+        element = self._elements.pop(element_id.IntegerValue, None)
+        if element is not None:
+            element.Document = None
+            if self._pending is not None:
+                self._pending[2].add(element_id.IntegerValue)
+        return [element_id] if element is not None else []
+
+    def PostFailure(self, message):
+        self._failures.append(message)
+
+    def _modified(self, element):
+        if self._pending is not None and element.Id.IntegerValue not in self._pending[0]:
+            self._pending[1].add(element.Id.IntegerValue)
+
+    def _commit(self, name):
+        added, modified, deleted = self._pending
+        self._pending = None
+        if added or modified or deleted:
+            self.Application.DocumentChanged.fire(
+                self.Application,
+                DocumentChangedEventArgs(self, added, modified, deleted, [name]))
+
+    def GetElement(self, ref):
+        self.calls["GetElement"] += 1
+        if isinstance(ref, ElementId):
+            ref = ref.IntegerValue
+        return self._elements.get(int(ref))
+
+    def Export(self, folder, name, *args):
+        self.calls["Export"] += 1
+        options = args[-1]
+        if isinstance(options, PDFExportOptions):
+            return self._export_pdf(folder, name, options)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        _touch(os.path.join(folder, name + getattr(options, "extension", "")))
+        return True
+
+    def _export_pdf(self, folder, view_ids, options):
+        views = [self.GetElement(i) for i in view_ids]
+        if not views or any(v is None for v in views):
+            raise InvalidOperationException("Invalid view ids for PDF export")
+        self.calls["ExportedPDFViews"] += len(views)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        if options.Combine:
+            _touch(os.path.join(folder, (options.FileName or self.Title) + ".pdf"), 1024 * len(views))
+            return True
+        for view in views:
+            name = "Sheet - {0} - {1}".format(view.SheetNumber, view.Name) \
+                if isinstance(view, ViewSheet) else view.Name
+            _touch(os.path.join(folder, name + ".pdf"))
+        return True
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Stand-in for Autodesk.Revit.UI.
+# ExternalEvent.Raise() queues the handler; a single "UI thread"
+# (IDLE_LOOP) runs queued handlers one at a time, like Revit's idling
+# pump. Harnesses can start the loop thread or call pump() themselves.
+# ----------------------------------------------------------------------
+import threading
+
+
+class IExternalEventHandler(object):
+    def Execute(self, uiapp):
+        raise NotImplementedError
+
+    def GetName(self):
+        return self.__class__.__name__
+
+
+class ExternalEventRequest(object):
+    Accepted = "Accepted"
+    Pending = "Pending"
+    Denied = "Denied"
+    TimedOut = "TimedOut"
+
+
+class _IdleLoop(object):
+    def __init__(self):
+        self.uiapp = None
+        self._queue = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def submit(self, event):
+        with self._cond:
+            if event in self._queue:
+                return ExternalEventRequest.Pending
+            self._queue.append(event)
+            self._cond.notify()
+        return ExternalEventRequest.Accepted
+
+    def pump(self):
+        """Runs every queued handler on the calling thread."""
+        ran = 0
+        while True:
+            with self._cond:
+                if not self._queue:
+                    return ran
+                event = self._queue.pop(0)
+            event.handler.Execute(self.uiapp)
+            ran += 1
+
+    def start(self, uiapp):
+        self.uiapp = uiapp
+        if self._thread is not None:
+            return
+        self._running = True
+
+        def loop():
+            while self._running:
+                with self._cond:
+                    while self._running and not self._queue:
+                        self._cond.wait(0.05)
+                self.pump()
+
+        self._thread = threading.Thread(target=loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(2)
+        self._thread = None
+
+
+IDLE_LOOP = _IdleLoop()
+
+
+class ExternalEvent(object):
+    def __init__(self, handler):
+        self.handler = handler
+
+    @staticmethod
+    def Create(handler):
+        return ExternalEvent(handler)
+
+    def Raise(self):
+        return IDLE_LOOP.submit(self)
+
+    @property
+    def IsPending(self):
+        return self in IDLE_LOOP._queue
+
+    def Dispose(self):
+        pass
+
+
+class UIDocument(object):
+    def __init__(self, doc):
+        self.Document = doc
+
+    @property
+    def ActiveView(self):
+        return self.Document.ActiveView
+
+    @ActiveView.setter
+    def ActiveView(self, view):
+        self.Document.calls["ActivateView"] += 1
+        self.Document.ActiveView = view
+
+
+class UIApplication(object):
+    def __init__(self, doc):
+        self.ActiveUIDocument = UIDocument(doc)
+        self.Application = doc.Application
+
+
+class TaskDialog(object):
+    SHOWN = []
+
+    @staticmethod
+    def Show(title, message):
+        TaskDialog.SHOWN.append((title, message))
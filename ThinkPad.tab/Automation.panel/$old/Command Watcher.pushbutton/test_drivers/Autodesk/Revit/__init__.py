@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+# Stand-in for the Revit API namespaces used by the Command Watcher.
+# Only what the bridge modules touch is modelled; see fake_model.py for
+# synthetic documents.
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Stand-in for System.Collections.Generic: List[T](iterable) -> python list.
+
+
+class _TypedList(list):
+    def Add(self, item):
+        self.append(item)
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class _GenericList(object):
+    def __getitem__(self, item_type):
+        return _TypedList
+
+
+List = _GenericList()
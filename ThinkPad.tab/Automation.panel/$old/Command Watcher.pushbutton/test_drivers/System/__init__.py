@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+# Stand-in for the .NET System namespace (only what the bridge uses).
+
+Type = type
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Load-test command: does nothing but answer. Pair with "id" in the payload
+# so the watcher trace shows which commands actually executed.
+import json
+
+from bridge_paths import RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    with open(RESPONSE_PATH, "w") as f:
+        json.dump({"status": "ok", "id": data.get("id")}, f)
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+# Load-test command: simulates a slow module ("sleep" seconds, default 1).
+import json
+import time
+
+from bridge_paths import RESPONSE_PATH
+
+
+def run(uiapp, data, log):
+    time.sleep(float(data.get("sleep", 1.0)))
+    with open(RESPONSE_PATH, "w") as f:
+        json.dump({"status": "ok", "id": data.get("id")}, f)
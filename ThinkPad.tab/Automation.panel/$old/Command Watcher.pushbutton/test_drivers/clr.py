@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# Stand-in for the pythonnet / IronPython clr module.
+
+
+def AddReference(name):
+    pass
+
+
+def GetClrType(cls):
+    return cls
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Synthetic Revit documents for the fake API in this folder.
+# build_document() produces a deterministic model of any size
+# (10k+ sheets and views) with revisions distributed across sheets and
+# optionally views placed on sheets through viewports and Revit links
+# (small loaded documents of their own).
+# ----------------------------------------------------------------------
+import random
+
+from Autodesk.Revit.DB import (
+    BoundingBoxXYZ,
+    BuiltInCategory,
+    BuiltInParameter,
+    Document,
+    FamilyInstance,
+    FamilySymbol,
+    Floor,
+    Level,
+    Parameter,
+    ProjectInfo,
+    Revision,
+    RevitLinkInstance,
+    RevitLinkType,
+    Transform,
+    View,
+    View3D,
+    ViewSheet,
+    ViewSchedule,
+    ViewType,
+    Viewport,
+    Wall,
+    WallType,
+    XYZ,
+)
+from Autodesk.Revit.UI import UIApplication
+
+PLAN_TYPES = [
+    ViewType.FloorPlan, ViewType.CeilingPlan, ViewType.Elevation,
+    ViewType.Section, ViewType.DraftingView, ViewType.Legend,
+    ViewType.Detail, ViewType.AreaPlan,
+]
+
+DISCIPLINES = ["A", "S", "M", "E", "P", "C"]
+
+# Model elements are scattered over a SITE_SIZE x SITE_SIZE ft footprint
+SITE_SIZE = 1000.0
+
+# (dx, dy, dz) box extents in feet per category
+EXTENTS = {
+    BuiltInCategory.OST_Walls: (20.0, 1.0, 10.0),
+    BuiltInCategory.OST_Doors: (3.0, 1.0, 7.0),
+    BuiltInCategory.OST_Windows: (4.0, 1.0, 4.0),
+    BuiltInCategory.OST_Floors: (40.0, 40.0, 1.0),
+    BuiltInCategory.OST_GenericModel: (2.0, 2.0, 3.0),
+}
+
+# (element class, category, type class) mix for model elements
+MODEL_MIX = [
+    (Wall, BuiltInCategory.OST_Walls, WallType),
+    (Wall, BuiltInCategory.OST_Walls, WallType),
+    (FamilyInstance, BuiltInCategory.OST_Doors, FamilySymbol),
+    (FamilyInstance, BuiltInCategory.OST_Windows, FamilySymbol),
+    (Floor, BuiltInCategory.OST_Floors, None),
+    (FamilyInstance, BuiltInCategory.OST_GenericModel, FamilySymbol),
+]
+
+
+def build_document(sheets=10000, views=10000, views_3d=200, revisions=40,
+                   revisions_per_sheet=5, templates=100, elements=0, levels=10,
+                   viewports_per_sheet=0, schedules=0, schedule_rows=50,
+                   links=0, link_instances=1, link_elements=200,
+                   seed=0, title="Synthetic", path_name=""):
+    rnd = random.Random(seed)
+    doc = Document(title=title, path_name=path_name)
+
+    doc.add(ProjectInfo("Project Information"))
+
+    if elements:
+        add_model_elements(doc, rnd, elements, levels)
+
+    revs = []
+    for i in range(revisions):
+        revs.append(doc.add(Revision(
+            number=str(i + 1),
+            description="Revision {0}".format(i + 1),
+            date="2026-{0:02d}-{1:02d}".format(i % 12 + 1, i % 28 + 1),
+            sequence=i + 1,
+        )))
+
+    for i in range(templates):
+        doc.add(View("Template {0}".format(i), view_type=rnd.choice(PLAN_TYPES),
+                     is_template=True))
+
+    placeable = []
+    for i in range(views):
+        vtype = PLAN_TYPES[i % len(PLAN_TYPES)]
+        placeable.append(doc.add(View("{0} - Level {1} - {2}".format(vtype, i % 60, i),
+                                      view_type=vtype)))
+    first_view = placeable[0] if placeable else None
+
+    for i in range(schedules):
+        doc.add(ViewSchedule(
+            "Schedule {0}".format(i),
+            columns=["Mark", "Type", "Level", "Count"],
+            rows=[["M{0}-{1}".format(i, r), "Type {0}".format(r % 7),
+                   "Level {0}".format(r % 10), rnd.randint(1, 20)]
+                  for r in range(schedule_rows)],
+        ))
+    if schedules:
+        doc.add(ViewSchedule("<Revision Schedule>", columns=["Rev", "Date"],
+                             revision_schedule=True))
+
+    for i in range(views_3d):
+        doc.add(View3D("3D - {0}".format(i), is_perspective=(i % 5 == 0)))
+
+    for i in range(links):
+        add_link(doc, rnd, i, link_instances, link_elements)
+
+    for i in range(sheets):
+        rev_ids = []
+        current = None
+        if revs:
+            chosen = sorted(rnd.sample(revs, min(revisions_per_sheet, len(revs))),
+                            key=lambda r: r.SequenceNumber)
+            rev_ids = [r.Id for r in chosen]
+            current = chosen[-1].RevisionNumber
+
+        number = "{0}-{1:05d}".format(DISCIPLINES[i % len(DISCIPLINES)], i)
+        sheet = ViewSheet(number=number, name="Sheet {0}".format(i), revision_ids=rev_ids)
+        sheet.add_parameter(Parameter("Current Revision", current,
+                                      builtin=BuiltInParameter.SHEET_CURRENT_REVISION,
+                                      read_only=True))
+        sheet.add_parameter(Parameter("Sheet Number", number,
+                                      builtin=BuiltInParameter.SHEET_NUMBER))
+        sheet.add_parameter(Parameter("Sheet Name", sheet.Name,
+                                      builtin=BuiltInParameter.SHEET_NAME))
+        doc.add(sheet)
+
+        # Each view goes on one sheet, legends on any number
+        for _ in range(viewports_per_sheet):
+            if not placeable:
+                break
+            view = placeable.pop(rnd.randrange(len(placeable)))
+            doc.add(Viewport(sheet.Id, view.Id))
+            if view.ViewType == ViewType.Legend:
+                placeable.append(view)
+
+    doc.ActiveView = first_view
+    doc.calls.clear()
+    return doc
+
+
+def add_model_elements(doc, rnd, count, levels):
+    """Walls, doors, windows, floors and generic models spread over levels."""
+    level_elems = [doc.add(Level("Level {0}".format(i), elevation=i * 12.0))
+                   for i in range(levels)]
+
+    types = {}
+    for elem_cls, bic, type_cls in MODEL_MIX:
+        if type_cls is not None and bic not in types:
+            types[bic] = []
+            for t in range(5):
+                element_type = type_cls("{0} Type {1}".format(bic.name[4:], t), category=bic)
+                element_type.add_parameter(Parameter("Type Mark", "{0}T{1}".format(bic.name[4], t)))
+                element_type.add_parameter(Parameter("Cost", 100.0 * (t + 1)))
+                types[bic].append(doc.add(element_type))
+
+    for i in range(count):
+        elem_cls, bic, _ = MODEL_MIX[i % len(MODEL_MIX)]
+        type_elem = rnd.choice(types[bic]) if bic in types else None
+        level = level_elems[i % levels]
+        element = elem_cls("{0} {1}".format(bic.name[4:], i), category=bic,
+                           type_id=type_elem.Id if type_elem else None)
+        element.add_parameter(Parameter("Mark", "{0}{1}".format(bic.name[4], i),
+                                        builtin=BuiltInParameter.ALL_MODEL_MARK))
+        element.add_parameter(Parameter("Comments", rnd.choice(["", "fire rated", "acoustic", "existing"]),
+                                        builtin=BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS))
+        element.add_parameter(Parameter("Level", level.Id,
+                                        builtin=BuiltInParameter.FAMILY_LEVEL_PARAM))
+        element.add_parameter(Parameter("Fire Rating", rnd.choice([0, 30, 60, 120])))
+        dx, dy, dz = EXTENTS[bic]
+        if rnd.random() < 0.5:
+            dx, dy = dy, dx
+        x, y = rnd.uniform(0, SITE_SIZE - dx), rnd.uniform(0, SITE_SIZE - dy)
+        element._bbox = BoundingBoxXYZ(XYZ(x, y, level.Elevation),
+                                       XYZ(x + dx, y + dy, level.Elevation + dz))
+        doc.add(element)
+
+
+def add_link(doc, rnd, index, instances, elements):
+    """A loaded link type with `instances` placements (100 ft apart)."""
+    discipline = DISCIPLINES[index % len(DISCIPLINES)]
+    name = "{0}-Model-{1}.rvt".format(discipline, index)
+    link_doc = Document(title=name[:-4], path_name="\\\\server\\projects\\" + name)
+    if elements:
+        add_model_elements(link_doc, rnd, elements, 3)
+    link_type = doc.add(RevitLinkType(name, path=link_doc.PathName, link_doc=link_doc))
+    for j in range(instances):
+        doc.add(RevitLinkInstance("{0} : {1}".format(name, j + 1), type_id=link_type.Id,
+                                  transform=Transform.CreateTranslation(XYZ(100.0 * j, 0, 0))))
+    return link_type
+
+
+def make_uiapp(doc):
+    return UIApplication(doc)
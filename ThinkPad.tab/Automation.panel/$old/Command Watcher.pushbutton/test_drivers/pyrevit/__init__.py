@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+# Stand-in for pyRevit (headless: dialogs are recorded, never shown).
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+# Headless pyrevit.forms: every alert is recorded in ALERTS.
+
+ALERTS = []
+
+
+def alert(msg, title=None, **kwargs):
+    ALERTS.append({"title": title, "message": msg})
+    return True
+
+
+def ask_for_string(default=None, prompt=None, title=None, **kwargs):
+    return default
+
+
+def pick_folder(title=None, **kwargs):
+    return None
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end dispatcher benchmark on a synthetic model.
+
+Every command goes through the real CommandWatcherHandler.Execute()
+(file read, dispatch, module import, run, response write) against the
+fake Revit API. Reports latency percentiles, throughput and Revit API
+call counts per command.
+
+    python tools/bench_dispatcher.py --sheets 10000 --views 10000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+
+from harness import Harness
+
+DEFAULT_COMMANDS = [
+    {"request": "get_active_view"},
+    {"request": "get_model_path"},
+    {"request": "get_3d_views"},
+    {"request": "get_all_views"},
+    {"request": "get_sheet_data"},
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = int(round((len(ordered) - 1) * pct / 100.0))
+    return ordered[k]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark the Command Watcher dispatcher.")
+    p.add_argument("--sheets", type=int, default=10000)
+    p.add_argument("--views", type=int, default=10000)
+    p.add_argument("--revisions", type=int, default=40)
+    p.add_argument("--revisions-per-sheet", type=int, default=5)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--command", action="append", default=[],
+                   help="JSON payload to benchmark (may repeat); defaults to all read requests")
+    p.add_argument("--json", action="store_true", help="print results as JSON")
+    return p.parse_args(argv)
+
+
+def run_benchmark(harness, payloads, repeat):
+    results = []
+    for payload in payloads:
+        name = payload.get("request") or payload.get("command")
+        timings = []
+        sizes = []
+        harness.doc.calls.clear()
+        for _ in range(repeat):
+            elapsed, size = harness.execute(dict(payload))
+            timings.append(elapsed)
+            sizes.append(size)
+        total = sum(timings)
+        results.append({
+            "command": name,
+            "runs": repeat,
+            "min_ms": min(timings) * 1000,
+            "p50_ms": percentile(timings, 50) * 1000,
+            "p95_ms": percentile(timings, 95) * 1000,
+            "max_ms": max(timings) * 1000,
+            "throughput_per_s": repeat / total if total else 0.0,
+            "response_bytes": max(sizes),
+            "api_calls_per_run": dict((k, v // repeat) for k, v in harness.doc.calls.items()),
+        })
+    return results
+
+
+def print_table(results):
+    header = "{0:<28} {1:>9} {2:>9} {3:>9} {4:>9} {5:>8} {6:>12}".format(
+        "command", "min ms", "p50 ms", "p95 ms", "max ms", "cmd/s", "bytes")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print("{0:<28} {1:>9.1f} {2:>9.1f} {3:>9.1f} {4:>9.1f} {5:>8.2f} {6:>12}".format(
+            r["command"], r["min_ms"], r["p50_ms"], r["p95_ms"], r["max_ms"],
+            r["throughput_per_s"], r["response_bytes"]))
+        calls = ", ".join("{0}={1}".format(k, v) for k, v in sorted(r["api_calls_per_run"].items()))
+        print("    api: {0}".format(calls))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    payloads = [json.loads(c) for c in args.command] or DEFAULT_COMMANDS
+
+    start = time.time()
+    harness = Harness(sheets=args.sheets, views=args.views, revisions=args.revisions,
+                      revisions_per_sheet=args.revisions_per_sheet)
+    print("Synthetic model: {0} elements built in {1:.2f}s ({2})".format(
+        len(harness.doc._elements), time.time() - start, harness.root))
+
+    results = run_benchmark(harness, payloads, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Runs the real CommandWatcherHandler outside Revit.
+
+Points REVIT_PAD_FOLDER at a scratch folder, puts the fake Revit API
+(test_drivers/) on sys.path and builds a synthetic document. Shared by
+the benchmark, load generator and replay tools.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_DIR = os.path.dirname(TOOLS_DIR)
+TEST_DRIVERS_DIR = os.path.join(BUNDLE_DIR, "test_drivers")
+BENCH_COMMANDS_DIR = os.path.join(TEST_DRIVERS_DIR, "bench_commands")
+
+
+def install_fakes():
+    for path in (TEST_DRIVERS_DIR, BENCH_COMMANDS_DIR, BUNDLE_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+class Harness(object):
+    """One fake Revit session with a watcher handler bound to it."""
+
+    def __init__(self, root=None, **model_kwargs):
+        self.root = root or tempfile.mkdtemp(prefix="revitpad_")
+        # Must be set before any bridge module is imported
+        os.environ["REVIT_PAD_FOLDER"] = self.root
+        install_fakes()
+
+        self.bridge_folder = os.path.join(self.root, "Bridge")
+        self.data_folder = os.path.join(self.root, "Data")
+        self.log_folder = os.path.join(self.root, "Logs")
+        for folder in (self.bridge_folder, self.data_folder, self.log_folder):
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+        self.watch_path = os.path.join(self.bridge_folder, "revit_command.json")
+        self.response_path = os.path.join(self.data_folder, "response.json")
+        with open(self.watch_path, "w") as f:
+            f.write("{}")
+
+        import fake_model
+        self.doc = fake_model.build_document(**model_kwargs)
+        self.uiapp = fake_model.make_uiapp(self.doc)
+        self.handler = self.new_handler()
+
+    def new_handler(self):
+        """A fresh handler, as after a watcher restart."""
+        from CommandWatcherHelper import CommandWatcherHandler
+        return CommandWatcherHandler(self.watch_path)
+
+    def start_watcher(self, interval=0.2):
+        """Runs the real polling loop; Execute() happens on the fake UI thread."""
+        from Autodesk.Revit.UI import ExternalEvent, IDLE_LOOP
+        IDLE_LOOP.start(self.uiapp)
+        self.ext_event = ExternalEvent.Create(self.handler)
+        self.handler.start(self.ext_event, interval=interval, startup_delay=0)
+
+    def restart_watcher(self, interval=0.2):
+        self.handler.keep_running = False
+        self.handler = self.new_handler()
+        self.start_watcher(interval)
+
+    def stop_watcher(self):
+        from Autodesk.Revit.UI import IDLE_LOOP
+        self.handler.keep_running = False
+        IDLE_LOOP.stop()
+
+    def write_command(self, payload):
+        with open(self.watch_path, "w") as f:
+            json.dump(payload, f)
+
+    def execute(self, payload):
+        """
+        Writes one command and runs a single Execute() as Revit's idle
+        pump would. Returns (elapsed seconds, response size in bytes).
+        """
+        if os.path.exists(self.response_path):
+            os.remove(self.response_path)
+        self.write_command(payload)
+        # Bypass the mtime debounce: back-to-back writes can share a tick
+        self.handler.last_mod_time = None
+
+        start = time.time()
+        self.handler.Execute(self.uiapp)
+        elapsed = time.time() - start
+
+        size = os.path.getsize(self.response_path) if os.path.exists(self.response_path) else 0
+        return elapsed, size
+
+    def read_response(self, ndjson=False):
+        if not ndjson:
+            # follows gzip / rows headers to the body
+            import response_writer
+            return response_writer.read_response(self.response_path)
+        with open(self.response_path, "r") as f:
+            return [json.loads(line) for line in f if line.strip()]
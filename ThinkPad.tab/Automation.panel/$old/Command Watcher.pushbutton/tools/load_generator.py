@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Soak / load generator for the file bridge, with fault injection.
+
+Fires a weighted command mix at revit_command.json at a target rate,
+each payload tagged with a sequence "id". Afterwards the watcher trace
+(Logs/revit_pad_trace.jsonl) is read back to report dropped, duplicated
+and out-of-order commands plus the send-to-completion latency
+distribution.
+
+In-process mode (default) runs the real CommandWatcherHandler polling
+loop against the fake Revit API and can inject every fault. With --root
+the generator targets a live RevitPAD folder instead; watcher restarts
+cannot be injected there.
+
+    python tools/load_generator.py --rate 5 --duration 30 \\
+        --mix bench_echo=8,bench_sleep=1,get_active_view=1 \\
+        --partial-writes 0.1 --locked-files 0.05 --restart-every 10
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import time
+
+from harness import Harness
+
+REQUEST_MODULES = ("get_active_view", "get_model_path", "get_3d_views",
+                   "get_all_views", "get_sheet_data", "get_memory_top")
+
+
+def parse_mix(text):
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Load and fault-injection generator for the bridge.")
+    p.add_argument("--rate", type=float, default=2.0, help="commands per second")
+    p.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    p.add_argument("--mix", default="bench_echo=1",
+                   help="weighted command mix, e.g. bench_echo=8,get_active_view=1")
+    p.add_argument("--interval", type=float, default=0.2,
+                   help="watcher poll interval for in-process runs (Revit default is 3)")
+    p.add_argument("--slow-seconds", type=float, default=1.0, help="bench_sleep duration")
+    p.add_argument("--partial-writes", type=float, default=0.0,
+                   help="fraction of writes split in two with a pause in between")
+    p.add_argument("--locked-files", type=float, default=0.0,
+                   help="fraction of writes followed by holding the file locked")
+    p.add_argument("--lock-seconds", type=float, default=0.5)
+    p.add_argument("--restart-every", type=float, default=0.0,
+                   help="restart the watcher every N seconds (in-process only)")
+    p.add_argument("--drain", type=float, default=5.0,
+                   help="seconds to wait for the watcher after the last send")
+    p.add_argument("--root", default=None,
+                   help="target a live RevitPAD folder instead of an in-process watcher")
+    p.add_argument("--sheets", type=int, default=500)
+    p.add_argument("--views", type=int, default=500)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", action="store_true")
+    return p.parse_args(argv)
+
+
+# ----------------------------------------------------------------------
+# Faults
+# ----------------------------------------------------------------------
+def write_whole(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def write_partial(path, text, pause):
+    """Non-atomic writer: half the payload, a pause, then the rest."""
+    cut = len(text) // 2
+    with open(path, "w") as f:
+        f.write(text[:cut])
+        f.flush()
+        time.sleep(pause)
+        f.write(text[cut:])
+
+
+def hold_locked(path, seconds):
+    """
+    Keeps the command file inaccessible for a while. Windows gets a real
+    byte-range lock; elsewhere the file is moved aside, which the watcher
+    sees the same way (cannot read it).
+    """
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+    if msvcrt is not None:
+        with open(path, "r+") as f:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            time.sleep(seconds)
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+
+    aside = path + ".locked"
+    os.rename(path, aside)
+    time.sleep(seconds)
+    os.rename(aside, path)
+
+
+# ----------------------------------------------------------------------
+# Run + report
+# ----------------------------------------------------------------------
+def build_payload(name, seq, args):
+    key = "request" if name in REQUEST_MODULES else "command"
+    payload = {key: name, "id": seq, "sent": time.time()}
+    if name == "bench_sleep":
+        payload["sleep"] = args.slow_seconds
+    return payload
+
+
+def generate(args, watch_path, harness=None):
+    rnd = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    names = [m[0] for m in mix]
+    # Cumulative weights: bisect on random() picks a name (random.choices
+    # is Python 3.6+)
+    cumulative = []
+    total = 0.0
+    for m in mix:
+        total += m[1]
+        cumulative.append(total)
+
+    sent = []
+    faults = {"partial_writes": 0, "locked_files": 0, "restarts": 0}
+    period = 1.0 / args.rate
+    start = time.time()
+    next_restart = start + args.restart_every if args.restart_every else None
+    seq = 0
+
+    while time.time() - start < args.duration:
+        tick = time.time()
+        seq += 1
+        payload = build_payload(names[bisect.bisect_right(cumulative, rnd.random() * total)], seq, args)
+        text = json.dumps(payload)
+
+        if rnd.random() < args.partial_writes:
+            faults["partial_writes"] += 1
+            write_partial(watch_path, text, min(period / 2, 0.5))
+        else:
+            write_whole(watch_path, text)
+        sent.append(payload)
+
+        if rnd.random() < args.locked_files:
+            faults["locked_files"] += 1
+            hold_locked(watch_path, args.lock_seconds)
+
+        if harness is not None and next_restart and time.time() >= next_restart:
+            faults["restarts"] += 1
+            harness.restart_watcher(args.interval)
+            next_restart = time.time() + args.restart_every
+
+        time.sleep(max(0.0, period - (time.time() - tick)))
+
+    time.sleep(args.drain)
+    return sent, faults
+
+
+def read_trace(trace_path, since):
+    executed = []
+    if not os.path.exists(trace_path):
+        return executed
+    with open(trace_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("timestamp", 0) >= since and "id" in record:
+                executed.append(record)
+    executed.sort(key=lambda r: r["timestamp"])
+    return executed
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[int(round((len(ordered) - 1) * pct / 100.0))]
+
+
+def analyse(sent, executed):
+    sent_at = dict((p["id"], p["sent"]) for p in sent)
+    seen = {}
+    out_of_order = 0
+    highest = 0
+    latencies = []
+
+    for record in executed:
+        seq = record["id"]
+        if seq not in sent_at:
+            continue
+        seen[seq] = seen.get(seq, 0) + 1
+        if seq < highest:
+            out_of_order += 1
+        highest = max(highest, seq)
+        if seen[seq] == 1:
+            latencies.append(record["timestamp"] + record.get("duration", 0) - sent_at[seq])
+
+    dropped = [s for s in sent_at if s not in seen]
+    duplicated = [s for s, n in seen.items() if n > 1]
+    return {
+        "sent": len(sent_at),
+        "executed": sum(seen.values()),
+        "dropped": len(dropped),
+        "duplicated": len(duplicated),
+        "out_of_order": out_of_order,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies) * 1000 if latencies else 0.0,
+        },
+        "dropped_ids": sorted(dropped)[:50],
+        "duplicated_ids": sorted(duplicated)[:50],
+    }
+
+
+def print_report(report, faults):
+    print("sent        {0}".format(report["sent"]))
+    print("executed    {0}".format(report["executed"]))
+    print("dropped     {0}".format(report["dropped"]))
+    print("duplicated  {0}".format(report["duplicated"]))
+    print("out-of-order {0}".format(report["out_of_order"]))
+    lat = report["latency_ms"]
+    print("latency ms  p50 {0:.0f} | p90 {1:.0f} | p99 {2:.0f} | max {3:.0f}".format(
+        lat["p50"], lat["p90"], lat["p99"], lat["max"]))
+    print("faults      {0}".format(", ".join("{0}={1}".format(k, v) for k, v in sorted(faults.items()))))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    harness = None
+
+    if args.root:
+        if args.restart_every:
+            print("--restart-every ignored: watcher restarts need an in-process run")
+            args.restart_every = 0
+        watch_path = os.path.join(args.root, "Bridge", "revit_command.json")
+        trace_path = os.path.join(args.root, "Logs", "revit_pad_trace.jsonl")
+    else:
+        harness = Harness(sheets=args.sheets, views=args.views)
+        harness.start_watcher(args.interval)
+        watch_path = harness.watch_path
+        trace_path = os.path.join(harness.log_folder, "revit_pad_trace.jsonl")
+
+    started = time.time()
+    sent, faults = generate(args, watch_path, harness)
+    if harness is not None:
+        harness.stop_watcher()
+
+    report = analyse(sent, read_trace(trace_path, started))
+    report["faults"] = faults
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, faults)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
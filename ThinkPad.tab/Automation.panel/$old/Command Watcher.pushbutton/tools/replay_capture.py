@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Replays a captured stream of bridge commands and compares timings.
+
+A capture is written by the watcher when started with REVIT_PAD_CAPTURE
+set, or between start_capture / stop_capture commands. Each command is
+re-sent at its original offset divided by --speed (0 = back to back,
+waiting for each to finish). The report compares original and replayed
+run() durations per command, and shows how long each replayed command
+waited between being written and starting.
+
+    python tools/replay_capture.py capture.jsonl --speed 4
+    python tools/replay_capture.py capture.jsonl --root C:\\PADApps\\RevitPAD
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from harness import Harness
+
+
+def load_capture(path):
+    """Returns [{payload, arrived, duration}] in arrival order."""
+    commands = []
+    pending = None
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "arrived" and not event.get("skipped"):
+                pending = {
+                    "payload": event["payload"],
+                    "arrived": event["timestamp"],
+                    "duration": None,
+                }
+                commands.append(pending)
+            elif event.get("event") == "completed" and pending is not None:
+                pending["duration"] = event.get("duration")
+                pending = None
+    return commands
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Replay captured bridge traffic.")
+    p.add_argument("capture", help="capture .jsonl file")
+    p.add_argument("--speed", type=float, default=1.0,
+                   help="time compression factor; 0 sends back to back")
+    p.add_argument("--interval", type=float, default=0.2,
+                   help="watcher poll interval for in-process replays")
+    p.add_argument("--timeout", type=float, default=120.0,
+                   help="max seconds to wait for the last command")
+    p.add_argument("--root", default=None,
+                   help="replay into a live RevitPAD folder instead of in-process")
+    p.add_argument("--sheets", type=int, default=2000)
+    p.add_argument("--views", type=int, default=2000)
+    p.add_argument("--json", action="store_true")
+    return p.parse_args(argv)
+
+
+def trace_records(trace_path, since):
+    records = {}
+    if not os.path.exists(trace_path):
+        return records
+    with open(trace_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("timestamp", 0) >= since and "id" in record:
+                records[record["id"]] = record
+    return records
+
+
+def wait_for(trace_path, since, replay_id, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if replay_id in trace_records(trace_path, since):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def replay(commands, watch_path, trace_path, args):
+    started = time.time()
+    first = commands[0]["arrived"] if commands else 0
+    sent = []
+
+    for n, item in enumerate(commands):
+        payload = dict(item["payload"])
+        payload.pop("watch_path", None)
+        payload["id"] = "replay-{0}".format(n)
+
+        if args.speed > 0:
+            due = started + (item["arrived"] - first) / args.speed
+            time.sleep(max(0.0, due - time.time()))
+
+        with open(watch_path, "w") as f:
+            json.dump(payload, f)
+        sent.append((payload["id"], time.time(), item))
+
+        if args.speed <= 0:
+            wait_for(trace_path, started, payload["id"], args.timeout)
+
+    if sent:
+        wait_for(trace_path, started, sent[-1][0], args.timeout)
+    return sent, trace_records(trace_path, started)
+
+
+def compare(sent, records):
+    rows = []
+    for replay_id, sent_at, item in sent:
+        record = records.get(replay_id)
+        payload = item["payload"]
+        rows.append({
+            "command": payload.get("command") or payload.get("request"),
+            "original_s": item["duration"],
+            "replay_s": record["duration"] if record else None,
+            "wait_s": (record["timestamp"] - sent_at) if record else None,
+        })
+    return rows
+
+
+def summarise(rows):
+    by_command = {}
+    for row in rows:
+        s = by_command.setdefault(row["command"], {
+            "count": 0, "missing": 0, "original_s": 0.0, "replay_s": 0.0, "wait_s": 0.0})
+        s["count"] += 1
+        if row["replay_s"] is None:
+            s["missing"] += 1
+            continue
+        s["original_s"] += row["original_s"] or 0.0
+        s["replay_s"] += row["replay_s"]
+        s["wait_s"] += row["wait_s"]
+    return by_command
+
+
+def print_summary(summary):
+    header = "{0:<28} {1:>6} {2:>8} {3:>12} {4:>12} {5:>10}".format(
+        "command", "count", "missing", "original s", "replay s", "wait s")
+    print(header)
+    print("-" * len(header))
+    for name, s in sorted(summary.items()):
+        print("{0:<28} {1:>6} {2:>8} {3:>12.3f} {4:>12.3f} {5:>10.3f}".format(
+            name, s["count"], s["missing"], s["original_s"], s["replay_s"], s["wait_s"]))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    commands = load_capture(args.capture)
+    print("Loaded {0} commands from {1}".format(len(commands), args.capture))
+
+    harness = None
+    if args.root:
+        watch_path = os.path.join(args.root, "Bridge", "revit_command.json")
+        trace_path = os.path.join(args.root, "Logs", "revit_pad_trace.jsonl")
+    else:
+        harness = Harness(sheets=args.sheets, views=args.views)
+        harness.start_watcher(args.interval)
+        watch_path = harness.watch_path
+        trace_path = os.path.join(harness.log_folder, "revit_pad_trace.jsonl")
+
+    sent, records = replay(commands, watch_path, trace_path, args)
+    if harness is not None:
+        harness.stop_watcher()
+
+    rows = compare(sent, records)
+    if args.json:
+        print(json.dumps({"commands": rows, "summary": summarise(rows)}, indent=2))
+    else:
+        print_summary(summarise(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side spatial index over get_bounding_boxes responses.
+
+Boxes are hashed into a uniform 3D grid (cell size from the median box
+size) so range and nearest-neighbour queries touch a few cells instead
+of every element, and never go back to Revit. Boxes spanning more than
+MAX_SPAN cells (large floors, site elements) sit in a short side list
+checked on every query.
+
+    python tools/spatial_index.py response.json --box 0 0 0 100 100 12
+    python tools/spatial_index.py response.json --box 0 0 0 100 100 12 --inside
+    python tools/spatial_index.py response.json --nearest 500 500 0 -k 5
+    python tools/spatial_index.py --bench 50000
+
+Any response encoding works (json / ndjson / gzip / rows). --bench
+builds a synthetic model through the harness and times the index
+against a linear scan.
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_DIR = os.path.dirname(TOOLS_DIR)
+
+MAX_SPAN = 64
+
+
+def intersects(a, b):
+    return (a[0] <= b[3] and b[0] <= a[3] and
+            a[1] <= b[4] and b[1] <= a[4] and
+            a[2] <= b[5] and b[2] <= a[5])
+
+
+def inside(a, b):
+    """True if box a lies completely within box b."""
+    return (b[0] <= a[0] and a[3] <= b[3] and
+            b[1] <= a[1] and a[4] <= b[4] and
+            b[2] <= a[2] and a[5] <= b[5])
+
+
+def distance(point, box):
+    """Euclidean distance from a point to a box (0 inside)."""
+    total = 0.0
+    for axis in range(3):
+        lo, hi = box[axis], box[axis + 3]
+        p = point[axis]
+        d = lo - p if p < lo else (p - hi if p > hi else 0.0)
+        total += d * d
+    return math.sqrt(total)
+
+
+def load_records(path):
+    """Element records of a get_bounding_boxes response, any encoding."""
+    if BUNDLE_DIR not in sys.path:
+        sys.path.insert(0, BUNDLE_DIR)
+    import response_writer
+
+    value = response_writer.read_response(path)
+    if isinstance(value, list):
+        return [r for r in value if "_meta" not in r]
+    if "error" in value:
+        raise ValueError(value["error"])
+    return value["elements"]
+
+
+class GridIndex(object):
+    def __init__(self, records, cell=None):
+        self.boxes = {}
+        self.categories = {}
+        for r in records:
+            self.boxes[r["id"]] = tuple(r["bbox"])
+            self.categories[r["id"]] = r.get("category")
+        self.cell = cell or self._auto_cell()
+        self.cells = {}
+        self.large = []
+        self._lo = [None] * 3
+        self._hi = [None] * 3
+        for element_id, box in self.boxes.items():
+            self._insert(element_id, box)
+
+    def _auto_cell(self):
+        sizes = sorted(max(b[3] - b[0], b[4] - b[1], b[5] - b[2]) for b in self.boxes.values())
+        if not sizes:
+            return 1.0
+        return max(sizes[len(sizes) // 2] * 2.0, 1.0)
+
+    def _range(self, box):
+        c = self.cell
+        return [(int(math.floor(box[a] / c)), int(math.floor(box[a + 3] / c))) for a in range(3)]
+
+    def _insert(self, element_id, box):
+        ranges = self._range(box)
+        span = 1
+        for lo, hi in ranges:
+            span *= hi - lo + 1
+        if span > MAX_SPAN:
+            self.large.append(element_id)
+            return
+        for a, (lo, hi) in enumerate(ranges):
+            self._lo[a] = lo if self._lo[a] is None else min(self._lo[a], lo)
+            self._hi[a] = hi if self._hi[a] is None else max(self._hi[a], hi)
+        (x0, x1), (y0, y1), (z0, z1) = ranges
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                for k in range(z0, z1 + 1):
+                    self.cells.setdefault((i, j, k), []).append(element_id)
+
+    # ------------------------------------------------------------------
+    def query_box(self, box, contained=False, categories=None):
+        """Ids intersecting box (or lying inside it with contained=True)."""
+        test = inside if contained else intersects
+        found = set()
+        ranges = self._range(box)
+        # clamp to the occupied grid
+        clamped = []
+        for a, (lo, hi) in enumerate(ranges):
+            if self._lo[a] is None:
+                clamped = None
+                break
+            clamped.append((max(lo, self._lo[a]), min(hi, self._hi[a])))
+
+        candidates = list(self.large)
+        if clamped and all(lo <= hi for lo, hi in clamped):
+            (x0, x1), (y0, y1), (z0, z1) = clamped
+            for i in range(x0, x1 + 1):
+                for j in range(y0, y1 + 1):
+                    for k in range(z0, z1 + 1):
+                        candidates.extend(self.cells.get((i, j, k), ()))
+
+        for element_id in candidates:
+            if element_id in found:
+                continue
+            if categories and self.categories[element_id] not in categories:
+                continue
+            if test(self.boxes[element_id], box):
+                found.add(element_id)
+        return found
+
+    def nearest(self, point, k=1, categories=None):
+        """[(distance, id)] of the k boxes nearest to point."""
+        best = []  # max-heap of (-distance, id)
+        seen = set()
+
+        def consider(element_id):
+            if element_id in seen:
+                return
+            seen.add(element_id)
+            if categories and self.categories[element_id] not in categories:
+                return
+            d = distance(point, self.boxes[element_id])
+            if len(best) < k:
+                heapq.heappush(best, (-d, element_id))
+            elif d < -best[0][0]:
+                heapq.heapreplace(best, (-d, element_id))
+
+        for element_id in self.large:
+            consider(element_id)
+
+        if self._lo[0] is not None:
+            centre = [int(math.floor(point[a] / self.cell)) for a in range(3)]
+            # rings beyond this cover no occupied cell
+            max_ring = max(max(abs(centre[a] - self._lo[a]), abs(centre[a] - self._hi[a]))
+                           for a in range(3))
+            for ring in range(max_ring + 1):
+                for cell in self._shell(centre, ring):
+                    for element_id in self.cells.get(cell, ()):
+                        consider(element_id)
+                # anything in ring + 1 is at least ring * cell away
+                if len(best) == k and -best[0][0] <= ring * self.cell:
+                    break
+
+        return sorted((-d, element_id) for d, element_id in best)
+
+    def _shell(self, centre, ring):
+        """Cells at Chebyshev distance `ring` from centre, clamped to the grid."""
+        cx, cy, cz = centre
+        ranges = [(max(c - ring, self._lo[a]), min(c + ring, self._hi[a]))
+                  for a, c in enumerate(centre)]
+        (x0, x1), (y0, y1), (z0, z1) = ranges
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                on_edge_xy = abs(i - cx) == ring or abs(j - cy) == ring
+                if on_edge_xy:
+                    for k in range(z0, z1 + 1):
+                        yield (i, j, k)
+                else:
+                    for k in (cz - ring, cz + ring) if ring else (cz,):
+                        if z0 <= k <= z1:
+                            yield (i, j, k)
+
+
+# ----------------------------------------------------------------------
+def _bench(count, queries):
+    from harness import Harness
+
+    h = Harness(sheets=10, views=10, elements=count)
+    h.execute({"request": "get_bounding_boxes", "encoding": "rows"})
+    records = load_records(h.response_path)
+
+    start = time.time()
+    index = GridIndex(records)
+    print("Indexed {0} boxes in {1:.0f} ms (cell {2:.1f} ft, {3} cells, {4} large)".format(
+        len(records), (time.time() - start) * 1000, index.cell, len(index.cells), len(index.large)))
+
+    rnd = random.Random(1)
+    boxes = list(index.boxes.items())
+    probes = []
+    for _ in range(queries):
+        x, y, z = rnd.uniform(0, 1000), rnd.uniform(0, 1000), rnd.uniform(0, 100)
+        probes.append((x, y, z, x + 50, y + 50, z + 12))
+
+    start = time.time()
+    hits = [index.query_box(b) for b in probes]
+    grid_ms = (time.time() - start) * 1000 / queries
+    start = time.time()
+    scans = [set(i for i, bb in boxes if intersects(bb, b)) for b in probes]
+    scan_ms = (time.time() - start) * 1000 / queries
+    assert hits == scans, "grid and linear scan disagree"
+    print("Range query: {0:.3f} ms grid vs {1:.2f} ms scan".format(grid_ms, scan_ms))
+
+    start = time.time()
+    near = [index.nearest(b[:3], 5) for b in probes]
+    grid_ms = (time.time() - start) * 1000 / queries
+    start = time.time()
+    scans = [sorted((distance(b[:3], bb), i) for i, bb in boxes)[:5] for b in probes]
+    scan_ms = (time.time() - start) * 1000 / queries
+    assert [[d for d, _ in n] for n in near] == [[d for d, _ in s] for s in scans], \
+        "nearest neighbours disagree"
+    print("5-nearest:   {0:.3f} ms grid vs {1:.2f} ms scan".format(grid_ms, scan_ms))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("response", nargs="?", help="get_bounding_boxes response.json")
+    parser.add_argument("--box", nargs=6, type=float, metavar="V",
+                        help="min x y z, max x y z")
+    parser.add_argument("--inside", action="store_true", help="only boxes fully inside --box")
+    parser.add_argument("--nearest", nargs=3, type=float, metavar="V", help="point x y z")
+    parser.add_argument("-k", type=int, default=5, help="neighbours for --nearest")
+    parser.add_argument("--category", action="append", help="restrict to category name(s)")
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark on N synthetic elements")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.bench, args.queries)
+        return
+    if not args.response:
+        parser.error("response path required")
+
+    index = GridIndex(load_records(args.response))
+    start = time.time()
+    if args.box:
+        ids = index.query_box(args.box, args.inside, args.category)
+        print("{0} elements ({1:.2f} ms)".format(len(ids), (time.time() - start) * 1000))
+        for element_id in sorted(ids):
+            print(element_id, index.categories[element_id], index.boxes[element_id])
+    if args.nearest:
+        found = index.nearest(args.nearest, args.k, args.category)
+        print("{0} nearest ({1:.2f} ms)".format(len(found), (time.time() - start) * 1000))
+        for d, element_id in found:
+            print("{0:.2f} ft".format(d), element_id, index.categories[element_id])
+
+
+if __name__ == "__main__":
+    main()